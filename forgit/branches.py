@@ -0,0 +1,174 @@
+"""
+Pipeline which prepares branches of PRs on the target in the background.
+"""
+
+from pathlib import Path
+from threading import Condition, Thread
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+from forgit.constants import SOURCE_PR_BRANCH, TARGET_PR_BRANCH
+from forgit.exceptions import GitConvertorException
+from forgit.forges.diff import place_diffs_to_directory
+from forgit.forges.git_cli_api import GitCliApi
+from forgit.messages import PR_WITHOUT_BRANCHES_ERROR
+
+
+def get_pr_branches(pr_id: int) -> List[str]:
+    return [SOURCE_PR_BRANCH.format(pr_id=pr_id), TARGET_PR_BRANCH.format(pr_id=pr_id)]
+
+
+class BranchPipeline:
+    """
+    Pushes branches of upcoming PRs in batches from a background thread while
+     earlier PRs are being posted, and deletes branches of posted PRs.
+
+    At most `window` PRs have their branches on the target at a time (plus
+     branches of posted PRs waiting to be deleted in a batch), so the number of
+     transient refs and the size of a single push stay bounded.
+    """
+
+    def __init__(
+        self,
+        git_cli_api: GitCliApi,
+        prs: List[Tuple[int, Any]],
+        window: int,
+        batch_size: int,
+        on_pushed: Callable[[List[str]], None],
+        on_deleted: Callable[[List[str]], None],
+        diffs_directory: Optional[Path] = None,
+        diff_workers: Optional[int] = None,
+        diff_compression: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            git_cli_api: git repository with all the PR commits already fetched
+            prs: sorted (PR ID, PR) pairs which need branches
+            window: max number of PRs with branches on the target
+            batch_size: max number of PRs pushed or deleted at once
+            on_pushed: called with branches after they are pushed
+            on_deleted: called with branches after they are deleted
+            diffs_directory: where to store diffs of PRs, diffs are not made
+                if not set
+            diff_workers: max number of concurrently generated diffs
+            diff_compression: compression of stored diffs
+        """
+        self.git_cli_api = git_cli_api
+        self.window = max(window, 1)
+        self.batch_size = max(min(batch_size, self.window), 1)
+        self._on_pushed = on_pushed
+        self._on_deleted = on_deleted
+        self._diffs_directory = diffs_directory
+        self._diff_workers = diff_workers
+        self._diff_compression = diff_compression
+
+        self._waiting = list(prs)
+        self._covered = {pr_id for pr_id, _ in prs}
+        self._pushed: Dict[int, List[str]] = {}
+        self._to_delete: List[str] = []
+        self._closing = False
+        self._error: Optional[BaseException] = None
+        self._condition = Condition()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def start(self) -> "BranchPipeline":
+        self._thread.start()
+        return self
+
+    def _has_work(self) -> bool:
+        can_push = self._waiting and len(self._pushed) < self.window
+        full_delete_batch = len(self._to_delete) >= 2 * self.batch_size
+        return bool(can_push or full_delete_batch or self._closing)
+
+    def _push(self, prs: List[Tuple[int, Any]]) -> None:
+        refs = {}
+        for pr_id, pr in prs:
+            source_branch, target_branch = get_pr_branches(pr_id)
+            refs[source_branch] = pr.new_sha
+            refs[target_branch] = pr.old_sha
+
+        self.git_cli_api.create_branches(refs)
+        if self._diffs_directory is not None:
+            place_diffs_to_directory(
+                Path(self.git_cli_api.repo.working_dir),
+                [(pr.old_sha, pr.new_sha, pr_id) for pr_id, pr in prs],
+                self._diffs_directory,
+                self._diff_workers,
+                self._diff_compression,
+            )
+
+        branches = list(refs)
+        self.git_cli_api.push_branches(branches)
+        self._on_pushed(branches)
+
+    def _delete(self, branches: List[str]) -> None:
+        self.git_cli_api.delete_branches(branches)
+        self._on_deleted(branches)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(self._has_work)
+                    free = self.window - len(self._pushed)
+                    batch = self._waiting[: min(free, self.batch_size)]
+                    del self._waiting[: len(batch)]
+                    to_delete, self._to_delete = self._to_delete, []
+                    finished = self._closing and not self._waiting
+
+                # git I/O runs without the lock, so posting is not blocked
+                if to_delete:
+                    self._delete(to_delete)
+
+                if batch:
+                    self._push(batch)
+                    with self._condition:
+                        for pr_id, _ in batch:
+                            if self._closing:
+                                # pipeline was closed during the push
+                                self._to_delete.extend(get_pr_branches(pr_id))
+                            else:
+                                self._pushed[pr_id] = get_pr_branches(pr_id)
+                        self._condition.notify_all()
+
+                if finished:
+                    return
+        except BaseException as exc:
+            with self._condition:
+                self._error = exc
+                self._condition.notify_all()
+
+    def wait_for(self, pr_id: int) -> None:
+        """
+        Blocks until branches of the PR are pushed. Raises right away for PRs
+         the pipeline doesn't prepare branches for.
+        """
+        if pr_id not in self._covered:
+            raise GitConvertorException(PR_WITHOUT_BRANCHES_ERROR.format(pr_id=pr_id))
+
+        with self._condition:
+            self._condition.wait_for(
+                lambda: pr_id in self._pushed or self._error is not None
+            )
+            if self._error is not None:
+                raise self._error
+
+    def release(self, pr_id: int) -> None:
+        """Marks the PR as posted, so its branches can be deleted."""
+        with self._condition:
+            self._to_delete.extend(self._pushed.pop(pr_id, []))
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """Deletes all the remaining branches and stops the pipeline."""
+        with self._condition:
+            # branches which were not posted (e.g. after a failure) are deleted too
+            for branches in self._pushed.values():
+                self._to_delete.extend(branches)
+            self._pushed.clear()
+            self._waiting.clear()
+            self._closing = True
+            self._condition.notify_all()
+
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
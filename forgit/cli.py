@@ -1,9 +1,179 @@
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
+
+import click
 
 from forgit.config import ConfigSchema, Config
+from forgit.dump import DumpExporter, DumpProject
+from forgit.forges.gitlab_export import GitLabExporter
+from forgit.forges.project import ForgeProject, get_project
+from forgit.forges.token_pool import get_token_pools
+from forgit.messages import PROJECT_URL_NOT_SET_ERROR
+from forgit.snapshot import SnapshotProject, SnapshotStore
+from forgit.transfer import Transferator3000
 
 
 def _get_config(config_file_path: Optional[Path]) -> ConfigSchema:
     config_cls = Config(config_file_path) if config_file_path is not None else Config()
     return config_cls.get_config()
+
+
+def _get_source_project(config: ConfigSchema) -> ForgeProject:
+    # only reads of the source are spread over more tokens, the target posts
+    # by its own token
+    return get_project(
+        config.source_url,
+        config.source_project_key,
+        config,
+        read_tokens=config.github_read_tokens,
+    )
+
+
+def _get_source(config: ConfigSchema) -> Any:
+    if not config.source_url:
+        raise click.UsageError(PROJECT_URL_NOT_SET_ERROR)
+
+    source = _get_source_project(config)
+    if config.use_snapshot:
+        return SnapshotProject(source, SnapshotStore.from_config(config))
+    return source
+
+
+def _get_transferator(config: ConfigSchema) -> Transferator3000:
+    if not config.source_url or not config.target_url:
+        raise click.UsageError(PROJECT_URL_NOT_SET_ERROR)
+
+    source = _get_source_project(config)
+    target = get_project(config.target_url, config.target_project_key, config)
+    return Transferator3000(source, target, config)
+
+
+@click.group()
+@click.option(
+    "--config",
+    "config_file_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Path to the config file, ~/.config/forgit.yaml is used by default.",
+)
+@click.pass_context
+def cli(ctx: click.Context, config_file_path: Optional[Path]) -> None:
+    """Migrate your project to another git forge like a boss!"""
+    # loaded by commands, so `--help` works without a config
+    ctx.obj = config_file_path
+
+
+@cli.result_callback()
+def report_token_usage(*_, **__) -> None:
+    for pool in get_token_pools():
+        click.echo("GitHub token usage:")
+        for line in pool.describe():
+            click.echo(f"  {line}")
+
+
+@cli.command()
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Only print what would be done and how many API calls it takes.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue after the last step of the previous (failed) run.",
+)
+@click.option("--verbose", is_flag=True, help="Print the planned action for every ID.")
+@click.pass_obj
+def transfer(
+    config_file_path: Optional[Path], dry_run: bool, resume: bool, verbose: bool
+) -> None:
+    """Transfer issues, PRs and releases from the source to the target."""
+    transferator = _get_transferator(_get_config(config_file_path))
+    if resume:
+        plan = transferator.resume(dry_run=dry_run)
+    else:
+        plan = transferator.transfer(dry_run=dry_run)
+
+    if dry_run:
+        click.echo(plan.describe(verbose=verbose))
+
+
+@cli.command("export-gitlab")
+@click.argument("output", type=click.Path(dir_okay=False, path_type=Path))
+@click.option(
+    "--no-repository",
+    is_flag=True,
+    help="Don't bundle the git repository into the archive.",
+)
+@click.pass_obj
+def export_gitlab(
+    config_file_path: Optional[Path], output: Path, no_repository: bool
+) -> None:
+    """
+    Write the source project as a GitLab project export archive to OUTPUT, which
+    can be imported to GitLab in one operation.
+    """
+    config = _get_config(config_file_path)
+    GitLabExporter(_get_source(config), config).export(
+        output, include_repository=not no_repository
+    )
+
+
+@cli.command()
+@click.argument("archive", type=click.Path(dir_okay=False, path_type=Path))
+@click.option(
+    "--no-repository",
+    is_flag=True,
+    help="Don't bundle the git repository next to the archive.",
+)
+@click.pass_obj
+def export(
+    config_file_path: Optional[Path], archive: Path, no_repository: bool
+) -> None:
+    """
+    Write issues, PRs and releases of the source to ARCHIVE, which can be imported
+    to any target later, without the source.
+    """
+    config = _get_config(config_file_path)
+    DumpExporter(_get_source(config), config).export(
+        archive, include_repository=not no_repository
+    )
+
+
+@cli.command("import")
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Only print what would be done and how many API calls it takes.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue after the last step of the previous (failed) run.",
+)
+@click.option("--verbose", is_flag=True, help="Print the planned action for every ID.")
+@click.pass_obj
+def import_(
+    config_file_path: Optional[Path],
+    archive: Path,
+    dry_run: bool,
+    resume: bool,
+    verbose: bool,
+) -> None:
+    """Transfer issues, PRs and releases from ARCHIVE (see `export`) to the target."""
+    config = _get_config(config_file_path)
+    if not config.target_url:
+        raise click.UsageError(PROJECT_URL_NOT_SET_ERROR)
+
+    # the archive already is an offline copy of the source
+    config = config.copy(update={"use_snapshot": False})
+    target = get_project(config.target_url, config.target_project_key, config)
+    transferator = Transferator3000(DumpProject(archive, config), target, config)
+    if resume:
+        plan = transferator.resume(dry_run=dry_run)
+    else:
+        plan = transferator.transfer(dry_run=dry_run)
+
+    if dry_run:
+        click.echo(plan.describe(verbose=verbose))
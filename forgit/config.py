@@ -1,12 +1,16 @@
 from pathlib import Path
-from tempfile import mkdtemp
 from typing import Optional, Any, List, Dict, Union, Type
 
-from git import Repo
+from git import Git
 from pydantic import BaseModel, root_validator, validator
 from yaml import safe_load
 
-from forgit.constants import POSSIBLE_CONFIG_FILE_NAMES
+from forgit.constants import (
+    POSSIBLE_CONFIG_FILE_NAMES,
+    DEFAULT_CACHE_DIR,
+    DEFAULT_GITHUB_API_URL,
+    DIFF_COMPRESSIONS,
+)
 from forgit.messages import (
     CONFIG_FILE_NOT_FOUND_DEFAULT_LOCATION,
     DIFF_STORAGE_CONFIG_ERROR,
@@ -27,31 +31,88 @@ class PRSchema(IssueSchema):
     as_issue: bool = False
     ssh_url: str = ""
     open_prs_as_issues: bool = True
+    # create PR branches only as refs in a bare clone, without checking them out
+    ref_only_branches: bool = True
+    # clone without blobs, git fetches them when they are needed
+    partial_clone: bool = True
+    # max number of PRs with branches pushed to the target at a time
+    branch_window: int = 50
+    # max number of PRs whose branches are pushed or deleted at once
+    branch_batch_size: int = 10
 
     @validator("ssh_url")
-    def ssh_url_must_be_correct(self, ssh_url) -> str:
+    def ssh_url_must_be_correct(cls, ssh_url: str) -> str:
         if not ssh_url:
             return ssh_url
 
-        # if url is invalid - unable to clone, this will throw an exception about it
-        Repo.clone_from(ssh_url, mkdtemp())
+        # if url is invalid - unable to list refs, this will throw an exception about it
+        Git().ls_remote("--heads", ssh_url)
         return ssh_url
 
 
+class ThrottlingSchema(BaseModel):
+    # reads per second until the forge reports its quota, unlimited if not set
+    read_rate: Optional[float] = None
+    read_burst: float = 10
+    # GitHub allows 80 content-creating requests per minute and 500 per hour
+    writes_per_minute: int = 80
+    writes_per_hour: int = 500
+    write_burst: float = 10
+    # part of the quota which is left untouched
+    reserve: int = 50
+    # seconds to wait after being rate limited without Retry-After header
+    backoff: float = 60
+    max_retries: int = 5
+
+
 class ConfigSchema(BaseModel):
     source_project_key: str
     target_project_key: str
+    # e.g. https://pagure.io/namespace/repo, forge is recognized from the host
+    source_url: str = ""
+    target_url: str = ""
     user_map: list[dict[str, str]]
     issue: IssueSchema = IssueSchema()
     pr: PRSchema = PRSchema()
+    throttling: ThrottlingSchema = ThrottlingSchema()
     preserve_datetime: bool = True
     track_urls: bool = True
     match_ids: bool = True
     make_diffs: bool = True
     path_to_store_diffs: str = ""
+    # max number of concurrently generated diffs
+    diff_workers: Optional[int] = None
+    # compress stored diffs on the fly, "gzip" or "xz"
+    diff_compression: Optional[str] = None
+    # max number of concurrent calls to the target which don't need to be ordered
+    concurrency: int = 8
+    # max number of issues and PRs read from the source ahead of posting
+    read_ahead: int = 50
+    # max number of upcoming issues and PRs with comments fetched in advance
+    comment_prefetch_window: int = 20
+    # max number of concurrent fetches of comments
+    comment_prefetch_workers: Optional[int] = 8
+    # post issues (with comments) on GitHub by its issue import API, with
+    # `match_ids` the imports run one by one
+    github_import: bool = False
+    github_api_url: str = DEFAULT_GITHUB_API_URL
+    # more GitHub tokens which share reads of the source project
+    github_read_tokens: List[str] = []
+    # seconds between polls of the status of issue imports
+    github_import_poll_interval: float = 1
+    # read Pagure issues and PRs from git repositories of the project, not by API
+    pagure_git_source: bool = False
+    # processes parsing Pagure issues and PRs, defaults to the number of CPUs
+    pagure_parse_workers: Optional[int] = None
     transfer_releases: bool = False
     post_message_about_migration: bool = True
     ignore_first_n_ids: int = 0
+    cache_dir: str = ""
+    use_snapshot: bool = True
+    # answer repeated reads of forges from disk when forges report no change
+    http_cache: bool = True
+    # max size of the HTTP cache in MiB, least recently used responses are evicted
+    http_cache_size: int = 512
 
     @root_validator
     def diffs_must_be_stored_somewhere(cls, values: dict[str, Any]) -> dict[str, Any]:
@@ -85,6 +146,24 @@ class ConfigSchema(BaseModel):
 
         return path_to_store_diffs
 
+    @validator("diff_compression")
+    def compression_must_be_known(
+        cls, diff_compression: Optional[str]
+    ) -> Optional[str]:
+        if diff_compression is not None and diff_compression not in DIFF_COMPRESSIONS:
+            raise ValueError(
+                f"Unknown diff compression {diff_compression}, "
+                f"use one of {DIFF_COMPRESSIONS}."
+            )
+
+        return diff_compression
+
+    @property
+    def cache_path(self) -> Path:
+        return (
+            Path(self.cache_dir).expanduser() if self.cache_dir else DEFAULT_CACHE_DIR
+        )
+
 
 class Config:
     def __init__(self, config_file_path: Optional[Path] = None) -> None:
@@ -117,9 +196,9 @@ class Config:
 
     @staticmethod
     def _get_parsed_sub_schema(
-        config_items: List[Dict[str, bool]],
-        schema_type: Type[Union[IssueSchema, PRSchema]],
-    ) -> Union[IssueSchema, PRSchema]:
+        config_items: List[Dict[str, Any]],
+        schema_type: Type[Union[IssueSchema, PRSchema, ThrottlingSchema]],
+    ) -> Union[IssueSchema, PRSchema, ThrottlingSchema]:
         flatten_dict = {}
         for item in config_items:
             flatten_dict.update(item)
@@ -136,6 +215,11 @@ class Config:
         if config_dict.get("pr") is not None:
             config_dict["pr"] = cls._get_parsed_sub_schema(config_dict["pr"], PRSchema)
 
+        if config_dict.get("throttling") is not None:
+            config_dict["throttling"] = cls._get_parsed_sub_schema(
+                config_dict["throttling"], ThrottlingSchema
+            )
+
         return ConfigSchema.parse_obj(config_dict)
 
     def get_config(self) -> "ConfigSchema":
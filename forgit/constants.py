@@ -1,4 +1,45 @@
+from pathlib import Path
+
 POSSIBLE_CONFIG_FILE_NAMES = ["forgit.yaml", "forgit.yml"]
 
 SOURCE_PR_BRANCH = "pr-{pr_id}-source"
 TARGET_PR_BRANCH = "pr-{pr_id}-target"
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "forgit"
+SNAPSHOT_FILE_NAME = "snapshot.sqlite"
+# number of decoded snapshot records kept in memory
+SNAPSHOT_CACHED_RECORDS = 100
+HTTP_CACHE_FILE_NAME = "http-cache.sqlite"
+JOURNALS_DIR_NAME = "journals"
+# min number of journal entries appended before the journal is compacted
+JOURNAL_COMPACT_ENTRIES = 1000
+REPOS_DIR_NAME = "repos"
+
+DIFF_CHUNK_SIZE = 1024 * 1024
+DIFF_COMPRESSIONS = ["gzip", "xz"]
+
+# number of items read from a forge by one request of a paginated listing
+PAGE_SIZE = 100
+
+# average duration of a single call of the forge API, used for estimates
+ESTIMATED_CALL_DURATION = 0.5
+# average number of comments of an item, used for estimates if it is not listed
+ESTIMATED_COMMENTS = 2
+
+DEFAULT_GITHUB_API_URL = "https://api.github.com"
+GITHUB_IMPORT_MEDIA_TYPE = "application/vnd.github.golden-comet-preview+json"
+
+# layout of GitLab project exports which is written by the GitLab export target
+GITLAB_EXPORT_VERSION = "0.2.4"
+GITLAB_EXPORT_GITLAB_VERSION = "15.0.0"
+GITLAB_LABEL_COLOR = "#428BCA"
+
+# git repositories in which Pagure keeps tickets and pull requests
+PAGURE_TICKETS_DIR = "tickets"
+PAGURE_REQUESTS_DIR = "requests"
+
+# forge-neutral dump of the source project
+DUMP_INDEX_SUFFIX = ".idx"
+DUMP_BUNDLE_SUFFIX = ".bundle"
+DUMP_BLOCK_SIZE = 100
+DUMP_CACHED_RECORDS = 400
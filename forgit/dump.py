@@ -0,0 +1,474 @@
+"""
+Forge-neutral dump of the source project.
+
+The dump decouples extraction from posting: issues, PRs (with their comments) and
+ releases are exported once, near the source, and imported to the target later,
+ as many times as needed, without touching the source.
+
+The dump is an append-only file of gzip members, each of them a block of JSON
+ lines (one record per line). Next to it is an index with one JSON line per
+ block: its offset, length and keys (with a short summary) of its records. So
+ a single record is read by decompressing only its block and the whole dump is
+ never loaded into memory. The git repository (with heads of PRs) is bundled
+ next to the dump, so branches of PRs are imported without the source too.
+"""
+
+import gzip
+import heapq
+import json
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ogr.abstract import IssueStatus, PRStatus
+
+from forgit.config import ConfigSchema
+from forgit.constants import (
+    DUMP_BLOCK_SIZE,
+    DUMP_BUNDLE_SUFFIX,
+    DUMP_CACHED_RECORDS,
+    DUMP_INDEX_SUFFIX,
+    REPOS_DIR_NAME,
+)
+from forgit.enums import Phase, TargetTypes
+from forgit.forges.abstract import Issue, PullRequest, Release
+from forgit.forges.git_cli_api import GitCliApi
+from forgit.forges.record import IssueRecord, PullRequestRecord, ReleaseRecord
+from forgit.prefetch import map_ahead
+from forgit.progressbar import Progress
+from forgit.throttling import Throttler
+
+# kind of the record with information about the source project
+_PROJECT_KIND = "project"
+
+_RECORD_CLASSES: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    TargetTypes.issue.name: IssueRecord.from_dict,
+    TargetTypes.pr.name: PullRequestRecord.from_dict,
+    TargetTypes.release.name: ReleaseRecord.from_dict,
+}
+
+# kind, key, summary
+IndexEntry = Tuple[str, str, Dict[str, Any]]
+
+
+def _get_index_path(path: Path) -> Path:
+    return path.with_name(path.name + DUMP_INDEX_SUFFIX)
+
+
+def _get_bundle_path(path: Path) -> Path:
+    return path.with_name(path.name + DUMP_BUNDLE_SUFFIX)
+
+
+def _parse_index_line(line: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Returns:
+        Block described by the line of the index, None if the line was cut short
+        by a crash.
+    """
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+class DumpWriter:
+    def __init__(self, path: Path, block_size: int = DUMP_BLOCK_SIZE) -> None:
+        """
+        Opens the dump for appending. Blocks which are not in the index (written
+         by a run which crashed) are dropped, so is a line of the index which was
+         cut short.
+
+        Args:
+            path: path to the dump
+            block_size: max number of records in one block
+        """
+        self.path = path
+        self.block_size = block_size
+        self._index_path = _get_index_path(path)
+
+        end = 0
+        if self._index_path.is_file():
+            with open(self._index_path, "rb+") as index_file:
+                index_end = 0
+                for line in index_file:
+                    block = _parse_index_line(line)
+                    if block is None:
+                        index_file.truncate(index_end)
+                        break
+
+                    end = block["offset"] + block["length"]
+                    index_end += len(line)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "r+b" if path.is_file() else "wb")
+        self._file.truncate(end)
+        self._file.seek(end)
+        self._index_file = open(self._index_path, "a")
+
+        self._lines: List[bytes] = []
+        self._entries: List[IndexEntry] = []
+
+    def __enter__(self) -> "DumpWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def append(
+        self,
+        kind: str,
+        key: str,
+        data: Dict[str, Any],
+        summary: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Args:
+            kind: kind of the record
+            key: identifies the record among records of the same kind
+            data: serialized record
+            summary: small part of the data which is kept in the index
+        """
+        record = {"kind": kind, "key": key, "data": data}
+        self._lines.append(json.dumps(record).encode() + b"\n")
+        self._entries.append((kind, key, summary or {}))
+        if len(self._lines) >= self.block_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._lines:
+            return
+
+        offset = self._file.tell()
+        self._file.write(gzip.compress(b"".join(self._lines)))
+        self._file.flush()
+        block = {
+            "offset": offset,
+            "length": self._file.tell() - offset,
+            "items": self._entries,
+        }
+        # block is in the dump only once it is in the index
+        self._index_file.write(json.dumps(block) + "\n")
+        self._index_file.flush()
+        self._lines = []
+        self._entries = []
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+        self._index_file.close()
+
+
+class DumpReader:
+    """
+    Reads records of the dump. Decoded records of a few last used blocks are
+     cached, so reading records in the order they were written decompresses every
+     block only once.
+    """
+
+    def __init__(self, path: Path, cached_records: int = DUMP_CACHED_RECORDS) -> None:
+        self.path = path
+        self.cached_records = cached_records
+        # (kind, key) -> offset and length of the block
+        self._blocks: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        # offsets and lengths of the blocks in the order they were written
+        self._block_list: List[Tuple[int, int]] = []
+        self.entries: List[IndexEntry] = []
+        with open(_get_index_path(path), "rb") as index_file:
+            for line in index_file:
+                block = _parse_index_line(line)
+                if block is None:
+                    break
+
+                self._block_list.append((block["offset"], block["length"]))
+                for kind, key, summary in block["items"]:
+                    self._blocks[kind, key] = block["offset"], block["length"]
+                    self.entries.append((kind, key, summary))
+
+        self._cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def _read_block(self, offset: int, length: int) -> List[Dict[str, Any]]:
+        with open(self.path, "rb") as dump_file:
+            dump_file.seek(offset)
+            content = gzip.decompress(dump_file.read(length))
+
+        return [json.loads(line) for line in content.splitlines()]
+
+    def get(self, kind: str, key: str) -> Dict[str, Any]:
+        """
+        Returns:
+            Serialized record.
+        """
+        with self._lock:
+            if (kind, key) in self._cache:
+                self._cache.move_to_end((kind, key))
+                return self._cache[kind, key]
+
+            for record in self._read_block(*self._blocks[kind, key]):
+                self._cache[record["kind"], record["key"]] = record["data"]
+                self._cache.move_to_end((record["kind"], record["key"]))
+
+            while len(self._cache) > self.cached_records:
+                self._cache.popitem(last=False)
+
+            return self._cache[kind, key]
+
+    def __iter__(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Streams all the records in the order they were written. A block which is
+         not in the index (cut short by a crash) is not read.
+        """
+        for offset, length in self._block_list:
+            for record in self._read_block(offset, length):
+                yield record["kind"], record["key"], record["data"]
+
+
+class DumpedRecord:
+    """
+    Record which is read from the dump on every access, so it doesn't hold
+     the data in memory. The reader caches records of recently read blocks.
+    """
+
+    def __init__(self, reader: DumpReader, kind: TargetTypes, key: str) -> None:
+        self._reader = reader
+        self._kind = kind
+        self._key = key
+
+    def __getattr__(self, name: str) -> Any:
+        data = self._reader.get(self._kind.name, self._key)
+        return getattr(_RECORD_CLASSES[self._kind.name](data), name)
+
+
+class DumpedIssue(Issue):
+    """
+    Issue from the dump (or the snapshot), only its ID and status are kept in
+     memory, the rest is read from the record when it is used.
+    """
+
+    # record which is read on access
+    issue: Any
+
+    def __init__(
+        self, config: ConfigSchema, issue: Any, summary: Dict[str, Any]
+    ) -> None:
+        self.config = config
+        self.issue = issue
+        self.id: int = summary["id"]
+        self.status: IssueStatus = IssueStatus[summary["status"]]
+        self._comments = None
+
+    @property
+    def title(self) -> str:  # type: ignore[override]
+        return self.issue.title
+
+    @property
+    def description(self) -> str:  # type: ignore[override]
+        return self.issue.description
+
+    @property
+    def author(self) -> str:  # type: ignore[override]
+        return self.issue.author
+
+    @property
+    def assignees(self) -> Optional[List[str]]:
+        if not self.config.issue.assignees:
+            return None
+        return self.issue.assignees
+
+    @property
+    def assignee(self) -> Optional[str]:
+        if not self.config.issue.assignees:
+            return None
+        return self.issue.assignee
+
+    def get_comment_count(self) -> Optional[int]:
+        # the record is read locally
+        return len(self.issue.comments)
+
+
+class DumpedPullRequest(PullRequest):
+    """Same as `DumpedIssue`, for PRs."""
+
+    pull_request: Any
+
+    def __init__(
+        self,
+        config: ConfigSchema,
+        pull_request: Any,
+        summary: Dict[str, Any],
+    ) -> None:
+        self.config = config
+        self.pull_request = pull_request
+        self.id: int = summary["id"]
+        self.status: PRStatus = PRStatus[summary["status"]]
+        self._comments = None
+
+    @property
+    def title(self) -> str:  # type: ignore[override]
+        return self.pull_request.title
+
+    @property
+    def description(self) -> str:  # type: ignore[override]
+        return self.pull_request.description
+
+    @property
+    def author(self) -> str:  # type: ignore[override]
+        return self.pull_request.author
+
+    def get_comment_count(self) -> Optional[int]:
+        return len(self.pull_request.comments)
+
+    def _get_base_commit(self) -> str:
+        return self.pull_request.base_commit
+
+
+class DumpProject:
+    """
+    Source project read from the dump, it can be used by the transfer instead of
+     the forge project.
+    """
+
+    issue_cls = DumpedIssue
+    pr_cls = DumpedPullRequest
+    release_cls = Release
+
+    def __init__(self, path: Path, config: ConfigSchema) -> None:
+        self.config = config
+        self.reader = DumpReader(path)
+        self.throttler = Throttler(config.throttling)
+
+        project = self.reader.get(_PROJECT_KIND, _PROJECT_KIND)
+        self.key: str = project["key"]
+        self.pull_head_refspec: str = project["pull_head_refspec"]
+        # branches of PRs are fetched from the bundled repository if there is one
+        bundle = _get_bundle_path(path)
+        self.git_url: str = str(bundle) if bundle.is_file() else project["git_url"]
+
+    def _get_entries(self, kind: TargetTypes) -> Iterator[IndexEntry]:
+        return (entry for entry in self.reader.entries if entry[0] == kind.name)
+
+    def iter_issues(self) -> Iterator[DumpedIssue]:
+        for _, key, summary in self._get_entries(TargetTypes.issue):
+            record = DumpedRecord(self.reader, TargetTypes.issue, key)
+            yield DumpedIssue(self.config, record, summary)
+
+    def iter_pull_requests(self) -> Iterator[DumpedPullRequest]:
+        for _, key, summary in self._get_entries(TargetTypes.pr):
+            record = DumpedRecord(self.reader, TargetTypes.pr, key)
+            yield DumpedPullRequest(self.config, record, summary)
+
+    def get_issues(self) -> Dict[int, DumpedIssue]:
+        return {issue.id: issue for issue in self.iter_issues()}
+
+    def get_pull_requests(self) -> Dict[int, DumpedPullRequest]:
+        return {pr.id: pr for pr in self.iter_pull_requests()}
+
+    def get_releases(self) -> List[Release]:
+        # there are only few releases, they are read whole
+        return [
+            Release(
+                self.config,
+                ReleaseRecord.from_dict(self.reader.get(TargetTypes.release.name, key)),
+            )
+            for _, key, _ in self._get_entries(TargetTypes.release)
+        ]
+
+
+class DumpExporter:
+    """
+    Streams issues, PRs (with their comments) and releases of the source project
+     to the dump.
+    """
+
+    def __init__(self, source: Any, config: ConfigSchema) -> None:
+        """
+        Args:
+            source: source project (forge or snapshot project)
+            config: forgit config
+        """
+        self.source = source
+        self.config = config
+
+    @staticmethod
+    def _get_record(item: Any) -> Tuple[int, str, Dict[str, Any]]:
+        # comments are read from the source here, in a worker thread
+        if isinstance(item, Issue):
+            issue = IssueRecord.from_ogr(item.issue)
+            return item.id, TargetTypes.issue.name, issue.to_dict()
+
+        pull_request = PullRequestRecord.from_ogr(item.pull_request, item.old_sha)
+        return item.id, TargetTypes.pr.name, pull_request.to_dict()
+
+    def _add_repository(self, path: Path) -> None:
+        git_cli_api = GitCliApi(
+            self.source.git_url,
+            cache_dir=self.config.cache_path / REPOS_DIR_NAME,
+            partial_clone=False,
+        )
+        # commits of PRs, also from forks
+        git_cli_api.fetch(self.source.git_url, [self.source.pull_head_refspec])
+        git_cli_api.repo.git.bundle("create", str(path), "--all")
+
+    def export(self, path: Path, include_repository: bool = True) -> Path:
+        """
+        Items are streamed from the source page by page and written in the order
+         of their IDs (as far as the source sorts them), so the import reads
+         the dump block after block. Records are read by
+         `comment_prefetch_workers` threads, at most `comment_prefetch_window` of
+         them ahead of the writer, so memory doesn't grow with the project size.
+
+        Args:
+            path: where to write the dump, existing dump is overwritten
+            include_repository: bundle the git repository next to the dump, so
+                branches of PRs are imported from it instead of the source
+
+        Returns:
+            Path to the written dump.
+        """
+        for dump_path in (path, _get_index_path(path), _get_bundle_path(path)):
+            dump_path.unlink(missing_ok=True)
+
+        items = heapq.merge(
+            self.source.iter_issues(),
+            self.source.iter_pull_requests(),
+            key=lambda item: item.id,
+        )
+        records = map_ahead(
+            self._get_record,
+            items,
+            self.config.comment_prefetch_window,
+            self.config.comment_prefetch_workers,
+        )
+        # the number of items is not known before they are all listed
+        progress = Progress(None, [self.source.throttler])
+        with progress, DumpWriter(path) as writer:
+            writer.append(
+                _PROJECT_KIND,
+                _PROJECT_KIND,
+                {
+                    "key": self.source.key,
+                    "git_url": self.source.git_url,
+                    "pull_head_refspec": self.source.pull_head_refspec,
+                },
+            )
+            for id_, kind, data in records:
+                writer.append(
+                    kind, str(id_), data, {"id": id_, "status": data["status"]}
+                )
+                phase = Phase.issues if kind == TargetTypes.issue.name else Phase.prs
+                progress.advance(phase)
+
+            for release in self.source.get_releases():
+                record = ReleaseRecord.from_ogr(release.release)
+                writer.append(
+                    TargetTypes.release.name, record.tag_name, record.to_dict()
+                )
+                progress.advance(Phase.releases)
+
+        if include_repository:
+            self._add_repository(_get_bundle_path(path))
+
+        return path
@@ -0,0 +1,132 @@
+"""
+Asynchronous execution of API calls with ordering constraints.
+"""
+
+import asyncio
+from typing import Any, Callable, Coroutine, Iterable, List, Optional, Set
+
+
+class TransferEngine:
+    """
+    Runs calls concurrently, at most `concurrency` of them at a time, while
+     keeping the order which is required between them.
+
+    Every call may depend on previously submitted calls and starts only after they
+     finish. Ordered calls (creating issues and PRs whose IDs must match) run
+     strictly one after another in the order they were submitted. Deferred calls
+     (e.g. closing of gap fillers) have their own slots and don't count towards
+     `max_pending`, so their backlog never holds back the ordered calls. Calls
+     are blocking (ogr is synchronous), so they run in threads.
+    """
+
+    def __init__(self, concurrency: int, max_pending: Optional[int] = None) -> None:
+        """
+        Args:
+            concurrency: max number of calls running at once
+            max_pending: max number of submitted unfinished calls, submitting
+                waits when it is reached, defaults to 4 times the concurrency
+        """
+        self.concurrency = max(concurrency, 1)
+        self.max_pending = max_pending or 4 * self.concurrency
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._deferred_semaphore = asyncio.Semaphore(self.concurrency)
+        self._last_ordered: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        self._deferred: Set[asyncio.Task] = set()
+        # exceptions of failed calls in the order they failed
+        self._failures: List[BaseException] = []
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        self._deferred.discard(task)
+        if task.cancelled():
+            return
+
+        exception = task.exception()
+        if exception is not None:
+            self._failures.append(exception)
+
+    async def _run(
+        self,
+        func: Callable[[], Any],
+        after: List[asyncio.Task],
+        semaphore: asyncio.Semaphore,
+    ) -> Any:
+        for dependency in after:
+            # failure of a dependency fails the dependent call too
+            await dependency
+
+        async with semaphore:
+            return await asyncio.to_thread(func)
+
+    def submit(
+        self,
+        func: Callable[[], Any],
+        after: Iterable[asyncio.Task] = (),
+        ordered: bool = False,
+        deferred: bool = False,
+    ) -> asyncio.Task:
+        """
+        Schedules the call.
+
+        Args:
+            func: blocking call to run
+            after: calls which must finish before this one starts
+            ordered: run after all the previously submitted ordered calls
+            deferred: run in the background, out of the `max_pending` limit
+
+        Returns:
+            Task which results in the return value of the call.
+        """
+        dependencies = list(after)
+        if ordered and self._last_ordered is not None:
+            dependencies.append(self._last_ordered)
+
+        semaphore = self._deferred_semaphore if deferred else self._semaphore
+        task = self.spawn(self._run(func, dependencies, semaphore), deferred)
+        if ordered:
+            self._last_ordered = task
+
+        return task
+
+    def spawn(
+        self, coroutine: Coroutine[Any, Any, Any], deferred: bool = False
+    ) -> asyncio.Task:
+        """
+        Schedules a coroutine which may submit more calls (e.g. after it gets
+         results of other calls). It is waited for and its failure is raised the
+         same way as for calls.
+        """
+        task = asyncio.ensure_future(coroutine)
+        (self._deferred if deferred else self._pending).add(task)
+        task.add_done_callback(self._on_done)
+        return task
+
+    def _raise_failed(self) -> None:
+        if self._failures:
+            raise self._failures[0]
+
+    async def wait_for_capacity(self) -> None:
+        """
+        Waits until more calls can be submitted. Raises the first failure, so
+         nothing more is submitted after a call fails.
+        """
+        self._raise_failed()
+        while len(self._pending) >= self.max_pending:
+            await asyncio.wait(self._pending, return_when=asyncio.FIRST_COMPLETED)
+            self._raise_failed()
+
+    async def join(self) -> None:
+        """Waits for all the submitted calls and raises the first failure."""
+        while self._pending or self._deferred:
+            await asyncio.wait(self._pending | self._deferred)
+
+        self._raise_failed()
+
+    async def cancel(self) -> None:
+        """Cancels the calls which have not started yet and waits for the rest."""
+        for task in self._pending | self._deferred:
+            task.cancel()
+
+        while self._pending or self._deferred:
+            await asyncio.wait(self._pending | self._deferred)
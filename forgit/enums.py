@@ -11,3 +11,18 @@ class TargetTypes(Enum):
 class PostType(str, Enum):
     pr = "PR"
     issue = "issue"
+
+
+class Phase(str, Enum):
+    issues = "issues"
+    prs = "PRs"
+    gap_fillers = "gap fillers"
+    branches = "branches"
+    releases = "releases"
+
+
+class Action(str, Enum):
+    post_issue = "post issue"
+    post_pr = "post PR"
+    fill_gap = "fill gap"
+    skip = "skip"
@@ -1,6 +1,19 @@
+from typing import Optional
+
+
 class GitConvertorException(Exception):
     pass
 
 
 class PagureGitConvertorException(GitConvertorException):
     pass
+
+
+class GitHubImportException(GitConvertorException):
+    def __init__(
+        self, message: str, status: Optional[int] = None, headers: Optional[dict] = None
+    ) -> None:
+        super().__init__(message)
+        # read by the throttler to recognize rate limiting
+        self.status = status
+        self.headers = headers or {}
@@ -1,28 +1,17 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Union
 
-from ogr.abstract import Comment as OgrComment, IssueStatus, PRStatus
+from ogr.abstract import IssueStatus, PRStatus
 from ogr.abstract import Issue as OgrIssue
 from ogr.abstract import PullRequest as OgrPullRequest
 from ogr.abstract import Release as OgrRelease
 
 from forgit.config import ConfigSchema
 from forgit.forges.comment import IssueComment
+from forgit.forges.record import PullRequestRecord, ReleaseRecord
 from forgit.messages import USE_SUBCLASS
 
 
-class Comment:
-    def __init__(self, comment: OgrComment) -> None:
-        self.comment = comment
-
-    @property
-    def created(self) -> datetime:
-        return self.comment.created
-
-    def get_comment(self) -> str:
-        raise NotImplementedError(USE_SUBCLASS)
-
-
 class Schema:
     def __init__(self, config: ConfigSchema) -> None:
         self.config = config
@@ -41,11 +30,11 @@ class Issue(Schema):
         self.author: str = issue.author
 
         # Lazy required properties
-        self._comments: List[IssueComment] = []
+        self._comments: Optional[List[IssueComment]] = None
 
     @property
     def comments(self) -> List[IssueComment]:
-        if not self._comments:
+        if self._comments is not None:
             return self._comments
 
         result = []
@@ -74,6 +63,18 @@ class Issue(Schema):
             return None
         return self.issue.url
 
+    def get_comment_count(self) -> Optional[int]:
+        """
+        Number of comments if it is known without reading them (e.g. from
+         the listing the item comes from), otherwise None.
+        """
+        if self._comments is not None:
+            return len(self._comments)
+        return None
+
+    def get_updated(self) -> datetime:
+        raise NotImplementedError(USE_SUBCLASS)
+
 
 class PullRequest(Schema):
     def __init__(self, config: ConfigSchema, pull_request: OgrPullRequest) -> None:
@@ -88,7 +89,7 @@ class PullRequest(Schema):
         self.author: str = pull_request.author
 
         # Lazy required properties
-        self._comments: List[IssueComment] = []
+        self._comments: Optional[List[IssueComment]] = None
 
     @property
     def url(self) -> Optional[str]:
@@ -123,7 +124,7 @@ class PullRequest(Schema):
 
     @property
     def comments(self) -> List[IssueComment]:
-        if not self._comments:
+        if self._comments is not None:
             return self._comments
 
         result = []  # TODO: convert to pr comments
@@ -133,17 +134,39 @@ class PullRequest(Schema):
         self._comments = result
         return self._comments
 
+    def get_comment_count(self) -> Optional[int]:
+        """
+        Number of comments if it is known without reading them (e.g. from
+         the listing the item comes from), otherwise None.
+        """
+        if self._comments is not None:
+            return len(self._comments)
+        return None
+
+    def get_updated(self) -> datetime:
+        raise NotImplementedError(USE_SUBCLASS)
+
     @property
     def new_sha(self) -> str:
-        pass
+        return self.pull_request.head_commit
 
     @property
     def old_sha(self) -> str:
-        pass
+        # offline copies already carry it, ogr doesn't provide it
+        if isinstance(self.pull_request, PullRequestRecord):
+            return self.pull_request.base_commit
+
+        return self._get_base_commit()
+
+    def _get_base_commit(self) -> str:
+        """Revision of the target branch the PR is based on."""
+        raise NotImplementedError(USE_SUBCLASS)
 
 
 class Release(Schema):
-    def __init__(self, config: ConfigSchema, release: OgrRelease) -> None:
+    def __init__(
+        self, config: ConfigSchema, release: Union[OgrRelease, ReleaseRecord]
+    ) -> None:
         super().__init__(config=config)
         self.release = release
 
@@ -152,3 +175,17 @@ class Release(Schema):
     @property
     def tag(self) -> str:
         return self.release.tag_name
+
+    @property
+    def title(self) -> str:
+        return self.release.title
+
+    @property
+    def body(self) -> str:
+        return self.release.body
+
+    @property
+    def created(self) -> Optional[datetime]:
+        if not self.config.preserve_datetime:
+            return None
+        return self.release.created_at
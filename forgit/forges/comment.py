@@ -1,12 +1,29 @@
-from forgit.forges.abstract import Comment
-from forgit.messages import NOT_IMPLEMENTED
+from datetime import datetime
 
+from ogr.abstract import Comment as OgrComment
+
+
+class Comment:
+    __slots__ = ("comment",)
+
+    def __init__(self, comment: OgrComment) -> None:
+        self.comment = comment
+
+    @property
+    def created(self) -> datetime:
+        return self.comment.created
+
+    @property
+    def author(self) -> str:
+        return self.comment.author
 
-class IssueComment(Comment):
     def get_comment(self) -> str:
-        raise NotImplementedError(NOT_IMPLEMENTED)
+        return self.comment.body
+
+
+class IssueComment(Comment):
+    __slots__ = ()
 
 
 class PullRequestComment(Comment):
-    def get_comment(self) -> str:
-        raise NotImplementedError(NOT_IMPLEMENTED)
+    __slots__ = ()
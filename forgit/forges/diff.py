@@ -1,27 +1,128 @@
+import gzip
+import lzma
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from shutil import copyfileobj
 from subprocess import Popen, PIPE
+from tempfile import TemporaryFile
+from typing import Iterable, Tuple, Optional, BinaryIO, Callable, Dict, IO, Any, cast
+
+from forgit.constants import DIFF_CHUNK_SIZE
+
+# old sha, new sha, PR ID
+DiffSpec = Tuple[str, str, int]
+
+# compression -> function opening the file and suffix of the file, the functions
+#  return binary files when opened in binary mode
+_COMPRESSIONS: Dict[Optional[str], Tuple[Callable[..., Any], str]] = {
+    None: (open, ""),
+    "gzip": (gzip.open, ".gz"),
+    "xz": (lzma.open, ".xz"),
+}
 
 
 class Diff:
-    def __init__(self, new_hash: str, old_hash: str) -> None:
+    def __init__(
+        self,
+        new_hash: str,
+        old_hash: str,
+        repo_path: Path,
+        compression: Optional[str] = None,
+    ) -> None:
         self._new_hash = new_hash
         self._old_hash = old_hash
+        self._repo_path = repo_path
+        self._compression = compression
 
-    def _generate_diff(self) -> str:
-        process = Popen(["git", "diff", self._old_hash, self._new_hash], stdout=PIPE)
-        stdout, stderr = process.communicate()
-        if stderr:
-            raise IOError(
-                f"`git diff {self._old_hash} {self._new_hash}` failed. "
-                f"Reason: {stderr.decode()}"
+    def _write_diff(self, patch_file: BinaryIO) -> None:
+        """
+        Streams output of `git diff` to the file as is, chunk by chunk, so memory
+         usage doesn't depend on the size of the diff.
+        """
+        with TemporaryFile() as stderr:
+            process = Popen(
+                [
+                    "git",
+                    "-C",
+                    str(self._repo_path),
+                    "diff",
+                    "--binary",
+                    self._old_hash,
+                    self._new_hash,
+                ],
+                stdout=PIPE,
+                stderr=stderr,
             )
+            # it is a pipe, never None
+            stdout = cast(IO[bytes], process.stdout)
+            try:
+                copyfileobj(stdout, patch_file, DIFF_CHUNK_SIZE)
+            except BaseException:
+                # e.g. full disk, don't leave git running with nobody reading it
+                process.kill()
+                raise
+            finally:
+                stdout.close()
+                returncode = process.wait()
 
-        return stdout.decode()
+            if returncode != 0:
+                stderr.seek(0)
+                raise IOError(
+                    f"`git diff {self._old_hash} {self._new_hash}` failed. "
+                    f"Reason: {stderr.read().decode(errors='replace')}"
+                )
 
-    def place_diff_to_directory(self, directory: Path, pr_id: int) -> None:
+    def place_diff_to_directory(self, directory: Path, pr_id: int) -> Path:
+        """
+        Returns:
+            Path to the stored patch.
+        """
         if not directory.is_dir():
             # this should be checked in the config schema
             raise FileNotFoundError(f"{directory} is not a directory.")
 
-        with open(directory / f"{pr_id}.patch", "w") as patch_file:
-            patch_file.write(self._generate_diff())
+        open_func, suffix = _COMPRESSIONS[self._compression]
+        patch_path = directory / f"{pr_id}.patch{suffix}"
+        # don't leave half-written patch behind if git fails
+        tmp_path = patch_path.with_name(f".{patch_path.name}.tmp")
+        try:
+            with open_func(tmp_path, "wb") as patch_file:
+                self._write_diff(patch_file)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        tmp_path.replace(patch_path)
+        return patch_path
+
+
+def place_diffs_to_directory(
+    repo_path: Path,
+    diffs: Iterable[DiffSpec],
+    directory: Path,
+    workers: Optional[int] = None,
+    compression: Optional[str] = None,
+) -> None:
+    """
+    Generates patches of many PRs at once. `git diff` processes run concurrently,
+     at most `workers` of them at a time.
+
+    Args:
+        repo_path: path to the repository with all the commits
+        diffs: old sha, new sha and PR ID of each patch
+        directory: where to store the patches
+        workers: max number of concurrent `git diff` processes, defaults to
+            the default of ThreadPoolExecutor
+        compression: compress the patches on the fly, "gzip" or "xz"
+    """
+
+    def place(spec: DiffSpec) -> None:
+        old_sha, new_sha, pr_id = spec
+        Diff(new_sha, old_sha, repo_path, compression).place_diff_to_directory(
+            directory, pr_id
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # consume the results, so the first failure is raised
+        for _ in executor.map(place, diffs):
+            pass
@@ -2,35 +2,109 @@
 Prepare branches for creating PRs.
 """
 
+from hashlib import sha256
 from pathlib import Path
-from tempfile import mkdtemp
-from typing import List
+from tempfile import mkdtemp, TemporaryFile
+from typing import List, Optional, Dict
 
 from git import Repo
 
+# bare clones have no fetch refspec configured, branches are mirrored 1:1
+MIRROR_REFSPECS = ["+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"]
+
+
+def get_mirror_location(cache_dir: Path, url: str) -> Path:
+    return cache_dir / f"{sha256(url.encode()).hexdigest()[:16]}.git"
+
 
 class GitCliApi:
-    def __init__(self, ssh_url: str) -> None:
+    def __init__(
+        self,
+        ssh_url: str,
+        ref_only: bool = True,
+        cache_dir: Optional[Path] = None,
+        partial_clone: bool = True,
+    ) -> None:
+        """
+        Args:
+            ssh_url: URL of the repository to clone
+            ref_only: clone the repository as bare and create branches only as refs
+                pointing to commits, without checking them out
+            cache_dir: directory with mirrors of repositories which are reused
+                across runs (only in ref only mode), temporary clone is used if not
+                set
+            partial_clone: clone without blobs, they are fetched when needed
+        """
         self.ssh_url = ssh_url
-        self._repo_location = Path(mkdtemp())
+        self.ref_only = ref_only
+        self.partial_clone = partial_clone
+        if cache_dir is not None and ref_only:
+            self._repo_location = get_mirror_location(cache_dir, ssh_url)
+        else:
+            self._repo_location = Path(mkdtemp())
 
         # Lazy properties
-        self._repo = None
+        self._repo: Optional[Repo] = None
+
+    def _clone(self) -> Repo:
+        # servers which don't support filters just ignore it
+        options = ["--filter=blob:none"] if self.partial_clone else []
+        return Repo.clone_from(
+            self.ssh_url, self._repo_location, bare=self.ref_only, multi_options=options
+        )
+
+    def _update_mirror(self) -> Repo:
+        repo = Repo(self._repo_location)
+        repo.git.fetch("--prune", "origin", *MIRROR_REFSPECS)
+        return repo
 
     @property
     def repo(self) -> Repo:
         if self._repo is not None:
             return self._repo
 
-        self._repo = Repo.clone_from(self.ssh_url, self._repo_location)
+        if (self._repo_location / "HEAD").is_file():
+            self._repo = self._update_mirror()
+        else:
+            self._repo_location.mkdir(parents=True, exist_ok=True)
+            self._repo = self._clone()
+
         return self._repo
 
     def create_branch_and_reset_to(self, branch_name: str, commit_sha: str) -> None:
+        if self.ref_only:
+            # only writes the ref, index and working tree are untouched
+            self.repo.create_head(branch_name, commit_sha, force=True)
+            return
+
         new_branch = self.repo.create_head(branch_name)
         new_branch.checkout()
         # index and working_tree -> --hard
         self.repo.head.reset(commit_sha, index=True, working_tree=True)
 
+    def fetch(self, url: str, refspecs: List[str]) -> None:
+        """Fetches all the refs from the URL at once."""
+        self.repo.git.fetch(url, *refspecs)
+
+    def create_branches(self, branches: Dict[str, str]) -> None:
+        """
+        Creates all the branches (name -> revision) at once.
+        """
+        if not self.ref_only:
+            for branch_name, revision in branches.items():
+                self.create_branch_and_reset_to(branch_name, revision)
+            return
+
+        # single git process and single transaction instead of process per branch
+        updates = "".join(
+            f"update refs/heads/{branch_name} {revision}\n"
+            for branch_name, revision in branches.items()
+        )
+        with TemporaryFile() as stdin:
+            stdin.write(updates.encode())
+            stdin.seek(0)
+            self.repo.git.update_ref("--stdin", istream=stdin)
+
     def push_branches(self, branches: List[str]) -> None:
         # TODO: error handling
         self.repo.git.push("origin", *branches)
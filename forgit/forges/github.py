@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 from ogr.abstract import PullRequest as OgrPullRequest
@@ -22,11 +23,24 @@ class GitHubIssue(Issue):
             return None
         return self.issue.assignees
 
+    def get_comment_count(self) -> int | None:
+        # part of the listing, unlike in the listing of PRs
+        return self.issue._raw_issue.comments
+
+    def get_updated(self) -> datetime:
+        return self.issue._raw_issue.updated_at
+
 
 class GitHubPullRequest(PullRequest):
     def __init__(self, config: ConfigSchema, pull_request: OgrPullRequest) -> None:
         super().__init__(config=config, pull_request=pull_request)
 
+    def get_updated(self) -> datetime:
+        return self.pull_request._raw_pr.updated_at
+
+    def _get_base_commit(self) -> str:
+        return self.pull_request._raw_pr.base.sha
+
 
 class GitHubRelease(Release):
     def __init__(self, config: ConfigSchema, release: OgrRelease) -> None:
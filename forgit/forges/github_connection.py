@@ -0,0 +1,143 @@
+"""
+Connection of PyGithub which sends requests through the HTTP cache and spreads
+ reads over the token pool of the project, and the GitHub service of ogr which
+ reaches the API at any URL.
+"""
+
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Dict, Optional, Type
+
+import github
+import requests
+from github.Requester import (
+    HTTPRequestsConnectionClass,
+    HTTPSRequestsConnectionClass,
+    Requester,
+    RequestsResponse,
+)
+from ogr.services.github import GithubService
+from ogr.services.github.auth_providers.token import TokenAuthentication
+from urllib3.util import Retry
+
+from forgit.forges.token_pool import GitHubTokenPool, get_token_pool
+from forgit.http_cache import CachingAdapter, HttpCache
+
+
+class _ApiUrlTokenAuthentication(TokenAuthentication):
+    def __init__(self, token: str, api_url: str, max_retries: Retry) -> None:
+        self._token = token
+        self._pygithub_instance = github.Github(
+            base_url=api_url, login_or_token=token, retry=max_retries
+        )
+
+
+class GitHubApiService(GithubService):
+    """
+    ogr always reaches https://api.github.com, this service reaches the API at
+     the given URL, e.g. of GitHub Enterprise.
+    """
+
+    def __init__(self, token: str, api_url: str) -> None:
+        self.api_url = api_url
+        self._token = token
+        # no retries, the same as the default of ogr, which builds them with
+        # an argument urllib3 2 doesn't accept
+        max_retries = Retry(total=0, read=0)
+        super().__init__(
+            github_authentication=_ApiUrlTokenAuthentication(
+                token, api_url, max_retries
+            ),
+            max_retries=max_retries,
+        )
+
+    def get_pygithub_instance(self, namespace: str, repo: str) -> github.Github:
+        return github.Github(
+            base_url=self.api_url, login_or_token=self._token, retry=self._max_retries
+        )
+
+
+@lru_cache(maxsize=None)
+def get_github_connection_class(
+    cache: Optional[HttpCache], base: Type[Any] = HTTPSRequestsConnectionClass
+) -> Type[Any]:
+    """
+    Returns connection class for PyGithub, it is set by
+     `Requester.injectConnectionClasses`.
+
+    Args:
+        cache: cache of responses, requests are not cached if not set
+        base: connection class of PyGithub for HTTPS or HTTP
+    """
+    lock = Lock()
+
+    class GitHubConnection(base):  # type: ignore
+        # PyGithub creates a connection per request once connection classes are
+        # injected, they share one session, so connections to GitHub are reused
+        shared_session: Optional[requests.Session] = None
+        session: requests.Session
+
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            cls = type(self)
+            with lock:
+                if cls.shared_session is None:
+                    if cache is not None:
+                        self.session.mount(
+                            f"{self.protocol}://",
+                            CachingAdapter(
+                                cache,
+                                max_retries=self.retry,
+                                pool_connections=self.pool_size,
+                                pool_maxsize=self.pool_size,
+                            ),
+                        )
+                    cls.shared_session = self.session
+
+            self.session = cls.shared_session
+            self.pool: Optional[GitHubTokenPool] = None
+            self.token: Optional[str] = None
+
+        def request(
+            self,
+            verb: str,
+            url: str,
+            input: Any,
+            headers: Dict[str, str],
+            stream: bool = False,
+        ) -> None:
+            # "token <token>"
+            scheme, _, token = headers.get("Authorization", "").partition(" ")
+            self.pool = get_token_pool(token)
+            if self.pool is not None:
+                self.token = self.pool.acquire(verb, url)
+                headers = {**headers, "Authorization": f"{scheme} {self.token}"}
+
+            super().request(verb, url, input, headers, stream)
+
+        def getresponse(self) -> RequestsResponse:
+            response = super().getresponse()
+            if self.pool is not None and self.token is not None:
+                self.pool.update(self.token, response.headers)
+            return response
+
+        def close(self) -> None:
+            # the shared session is used by other connections
+            pass
+
+    return GitHubConnection
+
+
+def inject_github_connection_classes(cache: Optional[HttpCache]) -> None:
+    """
+    Sends requests of PyGithub through the HTTP cache and the token pools. Only
+     PyGithub instances created afterwards are affected, they pick the connection
+     class when they are created.
+
+    Args:
+        cache: cache of responses, requests are not cached if not set
+    """
+    Requester.injectConnectionClasses(
+        get_github_connection_class(cache, HTTPRequestsConnectionClass),
+        get_github_connection_class(cache, HTTPSRequestsConnectionClass),
+    )
@@ -0,0 +1,150 @@
+"""
+Client of the GitHub issue import API.
+
+The import API creates an issue together with its comments, closed state and
+ original dates in a single request. Imports are processed asynchronously, so
+ their status is polled; one poll reports the status of all the imports updated
+ since the oldest import which is still waiting.
+"""
+
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from threading import Lock, Thread
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+from forgit.constants import GITHUB_IMPORT_MEDIA_TYPE
+from forgit.exceptions import GitHubImportException
+from forgit.throttling import Throttler
+
+
+class GitHubIssueImporter:
+    def __init__(
+        self,
+        token: str,
+        namespace: str,
+        repo: str,
+        api_url: str,
+        throttler: Throttler,
+        poll_interval: float,
+    ) -> None:
+        """
+        Args:
+            token: GitHub token with write access to the repository
+            namespace: owner of the repository
+            repo: name of the repository
+            api_url: URL of the GitHub API, e.g. https://api.github.com
+            throttler: throttler of the target project
+            poll_interval: seconds between polls of import statuses
+        """
+        self.url = f"{api_url.rstrip('/')}/repos/{namespace}/{repo}/import/issues"
+        self.throttler = throttler
+        self.poll_interval = poll_interval
+        self.session = requests.Session()
+        self.session.headers.update(
+            {"Authorization": f"token {token}", "Accept": GITHUB_IMPORT_MEDIA_TYPE}
+        )
+
+        # import ID -> time the import was created and its result
+        self._waiting: Dict[int, Tuple[datetime, Future]] = {}
+        self._poller: Optional[Thread] = None
+        self._lock = Lock()
+
+    def _send(self, method: str, url: str, **kwargs: Any) -> Any:
+        response = self.session.request(method, url, **kwargs)
+        if not response.ok:
+            raise GitHubImportException(
+                f"{method} {url} failed: {response.status_code} {response.text}",
+                status=response.status_code,
+                headers=dict(response.headers),
+            )
+
+        return response.json()
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> Any:
+        return self.throttler.call(
+            self._send, method, url, write=method == "POST", **kwargs
+        )
+
+    @staticmethod
+    def _get_issue_number(status: Dict[str, Any]) -> int:
+        return int(status["issue_url"].rstrip("/").rsplit("/", 1)[-1])
+
+    def _resolve(self, status: Dict[str, Any]) -> None:
+        # the lock is held by the caller
+        if status["status"] == "pending" or status["id"] not in self._waiting:
+            return
+
+        _, future = self._waiting.pop(status["id"])
+        if status["status"] == "imported":
+            future.set_result(self._get_issue_number(status))
+        else:
+            future.set_exception(
+                GitHubImportException(
+                    f"Import {status['id']} failed: {status.get('errors')}"
+                )
+            )
+
+    def _poll(self) -> None:
+        while True:
+            with self._lock:
+                if not self._waiting:
+                    # cleared under the lock, so new imports start a new poller
+                    self._poller = None
+                    return
+
+            time.sleep(self.poll_interval)
+            with self._lock:
+                # imports resolved before the oldest waiting one are not listed again
+                since = min(created for created, _ in self._waiting.values())
+            try:
+                statuses = self._request(
+                    "GET", self.url, params={"since": since.isoformat()}
+                )
+            except Exception as exc:
+                with self._lock:
+                    for _, future in self._waiting.values():
+                        future.set_exception(exc)
+                    self._waiting.clear()
+                    self._poller = None
+                return
+
+            with self._lock:
+                for status in statuses:
+                    self._resolve(status)
+
+    def submit(self, payload: Dict[str, Any]) -> Future:
+        """
+        Submits the import.
+
+        Returns:
+            Future which results in the number of the imported issue.
+        """
+        submitted = datetime.now(timezone.utc)
+        status = self._request("POST", self.url, json=payload)
+        if "created_at" in status:
+            # time of GitHub, so the listing isn't affected by the local clock
+            submitted = datetime.fromisoformat(
+                status["created_at"].replace("Z", "+00:00")
+            )
+
+        future: Future = Future()
+        with self._lock:
+            self._waiting[status["id"]] = submitted, future
+            self._resolve(status)
+            if self._waiting and self._poller is None:
+                self._poller = Thread(target=self._poll, daemon=True)
+                self._poller.start()
+
+        return future
+
+    def import_issue(self, payload: Dict[str, Any]) -> int:
+        """
+        Imports the issue and waits until it is created.
+
+        Returns:
+            Number of the created issue.
+        """
+        return self.submit(payload).result()
@@ -1,3 +1,6 @@
+from datetime import datetime
+from typing import Optional
+
 from ogr.abstract import Issue as OgrIssue
 from ogr.abstract import PullRequest as OgrPullRequest
 from ogr.abstract import Release as OgrRelease
@@ -6,15 +9,35 @@ from forgit.config import ConfigSchema
 from forgit.forges.abstract import Issue, PullRequest, Release
 
 
+def _parse_gitlab_datetime(value: str) -> datetime:
+    # GitLab API returns e.g. 2022-09-01T12:00:00.000Z
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
 class GitLabIssue(Issue):
     def __init__(self, config: ConfigSchema, issue: OgrIssue) -> None:
         super().__init__(config=config, issue=issue)
 
+    def get_comment_count(self) -> Optional[int]:
+        return self.issue._raw_issue.user_notes_count
+
+    def get_updated(self) -> datetime:
+        return _parse_gitlab_datetime(self.issue._raw_issue.updated_at)
+
 
 class GitLabPullRequest(PullRequest):
     def __init__(self, config: ConfigSchema, pull_request: OgrPullRequest) -> None:
         super().__init__(config=config, pull_request=pull_request)
 
+    def get_comment_count(self) -> Optional[int]:
+        return self.pull_request._raw_pr.user_notes_count
+
+    def get_updated(self) -> datetime:
+        return _parse_gitlab_datetime(self.pull_request._raw_pr.updated_at)
+
+    def _get_base_commit(self) -> str:
+        return self.pull_request._raw_pr.diff_refs["base_sha"]
+
 
 class GitLabRelease(Release):
     def __init__(self, config: ConfigSchema, release: OgrRelease) -> None:
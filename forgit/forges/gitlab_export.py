@@ -0,0 +1,310 @@
+"""
+Offline GitLab target, writes a GitLab project export archive.
+
+The archive has the layout GitLab uses for its project exports (NDJSON tree):
+
+    VERSION
+    GITLAB_VERSION
+    project.bundle
+    tree/project.json
+    tree/project/issues.ndjson
+    tree/project/merge_requests.ndjson
+    tree/project/releases.ndjson
+    tree/project/labels.ndjson
+
+It is imported to GitLab in one operation, so the migration itself makes no API
+ calls on the target. Issues and merge requests are streamed from the source
+ one kind after the other and every item is written as one line as soon as it
+ is read, so only the items read ahead of the writer are held in memory.
+"""
+
+import json
+import tarfile
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from ogr.abstract import IssueStatus, PRStatus
+
+from forgit.config import ConfigSchema
+from forgit.constants import (
+    GITLAB_EXPORT_VERSION,
+    GITLAB_EXPORT_GITLAB_VERSION,
+    GITLAB_LABEL_COLOR,
+    REPOS_DIR_NAME,
+)
+from forgit.enums import Phase, PostType
+from forgit.forges.git_cli_api import GitCliApi
+from forgit.forges.gitlab import GitLabIssue, GitLabPullRequest, GitLabRelease
+from forgit.messages import HEADER_TEMPLATE
+from forgit.parser import ParsedData, parse_data
+from forgit.prefetch import map_ahead
+from forgit.progressbar import Progress
+from forgit.utils import get_names
+
+_RELATIONS = ("issues", "merge_requests", "releases", "labels")
+
+_PR_STATES = {
+    PRStatus.open: "opened",
+    PRStatus.closed: "closed",
+    PRStatus.merged: "merged",
+}
+
+
+def _format_datetime(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class GitLabExportArchive:
+    """
+    Writer of the archive. Relations are streamed to files in a temporary
+     directory which is packed on `close`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._directory = Path(mkdtemp())
+        tree = self._directory / "tree" / "project"
+        tree.mkdir(parents=True)
+        self._files: Dict[str, IO[str]] = {
+            relation: open(tree / f"{relation}.ndjson", "w") for relation in _RELATIONS
+        }
+        self._labels: Dict[str, None] = {}
+
+    def __enter__(self) -> "GitLabExportArchive":
+        return self
+
+    def __exit__(self, exc_type: Any, *_) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def _write(self, relation: str, data: Dict[str, Any]) -> None:
+        self._files[relation].write(json.dumps(data) + "\n")
+
+    def _get_label_links(self, labels: Optional[List[Any]]) -> List[Dict[str, Any]]:
+        links = []
+        for label in get_names(labels):
+            self._labels[label] = None
+            links.append({"label": {"title": label, "type": "ProjectLabel"}})
+
+        return links
+
+    @staticmethod
+    def _get_notes(
+        comments: List[Any], noteable_type: str, created: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        return [
+            {
+                "note": comment.get_comment(),
+                "noteable_type": noteable_type,
+                "author": {"name": comment.author},
+                "created_at": _format_datetime(comment.created) or created,
+                "updated_at": _format_datetime(comment.created) or created,
+            }
+            for comment in sorted(comments, key=lambda item: item.created)
+        ]
+
+    def add_issue(self, iid: int, data: Dict[str, Any], description: str) -> None:
+        created = _format_datetime(data["created"])
+        self._write(
+            "issues",
+            {
+                "iid": iid,
+                "title": data["title"],
+                "description": description,
+                "state": (
+                    "closed" if data["status"] == IssueStatus.closed else "opened"
+                ),
+                "created_at": created,
+                "updated_at": created,
+                "label_links": self._get_label_links(data["labels"]),
+                "notes": self._get_notes(data["comments"], "Issue", created),
+            },
+        )
+
+    def add_merge_request(
+        self, iid: int, data: Dict[str, Any], description: str
+    ) -> None:
+        created = _format_datetime(data["created"])
+        self._write(
+            "merge_requests",
+            {
+                "iid": iid,
+                "title": data["title"],
+                "description": description,
+                "state": _PR_STATES[data["status"]],
+                "source_branch": data["source_branch"],
+                "target_branch": data["target_branch"],
+                "created_at": created,
+                "updated_at": created,
+                "label_links": self._get_label_links(data["labels"]),
+                "notes": self._get_notes(data["comments"], "MergeRequest", created),
+                "merge_request_diff": {
+                    "state": "collected",
+                    "base_commit_sha": data["old_sha"],
+                    "start_commit_sha": data["old_sha"],
+                    "head_commit_sha": data["new_sha"],
+                    "merge_request_diff_commits": [],
+                    "merge_request_diff_files": [],
+                },
+            },
+        )
+
+    def add_release(self, data: Dict[str, Any]) -> None:
+        created = _format_datetime(data["created"])
+        self._write(
+            "releases",
+            {
+                "tag_name": data["tag"],
+                "name": data["title"],
+                "description": data["body"],
+                "created_at": created,
+                "released_at": created,
+            },
+        )
+
+    def add_repository(self, git_cli_api: GitCliApi) -> None:
+        """Bundles all the refs of the repository."""
+        bundle = self._directory / "project.bundle"
+        git_cli_api.repo.git.bundle("create", str(bundle), "--all")
+
+    def _write_metadata(self) -> None:
+        for label in self._labels:
+            self._write(
+                "labels",
+                {"title": label, "color": GITLAB_LABEL_COLOR, "type": "ProjectLabel"},
+            )
+
+        for file in self._files.values():
+            file.close()
+
+        (self._directory / "VERSION").write_text(GITLAB_EXPORT_VERSION)
+        (self._directory / "GITLAB_VERSION").write_text(GITLAB_EXPORT_GITLAB_VERSION)
+        (self._directory / "tree" / "project.json").write_text(
+            json.dumps({"description": "", "visibility_level": 0})
+        )
+
+    def close(self) -> Path:
+        """
+        Returns:
+            Path to the written archive.
+        """
+        self._write_metadata()
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        try:
+            with tarfile.open(tmp_path, "w:gz") as archive:
+                for item in sorted(self._directory.iterdir()):
+                    archive.add(item, arcname=item.name)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            rmtree(self._directory)
+
+        tmp_path.replace(self.path)
+        return self.path
+
+    def discard(self) -> None:
+        for file in self._files.values():
+            file.close()
+
+        rmtree(self._directory, ignore_errors=True)
+
+
+class GitLabExporter:
+    """
+    Migrates the source project to a GitLab export archive.
+    """
+
+    def __init__(self, source: Any, config: ConfigSchema) -> None:
+        """
+        Args:
+            source: source project (forge or snapshot project)
+            config: forgit config
+        """
+        self.source = source
+        self.config = config
+
+    def _get_description(self, what: PostType, data: Dict[str, Any]) -> str:
+        header = HEADER_TEMPLATE.format(
+            what=what.value, link=data["url"], date=data["created"], user=data["author"]
+        )
+        return header + (data["description"] or "")
+
+    def _get_git_cli_api(self) -> GitCliApi:
+        git_cli_api = GitCliApi(
+            self.source.git_url,
+            cache_dir=self.config.cache_path / REPOS_DIR_NAME,
+            partial_clone=False,
+        )
+        # commits of MRs, also from forks
+        git_cli_api.fetch(self.source.git_url, [self.source.pull_head_refspec])
+        return git_cli_api
+
+    @staticmethod
+    def _read_item(kind: PostType, item: Any) -> Tuple[PostType, int, ParsedData]:
+        # comments are read from the source here, in a worker thread
+        target_type = GitLabIssue if kind == PostType.issue else GitLabPullRequest
+        return kind, item.id, parse_data(item, target_type).resolve()
+
+    def _read_items(self) -> Iterator[Tuple[PostType, int, ParsedData]]:
+        """
+        Yields issues and then merge requests, each with its kind, as GitLab
+         numbers them separately and their IDs collide.
+        """
+        streams = (
+            (PostType.issue, self.source.iter_issues()),
+            (PostType.pr, self.source.iter_pull_requests()),
+        )
+        for kind, items in streams:
+            yield from map_ahead(
+                partial(self._read_item, kind),
+                items,
+                self.config.comment_prefetch_window,
+                self.config.comment_prefetch_workers,
+            )
+
+    def export(self, path: Path, include_repository: bool = True) -> Path:
+        """
+        Items are read by `comment_prefetch_workers` threads, at most
+         `comment_prefetch_window` of them ahead of the writer.
+
+        Args:
+            path: where to write the archive (.tar.gz)
+            include_repository: bundle the git repository into the archive
+
+        Returns:
+            Path to the written archive.
+        """
+        # the number of items is not known before they are all listed
+        progress = Progress(None, [self.source.throttler])
+        with progress, GitLabExportArchive(path) as archive:
+            # IDs are set explicitly in the archive, gaps between them don't matter
+            for kind, id_, data in self._read_items():
+                description = self._get_description(kind, data)
+                if kind == PostType.issue:
+                    archive.add_issue(id_, data, description)
+                    progress.advance(Phase.issues)
+                else:
+                    archive.add_merge_request(id_, data, description)
+                    progress.advance(Phase.prs)
+
+            if self.config.transfer_releases:
+                for release in self.source.get_releases():
+                    archive.add_release(parse_data(release, GitLabRelease))
+                    progress.advance(Phase.releases)
+
+            if include_repository:
+                archive.add_repository(self._get_git_cli_api())
+
+        return path
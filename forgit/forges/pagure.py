@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 
 from ogr.services.pagure import PagureIssue as OgrPagureIssue
@@ -18,6 +19,13 @@ class PagureIssue(Issue):
             return None
         return self.issue.assignee
 
+    def get_comment_count(self) -> Optional[int]:
+        # Pagure lists issues with their comments
+        return len(self.issue._raw_issue["comments"])
+
+    def get_updated(self) -> datetime:
+        return datetime.fromtimestamp(int(self.issue._raw_issue["last_updated"]))
+
 
 class PagurePullRequest(PullRequest):
     def __init__(
@@ -25,6 +33,16 @@ class PagurePullRequest(PullRequest):
     ) -> None:
         super().__init__(config=config, pull_request=pull_request)
 
+    def get_comment_count(self) -> Optional[int]:
+        return len(self.pull_request._raw_pr["comments"])
+
+    def get_updated(self) -> datetime:
+        return datetime.fromtimestamp(int(self.pull_request._raw_pr["last_updated"]))
+
+    def _get_base_commit(self) -> str:
+        # Pagure knows only the first commit of the PR, the base is its parent
+        return f"{self.pull_request._raw_pr['commit_start']}^"
+
 
 class PagureRelease(Release):
     def __init__(self, config: ConfigSchema, release: OgrPagureRelease) -> None:
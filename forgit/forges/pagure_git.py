@@ -0,0 +1,79 @@
+"""
+Reading of Pagure issues and PRs from git repositories of the project.
+
+Pagure keeps every ticket (in `tickets/<namespace>/<repo>.git`) and every pull
+ request (in `requests/<namespace>/<repo>.git`) together with its comments as a
+ JSON file, in the same format its API returns. Reading them from a local mirror
+ of these repositories replaces paging through the API.
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from subprocess import PIPE, Popen
+from tempfile import TemporaryFile
+from typing import IO, Any, Dict, Iterator, List, Optional, cast
+
+from git import Repo
+
+# number of JSON files parsed by one task of a worker process
+_PARSE_CHUNK_SIZE = 64
+
+
+def _list_json_blobs(repo: Repo) -> List[str]:
+    # tickets are stored in the root of the repository, attachments in directories
+    blobs = []
+    for line in repo.git.ls_tree("HEAD").splitlines():
+        _, kind, sha_and_name = line.split(" ", 2)
+        if kind == "blob":
+            blobs.append(sha_and_name.split("\t", 1)[0])
+
+    return blobs
+
+
+def _read_blobs(repo: Repo, blobs: List[str]) -> Iterator[bytes]:
+    """Reads contents of all the blobs by a single `git cat-file` process."""
+    with TemporaryFile() as stdin:
+        stdin.write("".join(f"{blob}\n" for blob in blobs).encode())
+        stdin.seek(0)
+        process = Popen(
+            ["git", "-C", str(repo.git_dir), "cat-file", "--batch"],
+            stdin=stdin,
+            stdout=PIPE,
+        )
+        # it is a pipe, never None
+        stdout = cast(IO[bytes], process.stdout)
+        for _ in blobs:
+            # <sha> <type> <size>\n<content>\n
+            header = stdout.readline().split()
+            size = int(header[2])
+            content = stdout.read(size)
+            stdout.read(1)
+            yield content
+
+        stdout.close()
+        if process.wait() != 0:
+            raise IOError(f"`git cat-file --batch` failed in {repo.git_dir}.")
+
+
+def read_json_files(repo: Repo, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Reads and parses JSON files in the root of the repository.
+
+    Args:
+        repo: repository with tickets or pull requests
+        workers: number of processes which parse the files, parsed in this
+            process if 1, defaults to the number of CPUs
+
+    Returns:
+        Parsed files in no particular order.
+    """
+    if not repo.head.is_valid():
+        # no ticket was created yet
+        return []
+
+    contents = _read_blobs(repo, _list_json_blobs(repo))
+    if workers == 1:
+        return [json.loads(content) for content in contents]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(json.loads, contents, chunksize=_PARSE_CHUNK_SIZE))
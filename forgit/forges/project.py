@@ -1,24 +1,71 @@
-from typing import List, Dict, Union, Any
+from datetime import datetime, timezone
+from functools import partial
+from typing import (
+    List,
+    Dict,
+    Union,
+    Any,
+    Type,
+    Optional,
+    Tuple,
+    Callable,
+    Iterator,
+    cast,
+)
+from urllib.parse import urlparse
 
+from git import Repo
 from ogr.abstract import GitService, IssueStatus, PRStatus
 from ogr.abstract import GitProject as OgrGitProject
-from ogr.services.github import GithubService
+from ogr.services.github import GithubIssue as OgrGithubIssue
+from ogr.services.github import GithubProject as OgrGithubProject
+from ogr.services.github import GithubPullRequest as OgrGithubPullRequest
+from ogr.services.gitlab import GitlabIssue as OgrGitlabIssue
+from ogr.services.gitlab import GitlabProject as OgrGitlabProject
+from ogr.services.gitlab import GitlabPullRequest as OgrGitlabPullRequest
 from ogr.services.gitlab import GitlabService
+from ogr.services.pagure import PagureIssue as OgrPagureIssue
+from ogr.services.pagure import PagurePullRequest as OgrPagurePullRequest
 from ogr.services.pagure import PagureService
 
 from forgit.config import ConfigSchema
+from forgit.constants import (
+    PAGE_SIZE,
+    PAGURE_REQUESTS_DIR,
+    PAGURE_TICKETS_DIR,
+    REPOS_DIR_NAME,
+)
 from forgit.enums import PostType
-from forgit.exceptions import PagureGitConvertorException
+from forgit.exceptions import GitConvertorException, PagureGitConvertorException
+from forgit.forges.abstract import Issue, PullRequest, Release
 from forgit.forges.github import GitHubIssue, GitHubPullRequest, GitHubRelease
+from forgit.forges.git_cli_api import GitCliApi
+from forgit.forges.github_import import GitHubIssueImporter
 from forgit.forges.gitlab import GitLabIssue, GitLabPullRequest, GitLabRelease
 from forgit.forges.pagure import PagureIssue, PagurePullRequest, PagureRelease
+from forgit.forges.pagure_git import read_json_files
+from forgit.forges.github_connection import (
+    GitHubApiService,
+    inject_github_connection_classes,
+)
+from forgit.forges.token_pool import GitHubTokenPool, register_token_pool
+from forgit.http_cache import HttpCache, install_http_cache
 from forgit.messages import (
     USE_SUBCLASS,
     NOT_IMPLEMENTED,
     OPENED_PR_AS_ISSUE_TITLE,
     HEADER_TEMPLATE,
     OPENED_PR_HEADER_TEMPLATE,
+    UNKNOWN_FORGE_ERROR,
 )
+from forgit.throttling import (
+    Throttler,
+    ThrottledObject,
+    RateLimit,
+    ResponseRateLimit,
+    throttled_value,
+)
+from forgit.utils import get_names
 
 IssuesDict = Union[
     dict[int, GitHubIssue], dict[int, GitLabIssue], dict[int, PagureIssue]
@@ -28,33 +75,155 @@ PRsDict = Union[
     dict[int, GitLabPullRequest],
     dict[int, PagurePullRequest],
 ]
+# ID of the posted item and calls which finish it (closing, comments, ...) by name
+PostedItem = Tuple[int, Dict[str, Callable[[], Any]]]
 ReleaseList = Union[list[GitHubRelease], list[GitLabRelease], list[PagureRelease]]
 
 
 class GitProject:
     service: GitService
+    issue_cls: Type[Issue]
+    pr_cls: Type[PullRequest]
+    release_cls: Type[Release]
+    # fetches heads of all PRs, including those from forks
+    pull_head_refspec: str = "+refs/pull/*/head:refs/pull/*/head"
 
     def __init__(self, namespace: str, repo: str, config: ConfigSchema) -> None:
-        self.project: OgrGitProject = self.service.get_project(
-            namespace=namespace, repo=repo
-        )
         self.config = config
+        self.throttler = Throttler(config.throttling, self._get_rate_limit)
+        if config.http_cache:
+            self._install_http_cache(HttpCache.from_config(config))
+        # all calls of the ogr project and objects it returns are throttled, the
+        #  proxy has the interface of the project
+        self.project = cast(
+            OgrGitProject,
+            ThrottledObject(
+                self.throttler.call(
+                    self.service.get_project, namespace=namespace, repo=repo
+                ),
+                self.throttler,
+            ),
+        )
 
-    def get_issues(self) -> IssuesDict:
+    def _get_rate_limit(self) -> Optional[RateLimit]:
+        return None
+
+    def _install_http_cache(self, cache: HttpCache) -> None:
+        """Sends requests of the service through the cache."""
+
+    @property
+    def git_url(self) -> str:
+        return self.project.get_git_urls()["git"]
+
+    @property
+    def key(self) -> str:
+        """Identifies the project across runs."""
+        return f"{type(self).__name__}/{self.project.namespace}/{self.project.repo}"
+
+    def _iter_pages(
+        self, get_page: Callable[[int], List[Any]], first_page: int = 0
+    ) -> Iterator[Any]:
+        """
+        Yields items of a paginated listing, the next page is read only after
+         the previous one is consumed.
+        """
+        page = first_page
+        while True:
+            items = self.throttler.call(get_page, page)
+            if not items:
+                return
+
+            yield from items
+            page += 1
+
+    def iter_issues(self) -> Iterator[Issue]:
+        """
+        Yields issues in the order of their IDs (as far as the forge sorts them),
+         reading them page by page, so they can be processed while they are read.
+        """
         raise NotImplementedError(USE_SUBCLASS)
 
-    def get_pull_requests(self) -> PRsDict:
+    def iter_pull_requests(self) -> Iterator[PullRequest]:
+        """Same as `iter_issues`, for PRs."""
         raise NotImplementedError(USE_SUBCLASS)
 
+    def get_issues(self) -> IssuesDict:
+        # items are of the issue class of the forge
+        issues: Dict[int, Any] = {issue.id: issue for issue in self.iter_issues()}
+        return issues
+
+    def get_pull_requests(self) -> PRsDict:
+        prs: Dict[int, Any] = {pr.id: pr for pr in self.iter_pull_requests()}
+        return prs
+
     def get_releases(self) -> ReleaseList:
         raise NotImplementedError(USE_SUBCLASS)
 
+    def post_issue_deferred(self, source_issue_data: Dict[str, Any]) -> PostedItem:
+        """
+        Creates the issue and leaves the rest (closing, comments) to the caller.
+
+        Returns:
+            ID of the created issue and calls which finish it by their names.
+            The calls don't depend on each other and can run in any order or
+            concurrently.
+        """
+        raise NotImplementedError(USE_SUBCLASS)
+
+    def finish_issue_deferred(
+        self, issue_id: int, source_issue_data: Dict[str, Any]
+    ) -> PostedItem:
+        """
+        Returns the calls which finish the issue created before (e.g. by a run
+         which failed before it finished the issue), named the same way as by
+         `post_issue_deferred`.
+        """
+        raise NotImplementedError(USE_SUBCLASS)
+
+    def post_pull_request_deferred(self, source_pr_data: Dict[str, Any]) -> PostedItem:
+        """
+        Creates the PR (or issue, depending on the config) and leaves the rest to
+         the caller.
+
+        Returns:
+            ID of the created PR or issue and calls which finish it.
+        """
+        raise NotImplementedError(USE_SUBCLASS)
+
+    def finish_pull_request_deferred(
+        self, pr_id: int, source_pr_data: Dict[str, Any]
+    ) -> PostedItem:
+        """Same as `finish_issue_deferred`, for PRs."""
+        raise NotImplementedError(USE_SUBCLASS)
+
+    def post_issue(self, source_issue_data: Dict[str, Any]) -> int:
+        """
+        Returns:
+            ID of the created issue.
+        """
+        issue_id, follow_ups = self.post_issue_deferred(source_issue_data)
+        for follow_up in follow_ups.values():
+            follow_up()
+
+        return issue_id
+
+    def post_pull_request(self, source_pr_data: Dict[str, Any]) -> int:
+        """
+        Returns:
+            ID of the created PR or issue (if the PR was posted as an issue).
+        """
+        pr_id, follow_ups = self.post_pull_request_deferred(source_pr_data)
+        for follow_up in follow_ups.values():
+            follow_up()
+
+        return pr_id
+
     @staticmethod
     def _get_all_comments(source_issue_data: Dict[str, Any]) -> str:
         pass
 
     def _create_issue_template_args(
-        self, source_issue_data: Dict[str, Any]
+        self, source_issue_data: Dict[str, Any], shorten: bool
     ) -> Dict[str, str]:
         d = source_issue_data
 
@@ -65,7 +234,7 @@ class GitProject:
             )
             + d["description"],
         }
-        if self.config.issue.shorten:
+        if shorten:
             result["body"] = result["body"] + self._get_all_comments(source_issue_data)
         if self.config.issue.assignees:
             result["assignees"] = d.get("assignees")
@@ -93,56 +262,150 @@ class GitProject:
 
 
 class GitHubProject(GitProject):
+    service: GitHubApiService
+    project: OgrGithubProject
+    issue_cls = GitHubIssue
+    pr_cls = GitHubPullRequest
+    release_cls = GitHubRelease
+
     def __init__(
-        self, token: str, namespace: str, repo: str, config: ConfigSchema
+        self,
+        token: str,
+        namespace: str,
+        repo: str,
+        config: ConfigSchema,
+        read_tokens: Optional[List[str]] = None,
     ) -> None:
-        self.service = GithubService(token=token)
+        """
+        Args:
+            token: token to GitHub, all writes are made by it
+            namespace: owner of the repository
+            repo: name of the repository
+            config: forgit config
+            read_tokens: more tokens which share reads of the project
+        """
+        self.token_pool: Optional[GitHubTokenPool] = None
+        if read_tokens:
+            self.token_pool = GitHubTokenPool(token, read_tokens)
+            register_token_pool(self.token_pool)
+
+        if config.http_cache or self.token_pool is not None:
+            cache = HttpCache.from_config(config) if config.http_cache else None
+            # PyGithub creates its sessions itself, only their class can be replaced,
+            # before the service creates its PyGithub instance
+            inject_github_connection_classes(cache)
+
+        self.service = GitHubApiService(token=token, api_url=config.github_api_url)
         super().__init__(namespace=namespace, repo=repo, config=config)
 
-    def get_issues(self) -> Dict[int, GitHubIssue]:
-        ogr_issues = self.project.get_issue_list()
-        return {
-            ogr_issue.id: GitHubIssue(self.config, ogr_issue)
-            for ogr_issue in ogr_issues
-        }
+    def _get_rate_limit(self) -> Optional[RateLimit]:
+        if self.token_pool is not None:
+            return self.token_pool.rate_limit
+
+        project = self.__dict__.get("project")
+        if project is None:
+            # the project is being created
+            return None
+
+        # PyGithub keeps the values from headers of the last response, the calls of
+        # the project go through its own instance, properties of the instance
+        # would ask for them by another call if they are not known yet
+        requester = project.github_instance.requester
+        remaining, limit = requester.rate_limiting
+        reset_at = requester.rate_limiting_resettime
+        if remaining < 0 or limit < 0 or not reset_at:
+            return None
+
+        return remaining, float(reset_at)
+
+    def iter_issues(self) -> Iterator[GitHubIssue]:
+        # the same issues as ogr lists, but oldest first and page by page
+        raw_issues = self.project.github_repo.get_issues(
+            state="open", sort="created", direction="asc"
+        )
+        for raw_issue in self._iter_pages(raw_issues.get_page):
+            # PRs are listed among issues by GitHub
+            if raw_issue.pull_request:
+                continue
 
-    def get_pull_requests(self) -> Dict[int, GitHubPullRequest]:
-        ogr_prs = self.project.get_pr_list()
-        return {ogr_pr.id: GitHubPullRequest(self.config, ogr_pr) for ogr_pr in ogr_prs}
+            ogr_issue = OgrGithubIssue(raw_issue, self.project)
+            yield GitHubIssue(self.config, throttled_value(ogr_issue, self.throttler))
+
+    def iter_pull_requests(self) -> Iterator[GitHubPullRequest]:
+        raw_prs = self.project.github_repo.get_pulls(
+            state="open", sort="created", direction="asc"
+        )
+        for raw_pr in self._iter_pages(raw_prs.get_page):
+            ogr_pr = OgrGithubPullRequest(raw_pr, self.project)
+            yield GitHubPullRequest(
+                self.config, throttled_value(ogr_pr, self.throttler)
+            )
 
     def get_releases(self) -> List[GitHubRelease]:
         ogr_releases = self.project.get_releases()
         return [GitHubRelease(self.config, ogr_release) for ogr_release in ogr_releases]
 
-    # TODO: code of these three will probably move to superclass with GL implementation
-    def post_issue(self, source_issue_data: Dict[str, Any]) -> bool:
-        kwargs = super()._create_issue_template_args(source_issue_data)
-        issue = self.project.create_issue(**kwargs)
-
-        if source_issue_data["status"] == IssueStatus.closed:
-            issue.close()
-
-        if self.config.issue.shorten:
-            return True
-
+    def _post_comments(self, issue: Any, source_issue_data: Dict[str, Any]) -> None:
         for comment in sorted(
             source_issue_data["comments"], key=lambda item: item.created
         ):
             issue.comment(comment.get_comment())
 
-        return True
+    def _get_issue_follow_ups(
+        self, issue: Any, source_issue_data: Dict[str, Any], shorten: bool
+    ) -> Dict[str, Callable[[], Any]]:
+        follow_ups = {}
+        # PRs posted as issues are closed when merged too
+        if source_issue_data["status"] in (
+            IssueStatus.closed,
+            PRStatus.closed,
+            PRStatus.merged,
+        ):
+            follow_ups["close"] = issue.close
+
+        if not shorten and source_issue_data["comments"]:
+            follow_ups["comments"] = partial(
+                self._post_comments, issue, source_issue_data
+            )
+
+        return follow_ups
+
+    # TODO: code of these will probably move to superclass with GL implementation
+    def post_issue_deferred(
+        self, source_issue_data: Dict[str, Any], shorten: Optional[bool] = None
+    ) -> PostedItem:
+        if shorten is None:
+            shorten = self.config.issue.shorten
 
-    def post_pull_request(self, source_pr_data: Dict[str, Any]) -> bool:
+        kwargs = super()._create_issue_template_args(source_issue_data, shorten)
+        issue = self.project.create_issue(**kwargs)
+        return issue.id, self._get_issue_follow_ups(issue, source_issue_data, shorten)
+
+    def finish_issue_deferred(
+        self,
+        issue_id: int,
+        source_issue_data: Dict[str, Any],
+        shorten: Optional[bool] = None,
+    ) -> PostedItem:
+        if shorten is None:
+            shorten = self.config.issue.shorten
+
+        issue = self.project.get_issue(issue_id)
+        return issue_id, self._get_issue_follow_ups(issue, source_issue_data, shorten)
+
+    def _is_posted_as_issue(self, source_pr_data: Dict[str, Any]) -> bool:
+        return (
+            source_pr_data["status"] == PRStatus.open
+            and self.config.pr.open_prs_as_issues
+        )
+
+    def post_pull_request_deferred(self, source_pr_data: Dict[str, Any]) -> PostedItem:
         if self.config.pr.as_issue:
-            prev = self.config.issue.shorten
-            self.config.issue.shorten = self.config.pr.shorten
-            self.post_issue(source_pr_data)
-            self.config.issue.shorten = prev
-            return True
+            return self.post_issue_deferred(source_pr_data, self.config.pr.shorten)
 
         d = source_pr_data
-        if d["status"] == PRStatus.open and self.config.pr.open_prs_as_issues:
-            self.project.create_issue(
+        if self._is_posted_as_issue(source_pr_data):
+            issue = self.project.create_issue(
                 title=OPENED_PR_AS_ISSUE_TITLE.format(pr_id=d["id"]),
                 body=OPENED_PR_HEADER_TEMPLATE.format(
                     what=PostType.pr,
@@ -150,49 +413,184 @@ class GitHubProject(GitProject):
                     date=d["created"],
                     user=d["author"],
                 ),
-            ).close()
-            return True
+            )
+            return issue.id, {"close": issue.close}
 
         kwargs = super()._create_pr_template_args(source_pr_data)
         pr = self.project.create_pr(**kwargs)
-        pr.close()
+        # TODO: comments
+        return pr.id, {"close": pr.close}
 
-        if self.config.pr.shorten:
-            return True
+    def finish_pull_request_deferred(
+        self, pr_id: int, source_pr_data: Dict[str, Any]
+    ) -> PostedItem:
+        if self.config.pr.as_issue:
+            return self.finish_issue_deferred(
+                pr_id, source_pr_data, self.config.pr.shorten
+            )
 
-        # TODO: comments
-        return True
+        if self._is_posted_as_issue(source_pr_data):
+            return pr_id, {"close": self.project.get_issue(pr_id).close}
+
+        return pr_id, {"close": self.project.get_pr(pr_id).close}
 
     def post_release(self, source_release_data: Dict[str, Any]) -> bool:
         raise NotImplementedError(NOT_IMPLEMENTED)
 
 
+class GitHubImportProject(GitHubProject):
+    """
+    Posts issues (and PRs posted as issues) by the GitHub issue import API, which
+     creates the issue with its comments, state and dates in a single request.
+
+    GitHub numbers the issues in the order the imports are processed and a failed
+     import would shift the numbers of the following ones, so with `match_ids`
+     every import is awaited before the next one is submitted and only one import
+     is in flight. Without `match_ids`, up to `concurrency` imports are in flight.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        namespace: str,
+        repo: str,
+        config: ConfigSchema,
+        read_tokens: Optional[List[str]] = None,
+    ) -> None:
+        super().__init__(
+            token=token,
+            namespace=namespace,
+            repo=repo,
+            config=config,
+            read_tokens=read_tokens,
+        )
+        self.importer = GitHubIssueImporter(
+            token=token,
+            namespace=namespace,
+            repo=repo,
+            api_url=config.github_api_url,
+            throttler=self.throttler,
+            poll_interval=config.github_import_poll_interval,
+        )
+
+    @staticmethod
+    def _format_datetime(value: Optional[datetime]) -> Optional[str]:
+        if value is None:
+            return None
+
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+
+    def _create_import_payload(
+        self, source_issue_data: Dict[str, Any], shorten: bool
+    ) -> Dict[str, Any]:
+        # labels and assignees are lists
+        args: Dict[str, Any] = super()._create_issue_template_args(
+            source_issue_data, shorten
+        )
+        issue = {
+            "title": args["title"],
+            "body": args["body"],
+            "closed": source_issue_data["status"]
+            in (IssueStatus.closed, PRStatus.closed, PRStatus.merged),
+        }
+        created = self._format_datetime(source_issue_data["created"])
+        if created is not None:
+            issue["created_at"] = created
+        if args.get("labels"):
+            issue["labels"] = get_names(args["labels"])
+        if args.get("assignees"):
+            # import API accepts only one assignee
+            issue["assignee"] = get_names(args["assignees"])[0]
+
+        comments = []
+        if not shorten:
+            for comment in sorted(
+                source_issue_data["comments"], key=lambda item: item.created
+            ):
+                data = {"body": comment.get_comment()}
+                created = self._format_datetime(comment.created)
+                if created is not None:
+                    data["created_at"] = created
+                comments.append(data)
+
+        return {"issue": issue, "comments": comments}
+
+    def post_issue_deferred(
+        self, source_issue_data: Dict[str, Any], shorten: Optional[bool] = None
+    ) -> PostedItem:
+        if shorten is None:
+            shorten = self.config.issue.shorten
+
+        payload = self._create_import_payload(source_issue_data, shorten)
+        # nothing is left to do, state and comments are part of the import
+        return self.importer.import_issue(payload), {}
+
+    def finish_issue_deferred(
+        self,
+        issue_id: int,
+        source_issue_data: Dict[str, Any],
+        shorten: Optional[bool] = None,
+    ) -> PostedItem:
+        return issue_id, {}
+
+
 class GitLabProject(GitProject):
+    service: GitlabService
+    project: OgrGitlabProject
+    issue_cls = GitLabIssue
+    pr_cls = GitLabPullRequest
+    release_cls = GitLabRelease
+    pull_head_refspec = "+refs/merge-requests/*/head:refs/merge-requests/*/head"
+
     def __init__(
         self, token: str, namespace: str, repo: str, config: ConfigSchema
     ) -> None:
         self.service = GitlabService(token=token)
+        # python-gitlab doesn't keep headers of responses
+        self._rate_limit = ResponseRateLimit("RateLimit-Remaining", "RateLimit-Reset")
+        self._rate_limit.install(self.service.gitlab_instance.session)
         super().__init__(namespace=namespace, repo=repo, config=config)
 
-    def get_issues(self) -> Dict[int, GitLabIssue]:
-        ogr_issues = self.project.get_issue_list()
-        return {
-            ogr_issue.id: GitLabIssue(self.config, ogr_issue)
-            for ogr_issue in ogr_issues
-        }
+    def _get_rate_limit(self) -> Optional[RateLimit]:
+        return self._rate_limit.value
+
+    def _install_http_cache(self, cache: HttpCache) -> None:
+        install_http_cache(self.service.gitlab_instance.session, cache)
+
+    def _list_page(self, manager: Any, page: int) -> List[Any]:
+        # the same items as ogr lists, but oldest first
+        return manager.list(
+            state="opened",
+            order_by="created_at",
+            sort="asc",
+            page=page,
+            per_page=PAGE_SIZE,
+        )
 
-    def get_pull_requests(self) -> Dict[int, GitLabPullRequest]:
-        ogr_prs = self.project.get_pr_list()
-        return {ogr_pr.id: GitLabPullRequest(self.config, ogr_pr) for ogr_pr in ogr_prs}
+    def iter_issues(self) -> Iterator[GitLabIssue]:
+        get_page = partial(self._list_page, self.project.gitlab_repo.issues)
+        for raw_issue in self._iter_pages(get_page, first_page=1):
+            ogr_issue = OgrGitlabIssue(raw_issue, self.project)
+            yield GitLabIssue(self.config, throttled_value(ogr_issue, self.throttler))
+
+    def iter_pull_requests(self) -> Iterator[GitLabPullRequest]:
+        get_page = partial(self._list_page, self.project.gitlab_repo.mergerequests)
+        for raw_mr in self._iter_pages(get_page, first_page=1):
+            ogr_pr = OgrGitlabPullRequest(raw_mr, self.project)
+            yield GitLabPullRequest(
+                self.config, throttled_value(ogr_pr, self.throttler)
+            )
 
     def get_releases(self) -> List[GitLabRelease]:
         ogr_releases = self.project.get_releases()
         return [GitLabRelease(self.config, ogr_release) for ogr_release in ogr_releases]
 
-    def post_issue(self, source_issue_data: Dict[str, Any]) -> bool:
+    def post_issue_deferred(self, source_issue_data: Dict[str, Any]) -> PostedItem:
         raise NotImplementedError(NOT_IMPLEMENTED)
 
-    def post_pull_request(self, source_pr_data: Dict[str, Any]) -> bool:
+    def post_pull_request_deferred(self, source_pr_data: Dict[str, Any]) -> PostedItem:
         raise NotImplementedError(NOT_IMPLEMENTED)
 
     def post_release(self, source_release_data: Dict[str, Any]) -> bool:
@@ -200,32 +598,123 @@ class GitLabProject(GitProject):
 
 
 class PagureProject(GitProject):
+    service: PagureService
+    issue_cls = PagureIssue
+    pr_cls = PagurePullRequest
+    release_cls = PagureRelease
+
     def __init__(
         self, token: str, namespace: str, repo: str, config: ConfigSchema
     ) -> None:
         self.service = PagureService(token=token)
         super().__init__(namespace=namespace, repo=repo, config=config)
 
-    def get_issues(self) -> Dict[int, PagureIssue]:
-        ogr_issues = self.project.get_issue_list()
-        return {
-            ogr_issue.id: PagureIssue(self.config, ogr_issue)
-            for ogr_issue in ogr_issues
-        }
+    def _install_http_cache(self, cache: HttpCache) -> None:
+        install_http_cache(self.service.session, cache)
+
+    def iter_issues(self) -> Iterator[PagureIssue]:
+        # ogr reads all the pages at once, there is no way to sort them by Pagure
+        ogr_issues = sorted(self.project.get_issue_list(), key=lambda issue: issue.id)
+        for ogr_issue in ogr_issues:
+            yield PagureIssue(self.config, ogr_issue)
 
-    def get_pull_requests(self) -> Dict[int, PagurePullRequest]:
-        ogr_prs = self.project.get_pr_list()
-        return {ogr_pr.id: PagurePullRequest(self.config, ogr_pr) for ogr_pr in ogr_prs}
+    def iter_pull_requests(self) -> Iterator[PagurePullRequest]:
+        ogr_prs = sorted(self.project.get_pr_list(), key=lambda pr: pr.id)
+        for ogr_pr in ogr_prs:
+            yield PagurePullRequest(self.config, ogr_pr)
 
     def get_releases(self) -> List[PagureRelease]:
         ogr_releases = self.project.get_releases()
         return [PagureRelease(self.config, ogr_release) for ogr_release in ogr_releases]
 
-    def post_issue(self, source_issue_data: Dict[str, Any]) -> bool:
+    def post_issue_deferred(self, source_issue_data: Dict[str, Any]) -> PostedItem:
         raise PagureGitConvertorException("We don't do that here")
 
-    def post_pull_request(self, source_pr_data: Dict[str, Any]) -> bool:
+    def post_pull_request_deferred(self, source_pr_data: Dict[str, Any]) -> PostedItem:
         raise PagureGitConvertorException("We don't do that here")
 
     def post_release(self, source_release_data: Dict[str, Any]) -> bool:
         raise PagureGitConvertorException("We don't do that here")
+
+
+class PagureGitProject(PagureProject):
+    """
+    Pagure source which reads issues and PRs with their comments from git
+     repositories of the project, without per-item API calls.
+    """
+
+    def _get_git_repo(self, kind: str) -> Repo:
+        url = f"{self.service.instance_url}/{kind}/{self.project.full_repo_name}.git"
+        git_cli_api = GitCliApi(
+            url,
+            cache_dir=self.config.cache_path / REPOS_DIR_NAME,
+            # only blobs are needed from these repositories
+            partial_clone=False,
+        )
+        return git_cli_api.repo
+
+    def iter_issues(self) -> Iterator[PagureIssue]:
+        raw_issues = read_json_files(
+            self._get_git_repo(PAGURE_TICKETS_DIR), self.config.pagure_parse_workers
+        )
+        raw_issues.sort(key=lambda raw_issue: raw_issue["id"])
+        for raw_issue in raw_issues:
+            yield PagureIssue(self.config, OgrPagureIssue(raw_issue, self.project))
+
+    def iter_pull_requests(self) -> Iterator[PagurePullRequest]:
+        raw_prs = read_json_files(
+            self._get_git_repo(PAGURE_REQUESTS_DIR), self.config.pagure_parse_workers
+        )
+        raw_prs.sort(key=lambda raw_pr: raw_pr["id"])
+        for raw_pr in raw_prs:
+            yield PagurePullRequest(
+                self.config, OgrPagurePullRequest(raw_pr, self.project)
+            )
+
+
+# part of the host name -> project of the forge
+ForgeProject = Union[GitHubProject, GitLabProject, PagureProject]
+
+FORGES: Dict[str, Type[ForgeProject]] = {
+    "github": GitHubProject,
+    "gitlab": GitLabProject,
+    "pagure": PagureProject,
+}
+
+
+def get_project(
+    url: str,
+    token: str,
+    config: ConfigSchema,
+    read_tokens: Optional[List[str]] = None,
+) -> ForgeProject:
+    """
+    Creates project of the forge recognized from the host of the URL.
+
+    Args:
+        url: URL of the project, e.g. https://github.com/namespace/repo
+        token: token to the forge
+        config: forgit config
+        read_tokens: more tokens which share reads of a GitHub project
+    """
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    namespace, _, repo = parsed.path.strip("/").removesuffix(".git").rpartition("/")
+    if not parsed.hostname or not namespace or not repo:
+        raise GitConvertorException(UNKNOWN_FORGE_ERROR.format(url=url))
+
+    for forge, project_cls in FORGES.items():
+        if forge in parsed.hostname:
+            if project_cls is GitHubProject and config.github_import:
+                project_cls = GitHubImportProject
+            if project_cls is PagureProject and config.pagure_git_source:
+                project_cls = PagureGitProject
+
+            kwargs = {}
+            if read_tokens and issubclass(project_cls, GitHubProject):
+                kwargs["read_tokens"] = read_tokens
+
+            return project_cls(
+                token=token, namespace=namespace, repo=repo, config=config, **kwargs
+            )
+
+    raise GitConvertorException(UNKNOWN_FORGE_ERROR.format(url=url))
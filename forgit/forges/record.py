@@ -0,0 +1,299 @@
+"""
+Offline copies of ogr objects.
+
+Records provide the same interface as ogr issues, pull requests, releases and
+ comments which is used by forgit wrappers, so they can be wrapped the same way
+ as live objects. Unlike ogr objects, they can be serialized and never call API.
+ They keep only the data forgit needs (in slots), so they are much smaller than
+ ogr objects with the whole API responses.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ogr.abstract import Comment as OgrComment
+from ogr.abstract import Issue as OgrIssue
+from ogr.abstract import IssueStatus, PRStatus
+from ogr.abstract import PullRequest as OgrPullRequest
+from ogr.abstract import Release as OgrRelease
+
+from forgit.utils import get_names
+
+
+def _datetime_to_str(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _str_to_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+class CommentRecord:
+    __slots__ = ("body", "author", "created")
+
+    def __init__(self, body: str, author: str, created: Optional[datetime]) -> None:
+        self.body = body
+        self.author = author
+        self.created = created
+
+    @classmethod
+    def from_ogr(cls, comment: OgrComment) -> "CommentRecord":
+        return cls(body=comment.body, author=comment.author, created=comment.created)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "body": self.body,
+            "author": self.author,
+            "created": _datetime_to_str(self.created),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CommentRecord":
+        return cls(
+            body=data["body"],
+            author=data["author"],
+            created=_str_to_datetime(data["created"]),
+        )
+
+
+class IssueRecord:
+    __slots__ = (
+        "id",
+        "title",
+        "status",
+        "description",
+        "author",
+        "created",
+        "labels",
+        "url",
+        "assignees",
+        "comments",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        status: IssueStatus,
+        description: str,
+        author: str,
+        created: Optional[datetime],
+        labels: List[str],
+        url: str,
+        assignees: List[str],
+        comments: List[CommentRecord],
+    ) -> None:
+        self.id = id
+        self.title = title
+        self.status = status
+        self.description = description
+        self.author = author
+        self.created = created
+        self.labels = labels
+        self.url = url
+        self.assignees = assignees
+        self.comments = comments
+
+    @property
+    def assignee(self) -> Optional[str]:
+        return self.assignees[0] if self.assignees else None
+
+    def get_comments(self) -> List[CommentRecord]:
+        return self.comments
+
+    @classmethod
+    def from_ogr(cls, issue: OgrIssue) -> "IssueRecord":
+        # not a part of the ogr interface, issues of some forges have a list of
+        #  assignees, others a single assignee
+        if hasattr(issue, "assignees"):
+            assignees = get_names(getattr(issue, "assignees"))
+        else:
+            assignee = getattr(issue, "assignee", None)
+            assignees = [assignee] if assignee else []
+
+        return cls(
+            id=issue.id,
+            title=issue.title,
+            status=issue.status,
+            description=issue.description,
+            author=issue.author,
+            created=issue.created,
+            labels=get_names(issue.labels),
+            url=issue.url,
+            assignees=assignees,
+            comments=[CommentRecord.from_ogr(c) for c in issue.get_comments()],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "status": self.status.name,
+            "description": self.description,
+            "author": self.author,
+            "created": _datetime_to_str(self.created),
+            "labels": self.labels,
+            "url": self.url,
+            "assignees": self.assignees,
+            "comments": [comment.to_dict() for comment in self.comments],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IssueRecord":
+        return cls(
+            id=data["id"],
+            title=data["title"],
+            status=IssueStatus[data["status"]],
+            description=data["description"],
+            author=data["author"],
+            created=_str_to_datetime(data["created"]),
+            labels=data["labels"],
+            url=data["url"],
+            assignees=data["assignees"],
+            comments=[CommentRecord.from_dict(c) for c in data["comments"]],
+        )
+
+
+class PullRequestRecord:
+    __slots__ = (
+        "id",
+        "title",
+        "status",
+        "description",
+        "author",
+        "created",
+        "labels",
+        "url",
+        "source_branch",
+        "target_branch",
+        "head_commit",
+        "base_commit",
+        "comments",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        status: PRStatus,
+        description: str,
+        author: str,
+        created: Optional[datetime],
+        labels: List[str],
+        url: str,
+        source_branch: str,
+        target_branch: str,
+        head_commit: Optional[str],
+        base_commit: Optional[str],
+        comments: List[CommentRecord],
+    ) -> None:
+        self.id = id
+        self.title = title
+        self.status = status
+        self.description = description
+        self.author = author
+        self.created = created
+        self.labels = labels
+        self.url = url
+        self.source_branch = source_branch
+        self.target_branch = target_branch
+        self.head_commit = head_commit
+        self.base_commit = base_commit
+        self.comments = comments
+
+    def get_comments(self) -> List[CommentRecord]:
+        return self.comments
+
+    @classmethod
+    def from_ogr(
+        cls, pull_request: OgrPullRequest, base_commit: Optional[str]
+    ) -> "PullRequestRecord":
+        pr = pull_request
+        return cls(
+            id=pr.id,
+            title=pr.title,
+            status=pr.status,
+            description=pr.description,
+            author=pr.author,
+            created=pr.created,
+            labels=get_names(pr.labels),
+            url=pr.url,
+            source_branch=pr.source_branch,
+            target_branch=pr.target_branch,
+            head_commit=pr.head_commit,
+            base_commit=base_commit,
+            comments=[CommentRecord.from_ogr(c) for c in pr.get_comments()],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "status": self.status.name,
+            "description": self.description,
+            "author": self.author,
+            "created": _datetime_to_str(self.created),
+            "labels": self.labels,
+            "url": self.url,
+            "source_branch": self.source_branch,
+            "target_branch": self.target_branch,
+            "head_commit": self.head_commit,
+            "base_commit": self.base_commit,
+            "comments": [comment.to_dict() for comment in self.comments],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PullRequestRecord":
+        return cls(
+            id=data["id"],
+            title=data["title"],
+            status=PRStatus[data["status"]],
+            description=data["description"],
+            author=data["author"],
+            created=_str_to_datetime(data["created"]),
+            labels=data["labels"],
+            url=data["url"],
+            source_branch=data["source_branch"],
+            target_branch=data["target_branch"],
+            head_commit=data["head_commit"],
+            base_commit=data.get("base_commit"),
+            comments=[CommentRecord.from_dict(c) for c in data["comments"]],
+        )
+
+
+class ReleaseRecord:
+    __slots__ = ("tag_name", "title", "body", "created_at")
+
+    def __init__(
+        self, tag_name: str, title: str, body: str, created_at: Optional[datetime]
+    ) -> None:
+        self.tag_name = tag_name
+        self.title = title
+        self.body = body
+        self.created_at = created_at
+
+    @classmethod
+    def from_ogr(cls, release: OgrRelease) -> "ReleaseRecord":
+        return cls(
+            tag_name=release.tag_name,
+            title=release.title,
+            body=release.body,
+            created_at=release.created_at,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tag_name": self.tag_name,
+            "title": self.title,
+            "body": self.body,
+            "created_at": _datetime_to_str(self.created_at),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReleaseRecord":
+        return cls(
+            tag_name=data["tag_name"],
+            title=data["title"],
+            body=data["body"],
+            created_at=_str_to_datetime(data["created_at"]),
+        )
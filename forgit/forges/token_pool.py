@@ -0,0 +1,155 @@
+"""
+Pool of GitHub tokens which share the reads of a project.
+
+Every token has its own hourly quota. Reads don't depend on who makes them, so
+ they are spread over all the tokens of the pool by their remaining quota,
+ while writes (and reads of the authenticated identity) stay with the token of
+ the project, so items are authored by the right user.
+"""
+
+import math
+import re
+import time
+from threading import Lock
+from typing import Dict, List, Mapping, Optional
+
+from forgit.throttling import RateLimit
+
+_READ_VERBS = ("GET", "HEAD")
+# reads whose result depends on the authenticated user
+_IDENTITY_PATH = re.compile(r"(^|/)(user|installation)(/|$)")
+
+
+def _mask(token: str) -> str:
+    return f"{token[:4]}...{token[-4:]}"
+
+
+class TokenBudget:
+    __slots__ = ("token", "remaining", "reset_at", "reads", "writes")
+
+    def __init__(self, token: str) -> None:
+        self.token = token
+        # unknown until GitHub reports it
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.reads = 0
+        self.writes = 0
+
+    @property
+    def available(self) -> float:
+        if self.remaining is None or (
+            self.reset_at is not None and self.reset_at <= time.time()
+        ):
+            # not used yet or the quota was renewed since
+            return math.inf
+        return self.remaining
+
+
+class GitHubTokenPool:
+    def __init__(self, token: str, read_tokens: List[str]) -> None:
+        """
+        Args:
+            token: token of the project, all writes are made by it
+            read_tokens: additional tokens which are used for reads
+        """
+        self.token = token
+        self.budgets: Dict[str, TokenBudget] = {
+            pool_token: TokenBudget(pool_token) for pool_token in [token, *read_tokens]
+        }
+        self._lock = Lock()
+
+    def _get_budgets(self, verb: str, path: str) -> List[TokenBudget]:
+        """Budgets of the tokens which may make the request."""
+        if verb.upper() not in _READ_VERBS or _IDENTITY_PATH.search(
+            path.split("?", 1)[0]
+        ):
+            return [self.budgets[self.token]]
+
+        return list(self.budgets.values())
+
+    def acquire(self, verb: str, path: str) -> str:
+        """
+        Waits until a quota is renewed if all the tokens which may make
+         the request used up their quotas.
+
+        Returns:
+            Token which makes the request.
+        """
+        while True:
+            with self._lock:
+                budgets = self._get_budgets(verb, path)
+                # least used token wins between tokens with the same quota left
+                budget = max(budgets, key=lambda item: (item.available, -item.reads))
+                if budget.available > 0:
+                    if verb.upper() in _READ_VERBS:
+                        budget.reads += 1
+                    else:
+                        budget.writes += 1
+                    if budget.remaining is not None:
+                        # before the response reports it, so concurrent reads
+                        # spread too
+                        budget.remaining -= 1
+
+                    return budget.token
+
+                # quotas are known to be used up, so are their resets
+                reset_at = min(item.reset_at or 0.0 for item in budgets)
+
+            time.sleep(max(reset_at - time.time(), 0))
+
+    def update(self, token: str, headers: Mapping[str, str]) -> None:
+        """Stores the quota reported in headers of the response to the token."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_at = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset_at is None or token not in self.budgets:
+            return
+
+        with self._lock:
+            budget = self.budgets[token]
+            budget.remaining = int(remaining)
+            budget.reset_at = float(reset_at)
+
+    @property
+    def rate_limit(self) -> Optional[RateLimit]:
+        """Quota left on all the tokens, it is renewed when the first one resets."""
+        with self._lock:
+            known = [
+                (budget.remaining, budget.reset_at)
+                for budget in self.budgets.values()
+                if budget.remaining is not None and budget.reset_at is not None
+            ]
+            if not known:
+                return None
+
+            return (
+                sum(remaining for remaining, _ in known),
+                min(reset_at for _, reset_at in known),
+            )
+
+    def describe(self) -> List[str]:
+        """Returns usage of every token of the pool."""
+        lines = []
+        for budget in self.budgets.values():
+            left = "unknown" if budget.remaining is None else budget.remaining
+            lines.append(
+                f"{_mask(budget.token)}: {budget.reads} reads, "
+                f"{budget.writes} writes, quota left {left}"
+            )
+
+        return lines
+
+
+# token of the project -> pool, requests are recognized by the token they carry
+_POOLS: Dict[str, GitHubTokenPool] = {}
+
+
+def register_token_pool(pool: GitHubTokenPool) -> None:
+    _POOLS[pool.token] = pool
+
+
+def get_token_pool(token: str) -> Optional[GitHubTokenPool]:
+    return _POOLS.get(token)
+
+
+def get_token_pools() -> List[GitHubTokenPool]:
+    return list(_POOLS.values())
@@ -0,0 +1,200 @@
+"""
+Persistent cache of HTTP responses of forges.
+
+Responses to GET requests are stored on disk together with their ETag and
+ Last-Modified headers. When the same URL is read again (e.g. by a resumed run
+ or by a dry run), the request is sent as a conditional one and if the forge
+ answers 304 Not Modified, the stored response is used. GitHub doesn't count
+ such requests against the rate limit and they carry no body.
+"""
+
+import json
+import sqlite3
+import time
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from forgit.config import ConfigSchema
+from forgit.constants import HTTP_CACHE_FILE_NAME
+
+# headers which describe the transferred body, not the stored (decoded) one
+_TRANSFER_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+# headers and body
+CachedResponse = Tuple[Dict[str, str], bytes]
+
+
+class HttpCache:
+    """
+    SQLite database with responses by URL. Its size is bounded, the least recently
+     used responses are evicted first.
+    """
+
+    def __init__(self, path: Path, max_size: int) -> None:
+        """
+        Args:
+            path: path to the database
+            max_size: max total size of stored bodies in bytes
+        """
+        self.max_size = max_size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # responses are stored from threads of concurrent calls
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = Lock()
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY,"
+                " headers TEXT NOT NULL,"
+                " body BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " used REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_used ON responses (used)"
+            )
+
+        (self._size,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    @classmethod
+    def from_config(cls, config: ConfigSchema) -> "HttpCache":
+        # source and target share the database, so they share the instance too
+        return _get_http_cache(
+            config.cache_path / HTTP_CACHE_FILE_NAME, config.http_cache_size * 2**20
+        )
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT headers, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._connection.execute(
+                "UPDATE responses SET used = ? WHERE url = ?", (time.time(), url)
+            )
+
+        return json.loads(row[0]), row[1]
+
+    def _evict(self) -> None:
+        # the lock is held by the caller
+        while self._size > self.max_size:
+            rows = self._connection.execute(
+                "SELECT url, size FROM responses ORDER BY used LIMIT 100"
+            ).fetchall()
+            if not rows:
+                return
+
+            for url, size in rows:
+                self._connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self._size -= size
+                if self._size <= self.max_size:
+                    return
+
+    def put(self, url: str, headers: Dict[str, str], body: bytes) -> None:
+        if len(body) > self.max_size:
+            return
+
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT size FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is not None:
+                self._size -= row[0]
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (url, json.dumps(headers), body, len(body), time.time()),
+            )
+            self._size += len(body)
+            self._evict()
+
+
+@lru_cache(maxsize=None)
+def _get_http_cache(path: Path, max_size: int) -> HttpCache:
+    return HttpCache(path, max_size)
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Transport adapter of requests which sends GET requests as conditional ones
+     and answers them from the cache when the forge reports no change.
+    """
+
+    def __init__(self, cache: HttpCache, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def _build_cached_response(
+        self,
+        request: requests.PreparedRequest,
+        not_modified: requests.Response,
+        cached: CachedResponse,
+    ) -> requests.Response:
+        headers, body = cached
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        # current values of e.g. rate limit headers come with the 304
+        response.headers = CaseInsensitiveDict(headers)
+        response.headers.update(not_modified.headers)
+        for header in _TRANSFER_HEADERS:
+            response.headers.pop(header, None)
+        response._content = body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = not_modified.url
+        response.request = request
+        response.connection = self
+        response.elapsed = not_modified.elapsed
+        return response
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        if request.method != "GET" or request.url is None or kwargs.get("stream"):
+            return super().send(request, **kwargs)
+
+        url = request.url
+        cached = self.cache.get(url)
+        if cached is not None:
+            headers, _ = cached
+            if "etag" in headers:
+                request.headers["If-None-Match"] = headers["etag"]
+            if "last-modified" in headers:
+                request.headers["If-Modified-Since"] = headers["last-modified"]
+
+        response = super().send(request, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            response.close()
+            return self._build_cached_response(request, response, cached)
+
+        validators = {"etag", "last-modified"} & {h.lower() for h in response.headers}
+        if response.status_code == 200 and validators:
+            headers = {
+                name.lower(): value
+                for name, value in response.headers.items()
+                if name.lower() not in _TRANSFER_HEADERS
+            }
+            self.cache.put(url, headers, response.content)
+
+        return response
+
+
+def install_http_cache(session: requests.Session, cache: HttpCache) -> None:
+    """
+    Replaces adapters of the session by caching ones, retries of the replaced
+     adapters are kept.
+    """
+    for prefix in ("https://", "http://"):
+        retries = getattr(session.get_adapter(prefix), "max_retries", 0)
+        session.mount(prefix, CachingAdapter(cache, max_retries=retries))
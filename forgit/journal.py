@@ -0,0 +1,246 @@
+"""
+Journal of the transfer, so the transfer can be resumed after failure without
+ posting anything twice.
+"""
+
+import json
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import Dict, Iterable, List, Any, Optional, Set, Tuple
+
+from forgit.config import ConfigSchema
+from forgit.constants import JOURNAL_COMPACT_ENTRIES, JOURNALS_DIR_NAME
+
+
+class TransferJournal:
+    """
+    Keeps track of finished steps of the transfer.
+
+    Every step appends one JSON line to the journal, so recording a step costs
+     the same no matter how many steps were recorded before. The line is flushed
+     right away, so nothing is lost if the process crashes. Once the log is much
+     longer than the state it describes, it is compacted to a single line with
+     the whole state, which is written atomically. A line cut short by a crash
+     is removed when the journal is loaded.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+        self.last_id: int = 0
+        self.id_map: Dict[int, Optional[int]] = {}
+        # created items whose follow-ups (closing, comments, ...) didn't all finish,
+        # source ID -> target ID and names of the unfinished follow-ups
+        self.pending: Dict[int, Tuple[int, Set[str]]] = {}
+        self.gap_fillers: Set[int] = set()
+        # closing of gap fillers is deferred, so it may not happen before failure
+        self.unclosed_gap_fillers: Set[int] = set()
+        # ordered, branches are deleted in the order they were pushed
+        self.pushed_branches: Dict[str, None] = {}
+        self.releases: Set[str] = set()
+
+        self._file: Optional[Any] = None
+        self._entries = 0
+        # steps may be recorded from background threads
+        self._lock = Lock()
+
+    @classmethod
+    def from_config(
+        cls, config: ConfigSchema, source_key: str, target_key: str
+    ) -> "TransferJournal":
+        name = f"{source_key}--{target_key}".replace("/", "_")
+        return cls(config.cache_path / JOURNALS_DIR_NAME / f"{name}.jsonl")
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        op = entry["op"]
+        if op == "state":
+            self.last_id = entry["last_id"]
+            self.id_map = {int(key): value for key, value in entry["id_map"].items()}
+            self.pending = {
+                int(key): (target_id, set(follow_ups))
+                for key, (target_id, follow_ups) in entry["pending"].items()
+            }
+            self.gap_fillers = set(entry["gap_fillers"])
+            self.unclosed_gap_fillers = set(entry["unclosed_gap_fillers"])
+            self.pushed_branches = dict.fromkeys(entry["pushed_branches"])
+            self.releases = set(entry["releases"])
+        elif op == "post":
+            if entry["follow_ups"]:
+                self.pending[entry["id"]] = entry["target_id"], set(entry["follow_ups"])
+            else:
+                self.id_map[entry["id"]] = entry["target_id"]
+            self.last_id = max(self.last_id, entry["id"])
+        elif op == "follow_up":
+            target_id, follow_ups = self.pending[entry["id"]]
+            follow_ups.discard(entry["name"])
+            if not follow_ups:
+                del self.pending[entry["id"]]
+                self.id_map[entry["id"]] = target_id
+        elif op == "gap_filler":
+            self.gap_fillers.add(entry["id"])
+            self.unclosed_gap_fillers.add(entry["target_id"])
+            self.last_id = max(self.last_id, entry["id"])
+        elif op == "closed_gap_filler":
+            self.unclosed_gap_fillers.discard(entry["target_id"])
+        elif op == "pushed_branches":
+            self.pushed_branches.update(dict.fromkeys(entry["branches"]))
+        elif op == "deleted_branches":
+            for branch in entry["branches"]:
+                self.pushed_branches.pop(branch, None)
+        elif op == "release":
+            self.releases.add(entry["tag"])
+
+    def _get_state(self) -> Dict[str, Any]:
+        return {
+            "op": "state",
+            "last_id": self.last_id,
+            "id_map": self.id_map,
+            "pending": {
+                key: [target_id, sorted(follow_ups)]
+                for key, (target_id, follow_ups) in self.pending.items()
+            },
+            "gap_fillers": sorted(self.gap_fillers),
+            "unclosed_gap_fillers": sorted(self.unclosed_gap_fillers),
+            "pushed_branches": list(self.pushed_branches),
+            "releases": sorted(self.releases),
+        }
+
+    def load(self) -> "TransferJournal":
+        if not self.path.is_file():
+            return self
+
+        self._entries = 0
+        # end of the last complete line
+        end = 0
+        with open(self.path, "rb+") as journal_file:
+            for line in journal_file:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("the line is not finished")
+                    entry = json.loads(line)
+                except ValueError:
+                    # the last line may be cut short by a crash, it is cut off, so
+                    # the lines appended by this run start on a line of their own
+                    journal_file.truncate(end)
+                    break
+
+                self._apply(entry)
+                self._entries += 1
+                end += len(line)
+
+        return self
+
+    def _compact(self) -> None:
+        # the lock is held by the caller
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(
+            "w", dir=self.path.parent, prefix=self.path.name, delete=False
+        ) as tmp_file:
+            tmp_file.write(json.dumps(self._get_state()) + "\n")
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+
+        os.replace(tmp_file.name, self.path)
+        self._entries = 1
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        # the lock is held by the caller
+        self._apply(entry)
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a")
+
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        self._entries += 1
+
+        live = (
+            len(self.id_map)
+            + len(self.pending)
+            + len(self.gap_fillers)
+            + len(self.pushed_branches)
+        )
+        if self._entries > max(JOURNAL_COMPACT_ENTRIES, 2 * live):
+            self._compact()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._apply(
+                {
+                    "op": "state",
+                    "last_id": 0,
+                    "id_map": {},
+                    "pending": {},
+                    "gap_fillers": [],
+                    "unclosed_gap_fillers": [],
+                    "pushed_branches": [],
+                    "releases": [],
+                }
+            )
+            self._compact()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+    def is_done(self, id_: int) -> bool:
+        return id_ in self.id_map or id_ in self.gap_fillers
+
+    def is_created(self, id_: int) -> bool:
+        """Whether the item exists on the target, even if it is not finished."""
+        return self.is_done(id_) or id_ in self.pending
+
+    def record_post(
+        self, source_id: int, target_id: Optional[int], follow_ups: Iterable[str] = ()
+    ) -> None:
+        """
+        Records the created item. It is done once all its follow-ups are recorded
+         as finished, until then a resumed run only finishes them.
+
+        Args:
+            source_id: ID of the item on the source
+            target_id: ID of the created item on the target
+            follow_ups: names of the calls which finish the item
+        """
+        with self._lock:
+            self._append(
+                {
+                    "op": "post",
+                    "id": source_id,
+                    "target_id": target_id,
+                    "follow_ups": list(follow_ups),
+                }
+            )
+
+    def record_follow_up(self, source_id: int, name: str) -> None:
+        with self._lock:
+            self._append({"op": "follow_up", "id": source_id, "name": name})
+
+    def record_gap_filler(self, id_: int, target_id: int) -> None:
+        with self._lock:
+            self._append({"op": "gap_filler", "id": id_, "target_id": target_id})
+
+    def record_closed_gap_filler(self, target_id: int) -> None:
+        with self._lock:
+            self._append({"op": "closed_gap_filler", "target_id": target_id})
+
+    def record_pushed_branches(self, branches: List[str]) -> None:
+        with self._lock:
+            self._append({"op": "pushed_branches", "branches": branches})
+
+    def record_deleted_branches(self, branches: List[str]) -> None:
+        with self._lock:
+            self._append({"op": "deleted_branches", "branches": branches})
+
+    def record_release(self, tag: str) -> None:
+        with self._lock:
+            self._append({"op": "release", "tag": tag})
@@ -19,6 +19,17 @@ DIFF_NOT_ENABLED_ERROR = (
     "`make_diffs` to true in the config file or disable the {enabled_options}."
 )
 
+UNKNOWN_FORGE_ERROR = (
+    "Unable to recognize the forge of {url}. Supported forges are GitHub, GitLab "
+    "and Pagure."
+)
+PROJECT_URL_NOT_SET_ERROR = (
+    "Please set `source_url` and `target_url` of projects in the config file."
+)
+PR_WITHOUT_BRANCHES_ERROR = (
+    "Branches of PR#{pr_id} are not prepared, it was not planned to be posted."
+)
+
 
 # Repeated messages
 USE_SUBCLASS = "Use subclass instead."
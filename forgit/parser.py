@@ -1,49 +1,172 @@
-from inspect import getmembers
-from typing import Union, Dict, Any, List, Type
+from collections import abc
+from dis import get_instructions
+from functools import lru_cache
+from typing import (
+    Union,
+    Dict,
+    Any,
+    Type,
+    Tuple,
+    Set,
+    FrozenSet,
+    Callable,
+    Optional,
+    Iterable,
+    Iterator,
+    KeysView,
+    ValuesView,
+    ItemsView,
+)
 
 from forgit.forges.abstract import Issue, PullRequest, Release
 
 UniversalForgeTypeCls = Union[Issue, PullRequest, Release]
 UniversalForgeType = Union[Type[Issue], Type[PullRequest], Type[Release]]
 
+# attributes set in `__init__` of wrappers, but not data of the item itself
+_NOT_DATA_FIELDS = frozenset({"config", "issue", "pull_request", "release"})
 
-def _get_class_data(input_cls: UniversalForgeTypeCls) -> Dict[str, Any]:
-    result = {}
-    for key, value in getmembers(input_cls):
-        if not key.startswith("_"):
-            result[key] = getattr(input_cls, key)
 
-    return result
+@lru_cache(maxsize=None)
+def _get_attrs_and_properties(
+    type_cls: type,
+) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    Introspects the class once and returns names of its attributes (set in `__init__`
+     of the class or any of its parents) and names of its properties.
+    """
+    attrs: Set[str] = set()
+    properties: Set[str] = set()
+    for cls in type_cls.__mro__:
+        for name, member in vars(cls).items():
+            if name == "__init__" and hasattr(member, "__code__"):
+                attrs.update(
+                    instruction.argval
+                    for instruction in get_instructions(member)
+                    if instruction.opname == "STORE_ATTR"
+                )
+            elif isinstance(member, property):
+                properties.add(name)
 
+    def is_data(name: str) -> bool:
+        return not name.startswith("_") and name not in _NOT_DATA_FIELDS
 
-def _get_type_class_attrs(type_cls: UniversalForgeType) -> List[str]:
-    result = []
-    # this may be wrong true in the future
-    for member in getmembers(type_cls):
-        if "__init__" in member:  # member is a tuple
-            result += list(member[1].__code__.co_names)
-            continue
+    return (
+        frozenset(name for name in attrs - properties if is_data(name)),
+        frozenset(name for name in properties if is_data(name)),
+    )
 
-        if not any([isinstance(item, property) for item in member]):
-            continue
 
-        # is property
-        for member_item in member:
-            if isinstance(member_item, str):
-                result.append(member_item)
+class FieldPlan:
+    """
+    Describes which fields are read from the source class to satisfy the target class.
 
-    return result
+    Attributes are cheap (already stored on the wrapper), so they are copied right
+     away. Properties may hide a network round-trip (comments, labels, ...) so they
+     are resolved only when the consumer asks for them.
+    """
 
+    def __init__(self, source_type: type, target_type: type) -> None:
+        source_attrs, source_props = _get_attrs_and_properties(source_type)
+        target_attrs, target_props = _get_attrs_and_properties(target_type)
+        target_fields = target_attrs | target_props
 
-def parse_data(
-    input_cls: UniversalForgeTypeCls, target_type: UniversalForgeType
-) -> Dict[str, Any]:
-    input_cls_data = _get_class_data(input_cls)
-    target_props_and_attrs = _get_type_class_attrs(target_type)
-    result = {}
-    for key, value in input_cls_data.items():
-        if key in target_props_and_attrs:
-            result[key] = value
+        self.eager: FrozenSet[str] = source_attrs & target_fields
+        self.lazy: FrozenSet[str] = source_props & target_fields
+
+    @property
+    def fields(self) -> FrozenSet[str]:
+        return self.eager | self.lazy
+
+
+@lru_cache(maxsize=None)
+def get_field_plan(source_type: type, target_type: type) -> FieldPlan:
+    return FieldPlan(source_type, target_type)
+
+
+class ParsedData(dict):
+    """
+    Dictionary with data of parsed forge item. Values of lazy fields are read from
+     the source object on first access and then kept in the dictionary.
+
+    Lazy fields are keys of the dictionary from the start, so `keys()`, iteration,
+     `len()` and `in` don't read them. Reading the values by `values()`, `items()`,
+     `copy()` or `**` unpacking reads all of them.
+    """
+
+    def __init__(
+        self, eager: Dict[str, Any], lazy: Dict[str, Callable[[], Any]]
+    ) -> None:
+        super().__init__(eager)
+        self._lazy = lazy
+
+    def __missing__(self, key: str) -> Any:
+        if key not in self._lazy:
+            raise KeyError(key)
+
+        # the getter is dropped only once it succeeds, so a failed read is retried
+        value = self._lazy[key]()
+        self[key] = value
+        self._lazy.pop(key, None)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return super().__contains__(key) or key in self._lazy
+
+    def __iter__(self) -> Iterator[str]:
+        # copied, lazy fields are moved to the dictionary when they are read
+        return iter([*super().keys(), *self._lazy])
+
+    def __len__(self) -> int:
+        return super().__len__() + len(self._lazy)
+
+    def keys(self) -> KeysView[str]:  # type: ignore[override]
+        return abc.KeysView(self)
+
+    def values(self) -> ValuesView[Any]:  # type: ignore[override]
+        self.resolve()
+        return super().values()
+
+    def items(self) -> ItemsView[str, Any]:  # type: ignore[override]
+        self.resolve()
+        return super().items()
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        if key in self:
+            return self[key]
+
+        return default
+
+    def resolve(self, fields: Optional[Iterable[str]] = None) -> "ParsedData":
+        """
+        Reads the lazy fields at once, the rest is still read on first access.
+
+        Args:
+            fields: fields to read, all the lazy fields if not set
+        """
+        keys = list(self._lazy) if fields is None else set(fields) & set(self._lazy)
+        for key in keys:
+            self.__missing__(key)
+
+        return self
+
+
+def _lazy_getter(input_cls: Any, key: str) -> Callable[[], Any]:
+    return lambda: getattr(input_cls, key)
+
+
+def parse_data(input_cls: Any, target_type: UniversalForgeType) -> ParsedData:
+    # classes are cached by `get_field_plan`, mypy sees `Type[...]` as unhashable
+    source_type: type = type(input_cls)
+    target: type = target_type
+    plan = get_field_plan(source_type, target)
+    eager = {
+        key: getattr(input_cls, key) for key in plan.eager if hasattr(input_cls, key)
+    }
+    lazy = {key: _lazy_getter(input_cls, key) for key in plan.lazy}
 
     # TODO: co s chybejicima datama v resultu
-    return result
+    return ParsedData(eager, lazy)
@@ -0,0 +1,207 @@
+"""
+Plan of the migration, computed before anything is posted.
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from ogr.abstract import IssueStatus, PRStatus
+
+from forgit.config import ConfigSchema
+from forgit.constants import ESTIMATED_CALL_DURATION, ESTIMATED_COMMENTS
+from forgit.enums import Action
+from forgit.forges.abstract import Issue, PullRequest, Release
+from forgit.utils import format_seconds
+
+
+class PlannedStep:
+    def __init__(self, id_: int, action: Action, item: Optional[Any] = None) -> None:
+        """
+        Args:
+            id_: ID of the item on the source (and on the target if IDs are matched)
+            action: what to do with the ID
+            item: issue or PR to post
+        """
+        self.id = id_
+        self.action = action
+        self.item: Any = item
+
+
+class MigrationPlan:
+    """
+    Exact list of actions for every ID, in the order they are executed.
+    """
+
+    def __init__(
+        self, steps: List[PlannedStep], config: ConfigSchema, releases: int = 0
+    ) -> None:
+        self.steps = steps
+        self.config = config
+        self.releases = releases
+
+    @classmethod
+    def build(
+        cls,
+        issues: Mapping[int, Issue],
+        prs: Mapping[int, PullRequest],
+        config: ConfigSchema,
+        start: int = 0,
+        releases: Optional[Sequence[Release]] = None,
+    ) -> "MigrationPlan":
+        """
+        Args:
+            issues: source issues by ID
+            prs: source PRs by ID
+            config: forgit config
+            start: last ID which is already transferred
+            releases: source releases which are not transferred yet
+        """
+        ids = sorted({*issues, *prs})
+        last_id = ids[-1] if ids else 0
+
+        steps = []
+        # without matching IDs, there are no gaps to walk through
+        for id_ in range(start + 1, last_id + 1) if config.match_ids else ids:
+            if id_ <= start:
+                continue
+
+            if id_ <= config.ignore_first_n_ids:
+                steps.append(PlannedStep(id_, Action.skip))
+            elif id_ in issues:
+                steps.append(PlannedStep(id_, Action.post_issue, issues[id_]))
+            elif id_ in prs:
+                steps.append(PlannedStep(id_, Action.post_pr, prs[id_]))
+            else:
+                steps.append(PlannedStep(id_, Action.fill_gap))
+
+        releases_count = len(releases or []) if config.transfer_releases else 0
+        return cls(steps, config, releases_count)
+
+    @property
+    def actions(self) -> Dict[Action, int]:
+        return dict(Counter(step.action for step in self.steps))
+
+    @property
+    def ids_to_transfer(self) -> int:
+        return sum(step.action != Action.skip for step in self.steps)
+
+    @property
+    def gaps(self) -> int:
+        return self.actions.get(Action.fill_gap, 0)
+
+    def posts_comments(self, step: PlannedStep) -> bool:
+        """Whether comments of the item are posted."""
+        if step.action == Action.post_issue:
+            return not self.config.issue.shorten
+
+        # comments of PRs are posted only when PRs are posted as issues
+        return (
+            step.action == Action.post_pr
+            and self.config.pr.as_issue
+            and not self.config.pr.shorten
+        )
+
+    @staticmethod
+    def _get_comment_count(step: PlannedStep) -> int:
+        # reading the comments would cost a call per item, the count comes with
+        # the listing on most forges
+        count = step.item.get_comment_count()
+        return ESTIMATED_COMMENTS if count is None else count
+
+    def _get_step_calls(self, step: PlannedStep) -> Dict[str, int]:
+        if step.action == Action.skip:
+            return {}
+
+        if step.action == Action.fill_gap:
+            return {"create_issue": 1, "close_issue": 1}
+
+        if self.config.github_import and (
+            step.action == Action.post_issue or self.config.pr.as_issue
+        ):
+            # state and comments are part of the import, status is polled
+            return {"import_issue": 1}
+
+        comments = self._get_comment_count(step) if self.posts_comments(step) else 0
+        if step.action == Action.post_issue:
+            closed = step.item.status == IssueStatus.closed
+            return {"create_issue": 1, "close_issue": int(closed), "comment": comments}
+
+        if step.action == Action.post_pr:
+            pr_config = self.config.pr
+            if pr_config.as_issue:
+                closed = step.item.status != PRStatus.open
+                return {
+                    "create_issue": 1,
+                    "close_issue": int(closed),
+                    "comment": comments,
+                }
+
+            if step.item.status == PRStatus.open and pr_config.open_prs_as_issues:
+                return {"create_issue": 1, "close_issue": 1}
+
+            return {"create_pr": 1, "close_pr": 1}
+
+        return {}
+
+    def get_api_calls(self) -> Dict[str, int]:
+        """Number of calls of each target API endpoint the plan makes."""
+        result: Counter = Counter()
+        for step in self.steps:
+            result.update(self._get_step_calls(step))
+
+        result["create_release"] = self.releases
+
+        return {endpoint: count for endpoint, count in result.items() if count}
+
+    def estimate_seconds(self) -> float:
+        """
+        Predicts how long the plan takes. All the calls to the target create
+         content, so the time is given by the write limits of the throttling
+         config, or by the duration of the calls if the limits are not reached.
+         Issues and PRs are created one by one if IDs are matched, other calls
+         run concurrently.
+        """
+        api_calls = self.get_api_calls()
+        calls = sum(api_calls.values())
+        # creating is ordered if IDs are matched, the rest runs concurrently
+        creating = 0.0
+        if self.config.match_ids:
+            creating = ESTIMATED_CALL_DURATION * (
+                api_calls.get("create_issue", 0) + api_calls.get("create_pr", 0)
+            )
+            # every import waits for at least one poll of its status
+            creating += api_calls.get("import_issue", 0) * (
+                ESTIMATED_CALL_DURATION + self.config.github_import_poll_interval
+            )
+        throttling = self.config.throttling
+        # (rate per second, burst) of the write token buckets of `Throttler`
+        limits = [
+            (throttling.writes_per_minute / 60, throttling.write_burst),
+            (throttling.writes_per_hour / 3600, throttling.writes_per_hour),
+        ]
+        throttled = max((calls - burst) / rate for rate, burst in limits)
+        return max(
+            throttled,
+            creating,
+            calls * ESTIMATED_CALL_DURATION / max(self.config.concurrency, 1),
+        )
+
+    def describe(self, verbose: bool = False) -> str:
+        lines: List[str] = []
+        if verbose:
+            lines.extend(f"{step.id}: {step.action.value}" for step in self.steps)
+            lines.append("")
+
+        lines.append(f"IDs to transfer: {self.ids_to_transfer}")
+        lines.append(f"Gaps to fill: {self.gaps}")
+        for action, count in self.actions.items():
+            lines.append(f"  {action.value}: {count}")
+
+        lines.append("API calls:")
+        api_calls = self.get_api_calls()
+        for endpoint, count in sorted(api_calls.items()):
+            lines.append(f"  {endpoint}: {count}")
+        lines.append(f"  total: {sum(api_calls.values())}")
+        lines.append(f"Estimated time: {format_seconds(self.estimate_seconds())}")
+
+        return "\n".join(lines)
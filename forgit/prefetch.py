@@ -0,0 +1,93 @@
+"""
+Loads comments of upcoming issues and PRs in the background.
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def map_ahead(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    window: int,
+    workers: Optional[int],
+) -> Iterator[Any]:
+    """
+    Calls the function on the items concurrently and yields the results in
+     the order of the items. At most `window` items are read ahead of
+     the consumer, so memory doesn't grow with the number of items.
+
+    Args:
+        func: blocking call which reads the item (e.g. with its comments)
+        items: items, they may be streamed from the source
+        window: max number of items read ahead
+        workers: max number of concurrent calls
+    """
+    window = max(window, 1)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending: Deque[Future] = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) > window:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class CommentPrefetcher:
+    """
+    Fetches comments of the next `window` items concurrently, while earlier items
+     are being posted. Comments are cached on the wrappers (their `comments`
+     property), so posting doesn't wait for the source unless it overtakes
+     the prefetcher.
+    """
+
+    def __init__(
+        self, items: List[Tuple[int, Any]], window: int, workers: Optional[int]
+    ) -> None:
+        """
+        Args:
+            items: (ID, issue or PR) pairs in the order they are posted
+            window: max number of items with comments fetched ahead
+            workers: max number of concurrent fetches
+        """
+        self.window = max(window, 1)
+        self._items = items
+        self._positions = {id_: position for position, (id_, _) in enumerate(items)}
+        self._futures: Dict[int, Future] = {}
+        self._submitted = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    @staticmethod
+    def _fetch(item: Any) -> None:
+        # the property caches the comments on the wrapper
+        item.comments
+
+    def _submit_until(self, position: int) -> None:
+        while self._submitted < min(position, len(self._items)):
+            id_, item = self._items[self._submitted]
+            self._futures[id_] = self._executor.submit(self._fetch, item)
+            self._submitted += 1
+
+    def wait_for(self, id_: int) -> None:
+        """
+        Blocks until comments of the item are fetched and moves the window past it.
+        Items which are not known to the prefetcher are ignored.
+        """
+        position = self._positions.get(id_)
+        if position is None:
+            return
+
+        self._submit_until(position + 1 + self.window)
+        # raises the exception from fetching, if any
+        self._futures.pop(id_).result()
+        # the item is consumed, don't keep it (and its comments) alive
+        self._items[position] = (id_, None)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
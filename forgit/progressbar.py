@@ -1,3 +1,161 @@
 """
 Progressbar for users to let them know how far the migration is.
 """
+
+import sys
+import time
+from collections import deque
+from threading import Event, Lock, Thread
+from typing import Deque, Dict, List, Optional, TextIO, Tuple
+
+from forgit.enums import Phase
+from forgit.throttling import Throttler
+from forgit.utils import format_seconds
+
+# phases which consume IDs on the target
+ID_PHASES = (Phase.issues, Phase.prs, Phase.gap_fillers)
+
+
+class Progress:
+    """
+    Reports how far the transfer is, how fast it goes and when it will end.
+
+    In interactive mode (TTY) one status line is rewritten in place, otherwise
+     a new status line is printed every `interval` seconds, so it can be followed
+     in logs. Status is printed even if nothing moves, so throttling pauses can be
+     told apart from hangs.
+    """
+
+    def __init__(
+        self,
+        total: Optional[int],
+        throttlers: List[Throttler],
+        stream: TextIO = sys.stderr,
+        interactive: Optional[bool] = None,
+        interval: Optional[float] = None,
+        window: float = 60.0,
+    ) -> None:
+        """
+        Args:
+            total: number of IDs to transfer, if it is known
+            throttlers: throttlers of the source and target projects
+            stream: where to print the progress
+            interactive: whether to rewrite the line in place, detected from
+                the stream if not set
+            interval: seconds between two status lines
+            window: seconds from which the rolling rates are computed
+        """
+        self.total = total
+        self.throttlers = throttlers
+        self.stream = stream
+        self.interactive = stream.isatty() if interactive is None else interactive
+        self.interval = interval or (0.5 if self.interactive else 30.0)
+        self.window = window
+
+        self.counts: Dict[Phase, int] = {phase: 0 for phase in Phase}
+        self._started = time.monotonic()
+        self._last_advance = self._started
+        # (time, IDs done, API calls)
+        self._samples: Deque[Tuple[float, int, int]] = deque()
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def done(self) -> int:
+        return sum(self.counts[phase] for phase in ID_PHASES)
+
+    @property
+    def api_calls(self) -> int:
+        return sum(throttler.calls for throttler in self.throttlers)
+
+    def advance(self, phase: Phase, count: int = 1) -> None:
+        with self._lock:
+            self.counts[phase] += count
+            self._last_advance = time.monotonic()
+
+    def _sample(self, now: float) -> Tuple[float, float]:
+        """Returns rolling rate of IDs per second and API calls per second."""
+        self._samples.append((now, self.done, self.api_calls))
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+        first_time, first_done, first_calls = self._samples[0]
+        elapsed = now - first_time
+        if elapsed <= 0:
+            return 0.0, 0.0
+
+        return (
+            (self.done - first_done) / elapsed,
+            (self.api_calls - first_calls) / elapsed,
+        )
+
+    def render(self) -> str:
+        now = time.monotonic()
+        with self._lock:
+            items_rate, calls_rate = self._sample(now)
+            done = self.done
+            phases = ", ".join(
+                f"{phase.value} {count}" for phase, count in self.counts.items()
+            )
+            idle = now - self._last_advance
+
+        if self.total is None:
+            line = f"{done} IDs"
+        else:
+            percent = 100 * done / self.total if self.total else 100.0
+            line = f"{done}/{self.total} IDs ({percent:.1f}%)"
+        line += f" | {phases} | {items_rate:.2f} items/s, {calls_rate:.2f} calls/s"
+
+        budgets = [t.rate_limit[0] for t in self.throttlers if t.rate_limit]
+        if budgets:
+            line += f" | quota left {min(budgets)}"
+
+        if items_rate > 0 and self.total is not None:
+            eta = (self.total - done) / items_rate
+            line += f" | ETA {format_seconds(eta)}"
+
+        paused = max((t.paused_for for t in self.throttlers), default=0.0)
+        if paused > 0:
+            line += f" | rate limited, resuming in {format_seconds(paused)}"
+        elif idle > self.interval and idle > 60:
+            line += f" | no progress for {format_seconds(idle)}"
+
+        return line
+
+    def _print(self) -> None:
+        if self.interactive:
+            # clear the rest of the previous line
+            self.stream.write(f"\r{self.render()}\033[K")
+        else:
+            self.stream.write(f"{self.render()}\n")
+
+        self.stream.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._print()
+
+    def start(self) -> "Progress":
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def finish(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+        self._print()
+        if self.interactive:
+            self.stream.write("\n")
+            self.stream.flush()
+
+        elapsed = format_seconds(time.monotonic() - self._started)
+        self.stream.write(f"Finished in {elapsed}.\n")
+
+    def __enter__(self) -> "Progress":
+        return self.start()
+
+    def __exit__(self, *_) -> None:
+        self.finish()
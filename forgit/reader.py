@@ -0,0 +1,91 @@
+"""
+Reader stage of the transfer which reads source items ahead of posting.
+"""
+
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from forgit.plan import PlannedStep
+
+# how often the reader checks whether the transfer was stopped, in seconds
+_POLL_INTERVAL = 0.1
+
+
+class SourceReader:
+    """
+    Reads data of planned steps in a background thread and passes them to the
+     writer through a bounded queue, in the order of the plan. The reader is at
+     most `read_ahead` steps ahead of the writer, so reads overlap with posting
+     without loading the whole source into memory.
+    """
+
+    _END = object()
+
+    def __init__(
+        self,
+        steps: List[PlannedStep],
+        read: Callable[[PlannedStep], Any],
+        read_ahead: int,
+    ) -> None:
+        """
+        Args:
+            steps: steps in the order they are executed
+            read: reads data of the step which are needed for posting it
+            read_ahead: max number of read steps waiting for the writer
+        """
+        self._steps = steps
+        self._read = read
+        self._queue: Queue = Queue(maxsize=max(read_ahead, 1))
+        self._stopped = Event()
+        self._error: Optional[BaseException] = None
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def start(self) -> "SourceReader":
+        self._thread.start()
+        return self
+
+    def _put(self, value: Any) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(value, timeout=_POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+
+        return False
+
+    def _run(self) -> None:
+        try:
+            for step in self._steps:
+                if not self._put((step, self._read(step))):
+                    return
+        except BaseException as exc:
+            self._error = exc
+        finally:
+            self._put(self._END)
+
+    def __iter__(self) -> Iterator[Tuple[PlannedStep, Any]]:
+        while True:
+            try:
+                value = self._queue.get(timeout=_POLL_INTERVAL)
+            except Empty:
+                if self._thread.is_alive():
+                    continue
+
+                try:
+                    value = self._queue.get_nowait()
+                except Empty:
+                    # reader has stopped and everything was consumed
+                    value = self._END
+
+            if value is self._END:
+                if self._error is not None:
+                    raise self._error
+                return
+
+            yield value
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._thread.join()
@@ -0,0 +1,300 @@
+"""
+Local snapshot of the source project, so reruns don't have to download everything
+ again.
+"""
+
+import json
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Callable, Tuple, Union
+
+from forgit.config import ConfigSchema
+from forgit.constants import SNAPSHOT_CACHED_RECORDS, SNAPSHOT_FILE_NAME
+from forgit.dump import DumpedIssue, DumpedPullRequest
+from forgit.enums import TargetTypes
+from forgit.forges.abstract import Release
+from forgit.forges.project import GitHubProject, GitLabProject, PagureProject
+from forgit.forges.record import IssueRecord, PullRequestRecord, ReleaseRecord
+from forgit.prefetch import map_ahead
+
+SourceProject = Union[GitHubProject, GitLabProject, PagureProject]
+Record = Union[IssueRecord, PullRequestRecord, ReleaseRecord]
+
+
+class SnapshotStore:
+    """
+    SQLite database with serialized issues, PRs (including their comments) and
+     releases of source projects.
+
+    Items are read from the database one by one, decoded items which were read
+     recently are cached, so reading an item attribute after attribute decodes it
+     only once.
+    """
+
+    def __init__(
+        self, path: Path, cached_records: int = SNAPSHOT_CACHED_RECORDS
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # items are read by the threads which read them ahead of posting
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = Lock()
+        self.cached_records = cached_records
+        self._cache: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+
+        columns = [
+            row[1] for row in self._connection.execute("PRAGMA table_info(items)")
+        ]
+        with self._connection:
+            if columns and "status" not in columns:
+                # written by an older version, it is only a cache of the source
+                self._connection.execute("DROP TABLE items")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                " project TEXT NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " updated TEXT,"
+                " status TEXT,"
+                " data TEXT NOT NULL,"
+                " PRIMARY KEY (project, kind, key))"
+            )
+
+    @classmethod
+    def from_config(cls, config: ConfigSchema) -> "SnapshotStore":
+        return cls(config.cache_path / SNAPSHOT_FILE_NAME)
+
+    def get_updated(
+        self, project: str, kind: TargetTypes
+    ) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        Returns:
+            Update timestamp and status of stored items by their keys.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, updated, status FROM items WHERE project = ? AND kind = ?",
+                (project, kind.name),
+            ).fetchall()
+        return {key: (updated, status) for key, updated, status in rows}
+
+    def get_item(self, project: str, kind: TargetTypes, key: str) -> Dict[str, Any]:
+        """
+        Returns:
+            Serialized item.
+        """
+        cache_key = project, kind.name, key
+        with self._lock:
+            if cache_key in self._cache:
+                self._cache.move_to_end(cache_key)
+                return self._cache[cache_key]
+
+            (data,) = self._connection.execute(
+                "SELECT data FROM items WHERE project = ? AND kind = ? AND key = ?",
+                cache_key,
+            ).fetchone()
+            self._cache[cache_key] = json.loads(data)
+            while len(self._cache) > self.cached_records:
+                self._cache.popitem(last=False)
+
+            return self._cache[cache_key]
+
+    def get_items(self, project: str, kind: TargetTypes) -> Iterable[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT data FROM items WHERE project = ? AND kind = ?"
+                " ORDER BY CAST(key AS INTEGER), key",
+                (project, kind.name),
+            ).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def save_item(
+        self,
+        project: str,
+        kind: TargetTypes,
+        key: str,
+        updated: Optional[str],
+        data: Dict[str, Any],
+    ) -> None:
+        # commit after each item, so crashed refresh doesn't lose what was fetched
+        with self._lock, self._connection:
+            self._cache.pop((project, kind.name, key), None)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    project,
+                    kind.name,
+                    key,
+                    updated,
+                    data.get("status"),
+                    json.dumps(data),
+                ),
+            )
+
+    def delete_items(
+        self, project: str, kind: TargetTypes, keys: Iterable[str]
+    ) -> None:
+        keys = list(keys)
+        with self._lock, self._connection:
+            for key in keys:
+                self._cache.pop((project, kind.name, key), None)
+            self._connection.executemany(
+                "DELETE FROM items WHERE project = ? AND kind = ? AND key = ?",
+                [(project, kind.name, key) for key in keys],
+            )
+
+
+class SnapshotRecord:
+    """
+    Record which is read from the snapshot store on every access, so it doesn't
+     hold the data in memory. The store caches recently read items.
+    """
+
+    def __init__(
+        self,
+        store: SnapshotStore,
+        project: str,
+        kind: TargetTypes,
+        key: str,
+        from_dict: Callable[[Dict[str, Any]], Record],
+    ) -> None:
+        self._store = store
+        self._project = project
+        self._kind = kind
+        self._key = key
+        self._from_dict = from_dict
+
+    def __getattr__(self, name: str) -> Any:
+        data = self._store.get_item(self._project, self._kind, self._key)
+        return getattr(self._from_dict(data), name)
+
+
+class SnapshotProject:
+    """
+    Source project backed by the snapshot store.
+
+    Items are still listed from the source forge, but only those which were updated
+     since the last snapshot are read in full (together with their comments).
+     Yielded items keep only their ID and status in memory, the rest is read from
+     the store when it is used.
+    """
+
+    def __init__(self, source: SourceProject, store: SnapshotStore) -> None:
+        self.source = source
+        self.store = store
+        self.config = source.config
+        self.project = source.project
+        self.throttler = source.throttler
+        self.pull_head_refspec = source.pull_head_refspec
+
+    @property
+    def git_url(self) -> str:
+        return self.source.git_url
+
+    def _refresh(
+        self,
+        kind: TargetTypes,
+        wrappers: Iterable[Tuple[str, Any]],
+        get_updated: Callable[[Any], Optional[str]],
+        to_record: Callable[[Any], Record],
+    ) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Stores items which changed since the last snapshot. They are read in full
+         (with their comments) by `comment_prefetch_workers` threads, at most
+         `comment_prefetch_window` of them ahead of storing, the same way as
+         the transfer reads them.
+
+        Yields:
+            Key and status of every listed item, in the order they are listed,
+            as soon as the item is stored, so the transfer doesn't wait for
+            the whole refresh.
+        """
+        stored = self.store.get_updated(self.source.key, kind)
+        listed = set()
+
+        def listing() -> Iterator[Tuple[str, Any]]:
+            # wrappers are streamed from the source, each is dropped once it is read
+            for key, wrapper in wrappers:
+                listed.add(key)
+                yield key, wrapper
+
+        def read(
+            item: Tuple[str, Any]
+        ) -> Tuple[str, Optional[str], Optional[Dict[str, Any]]]:
+            key, wrapper = item
+            updated = get_updated(wrapper)
+            if key in stored and updated is not None and stored[key][0] == updated:
+                return key, updated, None
+            return key, updated, to_record(wrapper).to_dict()
+
+        for key, updated, data in map_ahead(
+            read,
+            listing(),
+            self.config.comment_prefetch_window,
+            self.config.comment_prefetch_workers,
+        ):
+            if data is None:
+                yield key, stored[key][1]
+                continue
+
+            self.store.save_item(self.source.key, kind, key, updated, data)
+            yield key, data.get("status")
+
+        self.store.delete_items(self.source.key, kind, set(stored) - listed)
+
+    def iter_issues(self) -> Iterator[DumpedIssue]:
+        for key, status in self._refresh(
+            TargetTypes.issue,
+            ((str(issue.id), issue) for issue in self.source.iter_issues()),
+            lambda issue: issue.get_updated().isoformat(),
+            lambda issue: IssueRecord.from_ogr(issue.issue),
+        ):
+            record = SnapshotRecord(
+                self.store,
+                self.source.key,
+                TargetTypes.issue,
+                key,
+                IssueRecord.from_dict,
+            )
+            yield DumpedIssue(self.config, record, {"id": int(key), "status": status})
+
+    def iter_pull_requests(self) -> Iterator[DumpedPullRequest]:
+        for key, status in self._refresh(
+            TargetTypes.pr,
+            ((str(pr.id), pr) for pr in self.source.iter_pull_requests()),
+            lambda pr: pr.get_updated().isoformat(),
+            lambda pr: PullRequestRecord.from_ogr(pr.pull_request, pr.old_sha),
+        ):
+            record = SnapshotRecord(
+                self.store,
+                self.source.key,
+                TargetTypes.pr,
+                key,
+                PullRequestRecord.from_dict,
+            )
+            yield DumpedPullRequest(
+                self.config, record, {"id": int(key), "status": status}
+            )
+
+    def get_issues(self) -> Dict[int, DumpedIssue]:
+        return {issue.id: issue for issue in self.iter_issues()}
+
+    def get_pull_requests(self) -> Dict[int, DumpedPullRequest]:
+        return {pr.id: pr for pr in self.iter_pull_requests()}
+
+    def get_releases(self) -> List[Release]:
+        # releases carry no update timestamp, but there are only few of them
+        for _ in self._refresh(
+            TargetTypes.release,
+            ((release.tag, release) for release in self.source.get_releases()),
+            lambda _: None,
+            lambda release: ReleaseRecord.from_ogr(release.release),
+        ):
+            pass
+
+        return [
+            Release(self.config, ReleaseRecord.from_dict(data))
+            for data in self.store.get_items(self.source.key, TargetTypes.release)
+        ]
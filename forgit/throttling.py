@@ -1,3 +1,330 @@
 """
 Throttling mechanism for GH limitations.
+
+Every call to the forge API goes through `Throttler` which spends tokens from
+ token buckets before the call is made. Reads share the primary quota of the forge
+ and their rate is adjusted from the remaining quota and its reset time, so the
+ quota is spread evenly until the reset. Content-creating calls (new issues,
+ comments, closing, ...) have their own, stricter budget to not trigger secondary
+ (abuse) rate limits. When the forge rejects a call because of rate limits, all
+ calls are paused for the time the forge asks for and the call is repeated.
 """
+
+import logging
+import math
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple, List
+
+import requests
+
+from forgit.config import ThrottlingSchema
+
+logger = logging.getLogger(__name__)
+
+# remaining calls and unix timestamp of the quota reset
+RateLimit = Tuple[int, float]
+
+# ogr method names which create or change content on the forge
+_WRITE_METHOD_PREFIXES = (
+    "create",
+    "close",
+    "comment",
+    "add_",
+    "update",
+    "edit",
+    "merge",
+    "set_",
+    "delete",
+    "remove",
+)
+
+# properties of ogr objects (by their class) which send a request when read
+_REQUESTING_PROPERTIES: Dict[str, FrozenSet[str]] = {
+    "GithubIssue": frozenset({"labels"}),
+    "GithubPullRequest": frozenset(
+        {"labels", "status", "patch", "merge_commit_status", "source_project"}
+    ),
+    "GitlabPullRequest": frozenset(
+        {"patch", "merge_commit_sha", "merge_commit_status", "source_project"}
+    ),
+    "PagurePullRequest": frozenset({"patch"}),
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Args:
+            rate: tokens added per second
+            capacity: max number of tokens which can be accumulated (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if math.isinf(self.rate):
+            self._tokens = self.capacity
+        else:
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last_refill) * self.rate
+            )
+        self._last_refill = now
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def acquire(self) -> float:
+        """
+        Takes one token, waits until it is available if needed.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        with self._lock:
+            self._refill()
+            # token is reserved even if it is not there yet, so concurrent callers
+            # queue up behind each other instead of waking up at the same time
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+
+def _rate_limited_error_headers(exception: BaseException) -> Optional[dict]:
+    """
+    Goes through the chain of exceptions (ogr wraps the exceptions of PyGithub and
+     python-gitlab) and returns headers of the response if the call was rejected
+     because of rate limits (with lowercase header names).
+    """
+    current: Optional[BaseException] = exception
+    while current is not None:
+        status = getattr(current, "status", None) or getattr(
+            current, "response_code", None
+        )
+        # header names differ in case between forges and libraries
+        headers = {
+            key.lower(): value
+            for key, value in (getattr(current, "headers", None) or {}).items()
+        }
+        if status == 429:
+            return headers
+
+        if status == 403 and (
+            "retry-after" in headers
+            or headers.get("x-ratelimit-remaining") == "0"
+            or "rate limit" in str(current).lower()
+        ):
+            return headers
+
+        current = current.__cause__ or current.__context__
+
+    return None
+
+
+class Throttler:
+    def __init__(
+        self,
+        config: ThrottlingSchema,
+        get_rate_limit: Optional[Callable[[], Optional[RateLimit]]] = None,
+    ) -> None:
+        """
+        Args:
+            config: throttling part of the config
+            get_rate_limit: returns remaining quota and its reset time as last
+                reported by the forge (from response headers), None if the forge
+                doesn't report it
+        """
+        self.config = config
+        self._get_rate_limit = get_rate_limit
+
+        # unlimited until the forge tells us its quota
+        self.read_bucket = TokenBucket(config.read_rate or math.inf, config.read_burst)
+        self.write_buckets: List[TokenBucket] = [
+            TokenBucket(config.writes_per_minute / 60, config.write_burst),
+            TokenBucket(config.writes_per_hour / 3600, config.writes_per_hour),
+        ]
+
+        self._paused_until = 0.0
+        self._lock = Lock()
+
+        self.calls = 0
+        self.rate_limit: Optional[RateLimit] = None
+
+    def _wait_for_pause(self) -> None:
+        while True:
+            with self._lock:
+                wait = self._paused_until - time.time()
+
+            if wait <= 0:
+                return
+
+            time.sleep(wait)
+
+    @property
+    def paused_for(self) -> float:
+        """Seconds left until calls are allowed again after rate limiting."""
+        return max(self._paused_until - time.time(), 0.0)
+
+    def pause_until(self, timestamp: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, timestamp)
+
+    def _update_rate_limit(self) -> None:
+        if self._get_rate_limit is None:
+            return
+
+        rate_limit = self._get_rate_limit()
+        if rate_limit is None or rate_limit[0] < 0:
+            # not reported (yet), e.g. PyGithub uses -1 for unknown values
+            return
+
+        self.rate_limit = rate_limit
+        remaining, reset_at = rate_limit
+        if remaining <= self.config.reserve:
+            logger.info("Rate limit quota exhausted, waiting for the reset.")
+            self.pause_until(reset_at)
+            return
+
+        # spread the remaining quota evenly until the reset
+        seconds_to_reset = max(reset_at - time.time(), 1.0)
+        self.read_bucket.set_rate(
+            max((remaining - self.config.reserve) / seconds_to_reset, 0.01)
+        )
+
+    def _backoff(self, headers: dict, attempt: int) -> None:
+        retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            wait = float(retry_after)
+        elif headers.get("x-ratelimit-remaining") == "0" and headers.get(
+            "x-ratelimit-reset"
+        ):
+            wait = float(headers["x-ratelimit-reset"]) - time.time()
+        else:
+            wait = self.config.backoff * 2**attempt
+
+        logger.warning(f"Rate limited by the forge, pausing for {wait:.0f}s.")
+        self.pause_until(time.time() + max(wait, 1.0))
+
+    def call(
+        self, func: Callable[..., Any], *args: Any, write: bool = False, **kwargs: Any
+    ) -> Any:
+        for attempt in range(self.config.max_retries + 1):
+            self._wait_for_pause()
+            if write:
+                for bucket in self.write_buckets:
+                    bucket.acquire()
+            self.read_bucket.acquire()
+
+            with self._lock:
+                self.calls += 1
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as exc:
+                headers = _rate_limited_error_headers(exc)
+                if headers is None or attempt == self.config.max_retries:
+                    raise
+
+                self._backoff(headers, attempt)
+                continue
+            finally:
+                self._update_rate_limit()
+
+            return result
+
+
+class ResponseRateLimit:
+    """
+    Keeps the quota reported in headers of the last response of a requests
+     session, for forges whose libraries don't keep it.
+    """
+
+    def __init__(self, remaining_header: str, reset_header: str) -> None:
+        """
+        Args:
+            remaining_header: header with the number of remaining calls
+            reset_header: header with unix timestamp of the quota reset
+        """
+        self.remaining_header = remaining_header
+        self.reset_header = reset_header
+        self.value: Optional[RateLimit] = None
+
+    def install(self, session: requests.Session) -> None:
+        session.hooks["response"].append(self._on_response)
+
+    def _on_response(self, response: requests.Response, *_: Any, **__: Any) -> None:
+        remaining = response.headers.get(self.remaining_header)
+        reset_at = response.headers.get(self.reset_header)
+        if remaining is not None and reset_at is not None:
+            self.value = int(remaining), float(reset_at)
+
+
+def _is_ogr_object(value: Any) -> bool:
+    return type(value).__module__.startswith("ogr.")
+
+
+def _is_requesting_property(obj: Any, name: str) -> bool:
+    return any(
+        name in _REQUESTING_PROPERTIES.get(cls.__name__, ())
+        for cls in type(obj).__mro__
+    )
+
+
+class ThrottledObject:
+    """
+    Proxy of an ogr object which sends all method calls through the throttler.
+     Ogr objects returned from the calls are wrapped as well, so e.g. closing of
+     a created issue is throttled too. Properties which send a request (e.g.
+     labels of GitHub issues) are read through the throttler, the rest is
+     accessed directly.
+    """
+
+    def __init__(self, obj: Any, throttler: Throttler) -> None:
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "_throttler", throttler)
+
+    def __getattr__(self, name: str) -> Any:
+        if _is_requesting_property(self._obj, name):
+            return throttled_value(
+                self._throttler.call(getattr, self._obj, name), self._throttler
+            )
+
+        value = getattr(self._obj, name)
+        if name.startswith("_") or not callable(value):
+            return value
+
+        write = name.startswith(_WRITE_METHOD_PREFIXES)
+
+        def throttled(*args: Any, **kwargs: Any) -> Any:
+            return throttled_value(
+                self._throttler.call(value, *args, write=write, **kwargs),
+                self._throttler,
+            )
+
+        return throttled
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._obj, name, value)
+
+    def __repr__(self) -> str:
+        return f"Throttled({self._obj!r})"
+
+
+def throttled_value(value: Any, throttler: Throttler) -> Any:
+    if isinstance(value, list):
+        return [throttled_value(item, throttler) for item in value]
+
+    if _is_ogr_object(value):
+        return ThrottledObject(value, throttler)
+
+    return value
@@ -1,27 +1,50 @@
-from typing import Union, List, Optional, Dict, Any
+import asyncio
+from functools import partial
+from pathlib import Path
+from typing import (
+    Union,
+    List,
+    Optional,
+    Dict,
+    Any,
+    FrozenSet,
+    Callable,
+    Set,
+    Tuple,
+    Mapping,
+)
 
+from forgit.branches import BranchPipeline
 from forgit.config import ConfigSchema
-from forgit.constants import SOURCE_PR_BRANCH, TARGET_PR_BRANCH
-from forgit.enums import TargetTypes
+from forgit.constants import REPOS_DIR_NAME
+from forgit.dump import DumpProject
+from forgit.engine import TransferEngine
+from forgit.exceptions import GitConvertorException
+from forgit.enums import TargetTypes, Phase, Action
 from forgit.forges.github import GitHubIssue, GitHubPullRequest, GitHubRelease
 from forgit.forges.gitlab import GitLabIssue, GitLabPullRequest, GitLabRelease
-from forgit.forges.pagure import PagurePullRequest
+from forgit.forges.abstract import PullRequest
 from forgit.forges.git_cli_api import GitCliApi
 from forgit.forges.project import (
     GitHubProject,
     GitLabProject,
     PagureProject,
-    IssuesDict,
-    PRsDict,
+    PostedItem,
 )
-from forgit.parser import parse_data
+from forgit.journal import TransferJournal
+from forgit.messages import PR_WITHOUT_BRANCHES_ERROR
+from forgit.parser import parse_data, ParsedData
+from forgit.plan import MigrationPlan, PlannedStep
+from forgit.prefetch import CommentPrefetcher
+from forgit.reader import SourceReader
+from forgit.progressbar import Progress
+from forgit.snapshot import SnapshotProject, SnapshotStore
 
 ForgeClient = Union[GitHubProject, GitLabProject, PagureProject]
-PRsList = Union[
-    list[tuple[int, GitHubPullRequest]],
-    list[tuple[int, GitLabPullRequest]],
-    list[tuple[int, PagurePullRequest]],
-]
+SourceClient = Union[ForgeClient, SnapshotProject, DumpProject]
+# PRs of the source, the source may be a snapshot
+PRsMapping = Mapping[int, PullRequest]
+PRsList = List[Tuple[int, PullRequest]]
 
 
 MAP_TARGET_CLS_TO_TYPE: Dict[TargetTypes, Dict[str, Any]] = {
@@ -40,26 +63,51 @@ MAP_TARGET_CLS_TO_TYPE: Dict[TargetTypes, Dict[str, Any]] = {
 }
 
 
+# lazy fields read by posting an item as an issue or as a PR, the rest (e.g.
+# labels of PRs) is never read from the source
+_ISSUE_POSTED_FIELDS = frozenset(
+    {"url", "created", "labels", "assignees", "assignee", "comments"}
+)
+_PR_POSTED_FIELDS = frozenset({"url", "created", "source_branch", "target_branch"})
+
+
 class Transferator3000:
     """
     Transferator makes sure your project transfers just fine, so you can take a nap.
     """
 
     def __init__(
-        self, source: ForgeClient, target: ForgeClient, config: ConfigSchema
+        self,
+        source: Union[ForgeClient, DumpProject],
+        target: ForgeClient,
+        config: ConfigSchema,
     ) -> None:
-        self.source = source
+        self.source: SourceClient = source
+        # an archive already is an offline copy of the source
+        if config.use_snapshot and not isinstance(source, DumpProject):
+            self.source = SnapshotProject(source, SnapshotStore.from_config(config))
+
         self.target = target
         self.config = config
-        self.source_prs = self.source.get_pull_requests()
+        self.journal = TransferJournal.from_config(config, source.key, target.key)
 
-        self._branches: Optional[List[str]] = None
-        self._branches_were_prepared: bool = False
+        self._branch_pipeline: Optional[BranchPipeline] = None
+        self._comment_prefetcher: Optional[CommentPrefetcher] = None
+        self.progress: Optional[Progress] = None
 
         # Lazy properties
+        self._source_prs: Optional[PRsMapping] = None
         self._sorted_source_prs: Optional[PRsList] = None
         self._git_cli_api: Optional[GitCliApi] = None
 
+    @property
+    def source_prs(self) -> PRsMapping:
+        if self._source_prs is not None:
+            return self._source_prs
+
+        self._source_prs = self.source.get_pull_requests()
+        return self._source_prs
+
     @property
     def sorted_source_prs(self) -> PRsList:
         if self._sorted_source_prs is not None:
@@ -75,108 +123,355 @@ class Transferator3000:
         if self._git_cli_api is not None:
             return self._git_cli_api
 
-        self._git_cli_api = GitCliApi(self.config.pr.ssh_url)
+        self._git_cli_api = GitCliApi(
+            self.config.pr.ssh_url,
+            ref_only=self.config.pr.ref_only_branches,
+            cache_dir=self.config.cache_path / REPOS_DIR_NAME,
+            partial_clone=self.config.pr.partial_clone,
+        )
         return self._git_cli_api
 
-    def check_user_map(self) -> None:
-        # TODO: check tokens and user-map
-        pass
+    def _get_target_type(self, target_type: TargetTypes) -> Any:
+        # subclasses of projects (e.g. other posting backends) share the types
+        for cls in type(self.target).__mro__:
+            if cls.__name__ in MAP_TARGET_CLS_TO_TYPE[target_type]:
+                return MAP_TARGET_CLS_TO_TYPE[target_type][cls.__name__]
 
-    def _fill_gap(self, from_: int, issues: IssuesDict, prs: PRsDict) -> int:
-        to = from_
-        while not (issues.get(to) or prs.get(to)):
-            dummy_issue = self.target.project.create_issue(
-                title="'[forgit] Dummy issue to fill space between IDs",
-                body="Dummy issue to fill space between IDs.",
-            )
-            dummy_issue.close()
-            to += 1
-
-        return to - 1
-
-    def _transfer_releases(self) -> None:
-        releases = sorted(self.source.get_releases(), key=lambda release: release.tag)
-        for rel in releases:
-            source_release_data = parse_data(
-                rel,
-                MAP_TARGET_CLS_TO_TYPE[TargetTypes.release][
-                    self.target.__class__.__name__
-                ],
-            )
-            self.target.post_release(source_release_data)
+        raise KeyError(type(self.target).__name__)
 
-    def _prepare_branches_for_pulls(self, id_matcher: int) -> List[str]:
-        start = 0
-        for (index, _) in self.sorted_source_prs:
-            if index == id_matcher:
-                start = index
-
-        branches = []
-        for pr_id, pr in self.sorted_source_prs[start : len(self.sorted_source_prs)]:
-            self.git_cli_api.create_branch_and_reset_to(
-                SOURCE_PR_BRANCH.format(pr_id=pr_id), pr.new_sha
-            )
-            self.git_cli_api.create_branch_and_reset_to(
-                TARGET_PR_BRANCH.format(pr_id=pr_id), pr.old_sha
-            )
+    def _advance(self, phase: Phase, count: int = 1) -> None:
+        if self.progress is not None:
+            self.progress.advance(phase, count)
 
-            branches.extend(
-                [
-                    SOURCE_PR_BRANCH.format(pr_id=pr_id),
-                    TARGET_PR_BRANCH.format(pr_id=pr_id),
-                ]
-            )
+    def check_user_map(self) -> None:
+        # TODO: check tokens and user-map
+        pass
 
-        self.git_cli_api.push_branches(branches)
-        return branches
+    def _fill_gap(self, id_: int) -> PostedItem:
+        dummy_issue = self.target.project.create_issue(
+            title="'[forgit] Dummy issue to fill space between IDs",
+            body="Dummy issue to fill space between IDs.",
+        )
+        # record it right away, ID is taken even if closing fails
+        self.journal.record_gap_filler(id_, dummy_issue.id)
+        self._advance(Phase.gap_fillers)
+        return dummy_issue.id, {"close": partial(self._close_gap_filler, dummy_issue)}
+
+    def _close_gap_filler(self, dummy_issue: Any) -> None:
+        dummy_issue.close()
+        self.journal.record_closed_gap_filler(dummy_issue.id)
+
+    def _close_leftover_gap_fillers(self) -> None:
+        for id_ in list(self.journal.unclosed_gap_fillers):
+            self._close_gap_filler(self.target.project.get_issue(id_))
+
+    def _post_release(self, release: Any) -> None:
+        source_release_data = parse_data(
+            release,
+            self._get_target_type(TargetTypes.release),
+        )
+        self.target.post_release(source_release_data)
+        self.journal.record_release(release.tag)
+        self._advance(Phase.releases)
+
+    def _transfer_releases(self, engine: TransferEngine) -> None:
+        # releases don't depend on each other nor on issues and PRs
+        for release in self.source.get_releases():
+            if release.tag not in self.journal.releases:
+                engine.submit(partial(self._post_release, release))
+
+    def _on_branches_pushed(self, branches: List[str]) -> None:
+        self.journal.record_pushed_branches(branches)
+        self._advance(Phase.branches, len(branches))
+
+    def _start_branch_pipeline(self, plan: MigrationPlan) -> Optional[BranchPipeline]:
+        """
+        Starts preparing branches of all the PRs of the plan which are not created
+         yet, before any of them is posted, whatever order they are created in.
+        """
+        prs = [
+            (step.id, step.item)
+            for step in plan.steps
+            if step.action == Action.post_pr and not self.journal.is_created(step.id)
+        ]
+        # from now on, PRs are held by the plan and the pipeline, which both drop
+        # them once they are consumed
+        self._source_prs = None
+        self._sorted_source_prs = None
+        if not prs:
+            return None
+
+        # PR heads (also from forks) may be missing in the clone, fetch them at once
+        self.git_cli_api.fetch(self.source.git_url, [self.source.pull_head_refspec])
+
+        diffs_directory = None
+        if self.config.make_diffs:
+            diffs_directory = Path(self.config.path_to_store_diffs)
+
+        return BranchPipeline(
+            self.git_cli_api,
+            prs,
+            window=self.config.pr.branch_window,
+            batch_size=self.config.pr.branch_batch_size,
+            on_pushed=self._on_branches_pushed,
+            on_deleted=self.journal.record_deleted_branches,
+            diffs_directory=diffs_directory,
+            diff_workers=self.config.diff_workers,
+            diff_compression=self.config.diff_compression,
+        ).start()
 
     def _clear_branches(self, branches: List[str]) -> None:
         # TODO: retry mechanism
         self.git_cli_api.delete_branches(branches)
+        self.journal.record_deleted_branches(branches)
+
+    def _get_posted_fields(
+        self, plan: MigrationPlan, step: PlannedStep
+    ) -> FrozenSet[str]:
+        if step.action == Action.post_issue or self.config.pr.as_issue:
+            fields = _ISSUE_POSTED_FIELDS
+        else:
+            fields = _PR_POSTED_FIELDS
+
+        if not plan.posts_comments(step):
+            # comments are read (and prefetched) only for items which post them
+            fields = fields - {"comments"}
+        return fields
+
+    def _read_step(
+        self, plan: MigrationPlan, step: PlannedStep
+    ) -> Optional[ParsedData]:
+        """Reader stage, reads everything from the source the step needs."""
+        if step.action not in (Action.post_issue, Action.post_pr):
+            return None
+
+        if self.journal.is_done(step.id):
+            step.item = None
+            return None
+
+        if self._comment_prefetcher is not None:
+            self._comment_prefetcher.wait_for(step.id)
+
+        target_type = (
+            TargetTypes.issue if step.action == Action.post_issue else TargetTypes.pr
+        )
+        source_data = parse_data(
+            step.item,
+            self._get_target_type(target_type),
+        ).resolve(self._get_posted_fields(plan, step))
+        # the step doesn't hold the item anymore, so it (with its cached comments)
+        # is freed once it is posted and memory doesn't grow with posted items
+        step.item = None
+        return source_data
+
+    def _post_issue_or_pr(
+        self, step: PlannedStep, source_data: ParsedData
+    ) -> PostedItem:
+        """
+        Creates the issue or PR, the rest of the posting is returned as follow-ups.
+        """
+        pending = self.journal.pending.get(step.id)
+        if pending is not None:
+            target_id, names = pending
+            return self._finish_created(step, source_data, target_id, set(names))
+
+        if step.action == Action.post_issue:
+            posted = self.target.post_issue_deferred(source_data)
+            self.journal.record_post(step.id, posted[0], list(posted[1]))
+            self._advance(Phase.issues)
+            return posted
+
+        if self._branch_pipeline is None:
+            raise GitConvertorException(PR_WITHOUT_BRANCHES_ERROR.format(pr_id=step.id))
+
+        self._branch_pipeline.wait_for(step.id)
+        posted = self.target.post_pull_request_deferred(source_data)
+        self.journal.record_post(step.id, posted[0], list(posted[1]))
+        self._advance(Phase.prs)
+        return posted
+
+    def _finish_created(
+        self,
+        step: PlannedStep,
+        source_data: ParsedData,
+        target_id: int,
+        names: Set[str],
+    ) -> PostedItem:
+        """
+        The item was created by the failed run, returns only the follow-ups which
+         it didn't finish.
+        """
+        if step.action == Action.post_issue:
+            _, follow_ups = self.target.finish_issue_deferred(target_id, source_data)
+            self._advance(Phase.issues)
+        else:
+            _, follow_ups = self.target.finish_pull_request_deferred(
+                target_id, source_data
+            )
+            self._advance(Phase.prs)
 
-    def _transfer_issue_or_pr(
-        self, id_matcher: int, sources: Union[IssuesDict, PRsDict], posting_issue: bool
-    ) -> bool:
-        target_type = TargetTypes.issue if posting_issue else TargetTypes.pr
+        # e.g. the config changed since, there is nothing to finish
+        for name in names - follow_ups.keys():
+            self.journal.record_follow_up(step.id, name)
 
-        source = sources.get(id_matcher)
-        if source is None:
-            return False
+        return target_id, {
+            name: follow_up for name, follow_up in follow_ups.items() if name in names
+        }
 
-        source_data = parse_data(
-            source, MAP_TARGET_CLS_TO_TYPE[target_type][self.target.__class__.__name__]
-        )
-        if posting_issue:
-            self.target.post_issue(source_data)
-            return True
+    def _run_follow_up(self, id_: int, name: str, follow_up: Callable[[], Any]) -> None:
+        follow_up()
+        # the item is done once all its follow-ups are recorded
+        self.journal.record_follow_up(id_, name)
 
-        if not self._branches_were_prepared:
-            self._branches = self._prepare_branches_for_pulls(id_matcher)
-            self._branches_were_prepared = True
+    async def _finish_posting(
+        self, engine: TransferEngine, created: asyncio.Task, step: PlannedStep
+    ) -> None:
+        _, follow_ups = await created
+        # closing, comments, ... of different items run concurrently, gap fillers
+        # are only closed, that can wait until the rest is posted
+        deferred = step.action == Action.fill_gap
+        finished = []
+        for name, follow_up in follow_ups.items():
+            if not deferred:
+                follow_up = partial(self._run_follow_up, step.id, name, follow_up)
+            finished.append(engine.submit(follow_up, deferred=deferred))
+        if step.action == Action.post_pr and self._branch_pipeline is not None:
+            engine.submit(
+                partial(self._branch_pipeline.release, step.id), after=finished
+            )
 
-        self.target.post_pull_request(source_data)
-        return True
+    async def _execute(self, reader: SourceReader) -> None:
+        engine = TransferEngine(self.config.concurrency)
+        steps = iter(reader)
+
+        def read_step() -> Optional[Tuple[PlannedStep, Any]]:
+            return next(steps, None)
+
+        try:
+            while True:
+                # the reader blocks, don't block the event loop with it
+                item = await asyncio.to_thread(read_step)
+                if item is None:
+                    break
+
+                step, source_data = item
+                if step.action == Action.skip:
+                    continue
+
+                if step.action == Action.fill_gap and self.journal.is_done(step.id):
+                    self._advance(Phase.gap_fillers)
+                    continue
+
+                if step.action == Action.fill_gap:
+                    post = partial(self._fill_gap, step.id)
+                elif source_data is None:
+                    # already transferred by the previous run
+                    phase = (
+                        Phase.issues if step.action == Action.post_issue else Phase.prs
+                    )
+                    self._advance(phase)
+                    continue
+                else:
+                    post = partial(self._post_issue_or_pr, step, source_data)
+
+                await engine.wait_for_capacity()
+                # creating is ordered only if IDs should match, otherwise items
+                # are created concurrently and the journal maps their IDs
+                created = engine.submit(post, ordered=self.config.match_ids)
+                engine.spawn(self._finish_posting(engine, created, step))
+
+            if self.config.transfer_releases:
+                self._transfer_releases(engine)
+
+            await engine.join()
+        except BaseException:
+            await engine.cancel()
+            raise
+
+    def plan(self, id_matcher: int = 0) -> MigrationPlan:
+        """
+        Computes what the transfer of IDs after `id_matcher` would do, without
+         touching the target.
+        """
+        releases = None
+        if self.config.transfer_releases:
+            releases = [
+                release
+                for release in self.source.get_releases()
+                if release.tag not in self.journal.releases
+            ]
+
+        return MigrationPlan.build(
+            self.source.get_issues(),
+            self.source_prs,
+            self.config,
+            id_matcher,
+            releases,
+        )
 
-    def transfer(self, id_matcher: int = 0) -> None:
+    def resume(self, dry_run: bool = False) -> MigrationPlan:
+        """
+        Continues the transfer right after the last step recorded in the journal.
+        """
+        self.journal.load()
+        # without matching IDs, items are posted out of order, so anything may be
+        # missing, items already posted are skipped by the journal
+        start = 0
+        if self.config.match_ids:
+            start = self.journal.last_id
+            if self.journal.pending:
+                # items created by the failed run with unfinished follow-ups are
+                # planned again, only their follow-ups run
+                start = min(self.journal.pending) - 1
+        plan = self.plan(start)
+        if dry_run:
+            return plan
+
+        # branches and open gap fillers left on the target by the failed run
+        if self.journal.pushed_branches:
+            self._clear_branches(list(self.journal.pushed_branches))
+
+        self._close_leftover_gap_fillers()
+
+        self._transfer(plan)
+        return plan
+
+    def transfer(self, id_matcher: int = 0, dry_run: bool = False) -> MigrationPlan:
+        plan = self.plan(id_matcher)
+        if dry_run:
+            return plan
+
+        self.journal.reset()
+        self._transfer(plan)
+        return plan
+
+    def _transfer(self, plan: MigrationPlan) -> None:
         # TODO: retry mechanism
         self.check_user_map()
 
-        # TODO: while
-        source_issues = self.source.get_issues()
-        for _ in range(len(source_issues) + len(self.source_prs)):
-            id_matcher += 1
-
-            if self._transfer_issue_or_pr(id_matcher, source_issues, True):
-                continue
-
-            if self._transfer_issue_or_pr(id_matcher, self.source_prs, False):
-                continue
-
-            if self.config.match_ids:
-                id_matcher = self._fill_gap(id_matcher, source_issues, self.source_prs)
-
-        if self._branches is not None:
-            self._clear_branches(self._branches)
-
-        if self.config.transfer_releases:
-            self._transfer_releases()
+        self.progress = Progress(
+            plan.ids_to_transfer, [self.source.throttler, self.target.throttler]
+        )
+        self._branch_pipeline = self._start_branch_pipeline(plan)
+        self._comment_prefetcher = CommentPrefetcher(
+            [
+                (step.id, step.item)
+                for step in plan.steps
+                if plan.posts_comments(step) and not self.journal.is_done(step.id)
+            ],
+            window=self.config.comment_prefetch_window,
+            workers=self.config.comment_prefetch_workers,
+        )
+        reader = SourceReader(
+            plan.steps, partial(self._read_step, plan), self.config.read_ahead
+        ).start()
+        with self.progress:
+            try:
+                # writer stage
+                asyncio.run(self._execute(reader))
+            finally:
+                reader.close()
+                self._comment_prefetcher.close()
+                if self._branch_pipeline is not None:
+                    self._branch_pipeline.close()
+                self.journal.close()
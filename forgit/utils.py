@@ -1,5 +1,5 @@
 from functools import wraps
-from typing import Optional, Any, Callable, NoReturn
+from typing import Optional, Any, Callable, NoReturn, List
 
 from forgit.messages import NOT_IMPLEMENTED
 
@@ -14,6 +14,21 @@ def nested_get(dict_: dict, *keys: str) -> Optional[Any]:
     return last
 
 
+def get_names(items: Optional[List[Any]]) -> List[str]:
+    # labels and users are objects on some forges and strings on others
+    result = []
+    for item in items or []:
+        result.append(getattr(item, "name", None) or getattr(item, "login", item))
+
+    return result
+
+
+def format_seconds(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
+
+
 def call_func(given_func: Callable[[Any], Any]) -> Any:
     """
     Calls function specified as an argument with arguments from wrapped function.
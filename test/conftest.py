@@ -0,0 +1,24 @@
+import pytest
+
+from forgit.config import ConfigSchema, PRSchema
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """Returns factory of configs which don't touch anything outside `tmp_path`."""
+
+    def make(**kwargs):
+        pr = PRSchema(make_pr_comments=False, **kwargs.pop("pr", {}))
+        values = {
+            "source_project_key": "source-token",
+            "target_project_key": "target-token",
+            "user_map": [],
+            "make_diffs": False,
+            "cache_dir": str(tmp_path / "cache"),
+            "use_snapshot": False,
+            "http_cache": False,
+            **kwargs,
+        }
+        return ConfigSchema(pr=pr, **values)
+
+    return make
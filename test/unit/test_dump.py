@@ -0,0 +1,170 @@
+from datetime import datetime
+
+from click.testing import CliRunner
+from ogr.abstract import IssueStatus
+
+from forgit import cli as cli_module
+from forgit.cli import cli
+from forgit.dump import DumpProject, DumpReader, DumpWriter
+from forgit.enums import TargetTypes
+from forgit.forges.project import GitHubProject
+from forgit.forges.record import CommentRecord, IssueRecord
+from forgit.throttling import Throttler
+
+PROJECT = {
+    "key": "fake/source",
+    "git_url": "https://forge/fake/source.git",
+    "pull_head_refspec": "+refs/pull/*/head:refs/pull/*/head",
+}
+
+
+def make_issue(id_):
+    record = IssueRecord(
+        id=id_,
+        title=f"issue {id_}",
+        status=IssueStatus.closed,
+        description="description",
+        author="author",
+        created=datetime(2022, 1, 1),
+        labels=[],
+        url=f"https://forge/{id_}",
+        assignees=[],
+        comments=[CommentRecord("first", "author", datetime(2022, 1, 2))],
+    )
+    return record.to_dict()
+
+
+def write_dump(path, ids, block_size=2):
+    with DumpWriter(path, block_size=block_size) as writer:
+        writer.append("project", "project", PROJECT)
+        for id_ in ids:
+            writer.append(
+                TargetTypes.issue.name,
+                str(id_),
+                make_issue(id_),
+                {"id": id_, "status": "closed"},
+            )
+
+
+def test_records_are_read_in_the_order_they_were_written(tmp_path):
+    path = tmp_path / "dump"
+    write_dump(path, range(1, 6))
+
+    reader = DumpReader(path)
+
+    records = list(reader)
+    assert [key for _, key, _ in records] == ["project", "1", "2", "3", "4", "5"]
+    assert records[3] == ("issue", "3", make_issue(3))
+    assert reader.entries[1] == ("issue", "1", {"id": 1, "status": "closed"})
+
+
+def test_record_is_read_from_its_block_only(tmp_path):
+    path = tmp_path / "dump"
+    write_dump(path, range(1, 6))
+    reader = DumpReader(path)
+    read_blocks = []
+    read_block = reader._read_block
+
+    def record_read_block(offset, length):
+        read_blocks.append(offset)
+        return read_block(offset, length)
+
+    reader._read_block = record_read_block
+
+    assert reader.get("issue", "5") == make_issue(5)
+    # in the same block as 5
+    assert reader.get("issue", "4") == make_issue(4)
+    assert reader.get("issue", "1") == make_issue(1)
+
+    assert len(read_blocks) == 2
+    assert read_blocks[0] > read_blocks[1]
+
+
+def test_block_cut_short_by_crash_is_dropped(tmp_path):
+    path = tmp_path / "dump"
+    write_dump(path, range(1, 4))
+    # the block of a crashed run, it never got to the index
+    with open(path, "ab") as dump_file:
+        dump_file.write(b"\x1f\x8b\x08\x00cut")
+    with open(tmp_path / "dump.idx", "a") as index_file:
+        index_file.write('{"offset": ')
+
+    assert [key for _, key, _ in DumpReader(path)] == ["project", "1", "2", "3"]
+
+    # resumed export appends right after the last complete block
+    with DumpWriter(path, block_size=2) as writer:
+        writer.append("issue", "4", make_issue(4), {"id": 4, "status": "closed"})
+
+    reader = DumpReader(path)
+    assert [key for _, key, _ in reader] == ["project", "1", "2", "3", "4"]
+    assert reader.get("issue", "4") == make_issue(4)
+
+
+class FakeTargetIssue:
+    def __init__(self, id_):
+        self.id = id_
+        self.comments = []
+        self.closed = False
+
+    def comment(self, body):
+        self.comments.append(body)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeOgrProject:
+    namespace = "fake"
+    repo = "target"
+
+    def __init__(self):
+        self.items = {}
+
+    def create_issue(self, title, body, **_):
+        item = FakeTargetIssue(len(self.items) + 1)
+        self.items[item.id] = item
+        return item
+
+    def get_issue(self, id_):
+        return self.items[id_]
+
+
+class FakeTarget(GitHubProject):
+    def __init__(self, config):
+        self.config = config
+        self.throttler = Throttler(config.throttling)
+        self.project = FakeOgrProject()
+
+
+def test_dump_is_imported_to_the_target(make_config, tmp_path, monkeypatch):
+    path = tmp_path / "dump"
+    write_dump(path, range(1, 4))
+    config = make_config(target_url="https://github.com/fake/target")
+    targets = []
+
+    def get_project(url, token, config):
+        assert url == "https://github.com/fake/target"
+        targets.append(FakeTarget(config))
+        return targets[-1]
+
+    monkeypatch.setattr(cli_module, "_get_config", lambda _: config)
+    monkeypatch.setattr(cli_module, "get_project", get_project)
+
+    result = CliRunner().invoke(cli, ["import", str(path)])
+
+    assert result.exit_code == 0, result.output
+    items = targets[0].project.items
+    assert list(items) == [1, 2, 3]
+    assert all(item.comments == ["first"] and item.closed for item in items.values())
+
+
+def test_dumped_items_keep_only_id_and_status(make_config, tmp_path):
+    path = tmp_path / "dump"
+    write_dump(path, range(1, 4))
+
+    issues = DumpProject(path, make_config()).get_issues()
+
+    assert set(vars(issues[2])) == {"config", "issue", "id", "status", "_comments"}
+    assert issues[2].status == IssueStatus.closed
+    assert issues[2].title == "issue 2"
+    assert issues[2].get_comment_count() == 1
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from threading import Lock
+
+import pytest
+
+from forgit.engine import TransferEngine
+
+
+def make_call(log, lock, name, delay=0.0, error=None):
+    def call():
+        with lock:
+            log.append(("start", name))
+        time.sleep(delay)
+        with lock:
+            log.append(("end", name))
+        if error is not None:
+            raise error
+        return name
+
+    return call
+
+
+def test_ordered_calls_keep_their_order_under_concurrency():
+    log = []
+    lock = Lock()
+
+    async def run():
+        engine = TransferEngine(concurrency=4)
+        tasks = []
+        # earlier calls are slower, they would finish last if they could overlap
+        for i in range(5):
+            tasks.append(
+                engine.submit(
+                    make_call(log, lock, i, delay=0.05 - i * 0.01), ordered=True
+                )
+            )
+        await engine.join()
+        return [task.result() for task in tasks]
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+    assert log == [(event, i) for i in range(5) for event in ("start", "end")]
+
+
+def test_unordered_calls_run_concurrently_next_to_ordered_ones():
+    log = []
+    lock = Lock()
+
+    async def run():
+        engine = TransferEngine(concurrency=2)
+        engine.submit(make_call(log, lock, "ordered", delay=0.1), ordered=True)
+        engine.submit(make_call(log, lock, "unordered", delay=0.0))
+        await engine.join()
+
+    asyncio.run(run())
+
+    # the unordered call didn't wait for the slow ordered one
+    assert log.index(("end", "unordered")) < log.index(("end", "ordered"))
+
+
+def test_nothing_is_submitted_after_the_first_failure():
+    log = []
+    lock = Lock()
+    submitted = []
+
+    async def run():
+        engine = TransferEngine(concurrency=1, max_pending=1)
+        for i in range(5):
+            await engine.wait_for_capacity()
+            error = RuntimeError(f"call {i} failed") if i == 1 else None
+            engine.submit(make_call(log, lock, i, error=error), ordered=True)
+            submitted.append(i)
+
+    with pytest.raises(RuntimeError, match="call 1 failed"):
+        asyncio.run(run())
+
+    assert submitted == [0, 1]
+    assert ("start", 2) not in log
+
+
+def test_join_raises_the_first_failure_and_dependents_do_not_run():
+    log = []
+    lock = Lock()
+
+    async def run():
+        engine = TransferEngine(concurrency=2)
+        first = engine.submit(
+            make_call(log, lock, "first", error=RuntimeError("first failed")),
+            ordered=True,
+        )
+        engine.submit(make_call(log, lock, "dependent"), after=[first])
+        engine.submit(make_call(log, lock, "next ordered"), ordered=True)
+        await engine.join()
+
+    with pytest.raises(RuntimeError, match="first failed"):
+        asyncio.run(run())
+
+    assert log == [("start", "first"), ("end", "first")]
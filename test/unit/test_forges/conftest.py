@@ -0,0 +1,115 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from github.Requester import Requester
+
+REPO_PATH = "/repos/namespace/repo"
+RATE_LIMIT = 100000
+
+
+def make_issue(number):
+    return {
+        "id": 1000 + number,
+        "number": number,
+        "title": f"issue {number}",
+        "body": "description",
+        "state": "open",
+        "user": {"login": "author"},
+        "labels": [],
+        "assignees": [],
+        "created_at": "2022-01-01T00:00:00Z",
+        "html_url": f"https://github.com/namespace/repo/issues/{number}",
+        "pull_request": None,
+    }
+
+
+class GitHubApi:
+    """
+    Stands in for the REST API of GitHub, it serves a repository with `issues`
+     issues, one per page. Responses carry an ETag and conditional requests are
+     answered by 304. Every token has its own quota, which every request lowers.
+    """
+
+    def __init__(self, issues=2):
+        self.issues = issues
+        self.url = ""
+        self.issues_path = f"{REPO_PATH}/issues"
+        # path, token and whether the response was 304
+        self.requests = []
+        self.remaining = {}
+        self.reset_at = int(time.time()) + 3600
+        self.lock = Lock()
+
+    def get(self, path, query, headers):
+        """
+        Returns:
+            Status, body and headers of the response.
+        """
+        if path == REPO_PATH:
+            body = {
+                "id": 1,
+                "name": "repo",
+                "full_name": "namespace/repo",
+                "owner": {"login": "namespace"},
+                "url": f"{self.url}{REPO_PATH}",
+            }
+        elif path == self.issues_path:
+            page = int(query.get("page", ["1"])[0])
+            body = [make_issue(page)] if page <= self.issues else []
+        else:
+            return 404, {"message": "Not Found"}, {}
+
+        etag = f'"{path}?{sorted(query.items())}"'
+        not_modified = headers.get("If-None-Match") == etag
+        # "token <token>"
+        token = headers.get("Authorization", "").partition(" ")[2]
+        with self.lock:
+            self.requests.append((path, token, not_modified))
+            remaining = self.remaining.get(token, RATE_LIMIT) - 1
+            self.remaining[token] = remaining
+
+        response_headers = {
+            "ETag": etag,
+            "X-RateLimit-Limit": str(RATE_LIMIT),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(self.reset_at),
+        }
+        if not_modified:
+            return 304, None, response_headers
+        return 200, body, response_headers
+
+
+@pytest.fixture
+def github_api():
+    api = GitHubApi()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            status, body, headers = api.get(
+                url.path, parse_qs(url.query), dict(self.headers)
+            )
+            data = b"" if body is None else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    api.url = f"http://127.0.0.1:{server.server_port}"
+    yield api
+    server.shutdown()
+    server.server_close()
+    # connection classes are global to PyGithub
+    Requester.resetConnectionClasses()
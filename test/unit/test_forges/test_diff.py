@@ -0,0 +1,48 @@
+import subprocess
+
+import pytest
+
+from forgit.forges import diff
+from forgit.forges.diff import Diff
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    git = ["git", "-C", str(path), "-c", "user.name=a", "-c", "user.email=a@a"]
+    subprocess.run([*git, "init", "-q"], check=True)
+    (path / "file").write_text("old\n")
+    subprocess.run([*git, "add", "file"], check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "old"], check=True)
+    (path / "file").write_text("new\n" * 100000)
+    subprocess.run([*git, "commit", "-q", "-am", "new"], check=True)
+    return path
+
+
+def test_diff_is_placed_to_directory(repo, tmp_path):
+    patch = Diff("HEAD", "HEAD~", repo).place_diff_to_directory(tmp_path, 1)
+
+    assert patch == tmp_path / "1.patch"
+    assert patch.read_text().startswith("diff --git a/file b/file")
+
+
+class _FullDisk:
+    def write(self, _):
+        raise OSError("No space left on device")
+
+
+def test_git_is_stopped_when_writing_fails(repo, monkeypatch):
+    processes = []
+
+    def popen(*args, **kwargs):
+        processes.append(subprocess.Popen(*args, **kwargs))
+        return processes[-1]
+
+    monkeypatch.setattr(diff, "Popen", popen)
+    with pytest.raises(OSError):
+        Diff("HEAD", "HEAD~", repo)._write_diff(_FullDisk())
+
+    # git was killed and reaped, not left running with an open pipe
+    assert processes[0].returncode is not None
+    assert processes[0].stdout.closed
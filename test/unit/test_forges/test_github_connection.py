@@ -0,0 +1,20 @@
+from forgit.forges.project import GitHubProject
+
+
+def test_second_read_is_answered_from_the_cache(make_config, github_api):
+    config = make_config(http_cache=True, github_api_url=github_api.url)
+
+    first = GitHubProject("token", "namespace", "repo", config)
+    assert [issue.title for issue in first.iter_issues()] == ["issue 1", "issue 2"]
+    assert not any(not_modified for _, _, not_modified in github_api.requests)
+
+    github_api.requests.clear()
+    # e.g. a resumed run
+    second = GitHubProject("token", "namespace", "repo", config)
+    assert [issue.title for issue in second.iter_issues()] == ["issue 1", "issue 2"]
+    listings = [
+        not_modified
+        for path, _, not_modified in github_api.requests
+        if path == github_api.issues_path
+    ]
+    assert listings and all(listings)
@@ -0,0 +1,174 @@
+import json
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Thread
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from ogr.abstract import IssueStatus
+
+from forgit.config import ThrottlingSchema
+from forgit.constants import GITHUB_IMPORT_MEDIA_TYPE
+from forgit.exceptions import GitHubImportException
+from forgit.forges.github_import import GitHubIssueImporter
+from forgit.forges.project import GitHubImportProject
+from forgit.throttling import Throttler
+
+IMPORTS_PATH = "/repos/namespace/repo/import/issues"
+
+
+class ImportApi:
+    """
+    Stands in for the import API of GitHub. Every poll processes the oldest
+     pending import, issues titled "broken" fail to import.
+    """
+
+    def __init__(self):
+        self.imports = []
+        self.requests = []
+        # max number of imports waiting for a poll at once
+        self.max_pending = 0
+        self.lock = Lock()
+
+    def submit(self, headers, payload):
+        with self.lock:
+            self.requests.append(("POST", headers, None))
+            id_ = len(self.imports) + 1
+            status = {
+                "id": id_,
+                "status": "pending",
+                "created_at": f"2024-01-01T10:00:0{id_}Z",
+                "title": payload["issue"]["title"],
+            }
+            self.imports.append(status)
+            return status
+
+    def poll(self, headers, since):
+        with self.lock:
+            self.requests.append(("GET", headers, since))
+            pending = [
+                status for status in self.imports if status["status"] == "pending"
+            ]
+            self.max_pending = max(self.max_pending, len(pending))
+            for status in self.imports:
+                if status["status"] == "pending":
+                    if status["title"] == "broken":
+                        status["status"] = "failed"
+                        status["errors"] = [{"code": "invalid"}]
+                    else:
+                        status["status"] = "imported"
+                        status["issue_url"] = (
+                            f"https://api.github.com/repos/namespace/repo/issues/"
+                            f"{status['id'] + 100}"
+                        )
+                    break
+
+            since_time = datetime.fromisoformat(since)
+            return [
+                status
+                for status in self.imports
+                if datetime.fromisoformat(status["created_at"].replace("Z", "+00:00"))
+                >= since_time
+            ]
+
+
+@pytest.fixture
+def import_api():
+    api = ImportApi()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, body):
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            payload = json.loads(self.rfile.read(length))
+            self._reply(api.submit(dict(self.headers), payload))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            assert url.path == IMPORTS_PATH
+            (since,) = parse_qs(url.query)["since"]
+            self._reply(api.poll(dict(self.headers), since))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    api.url = f"http://127.0.0.1:{server.server_port}"
+    yield api
+    server.shutdown()
+    server.server_close()
+
+
+def test_imports_are_submitted_and_polled(import_api):
+    importer = GitHubIssueImporter(
+        token="token",
+        namespace="namespace",
+        repo="repo",
+        api_url=import_api.url,
+        throttler=Throttler(ThrottlingSchema()),
+        poll_interval=0.01,
+    )
+
+    imported = importer.submit({"issue": {"title": "first", "body": "body"}})
+    failed = importer.submit({"issue": {"title": "broken", "body": "body"}})
+
+    assert imported.result(timeout=10) == 101
+    with pytest.raises(GitHubImportException, match="Import 2 failed"):
+        failed.result(timeout=10)
+
+    for _, headers, _ in import_api.requests:
+        assert headers["Authorization"] == "token token"
+        assert headers["Accept"] == GITHUB_IMPORT_MEDIA_TYPE
+    # the listing starts at the oldest import which is still waiting
+    sinces = [since for verb, _, since in import_api.requests if verb == "GET"]
+    assert sinces == ["2024-01-01T10:00:01+00:00", "2024-01-01T10:00:02+00:00"]
+
+
+class FakeImportProject(GitHubImportProject):
+    def __init__(self, config, api_url):
+        self.config = config
+        self.throttler = Throttler(config.throttling)
+        self.importer = GitHubIssueImporter(
+            token="token",
+            namespace="namespace",
+            repo="repo",
+            api_url=api_url,
+            throttler=self.throttler,
+            poll_interval=0.05,
+        )
+
+
+def make_issue_data(id_):
+    return {
+        "title": f"issue {id_}",
+        "description": "description",
+        "author": "author",
+        "url": f"https://forge/{id_}",
+        "created": datetime(2022, 1, 1),
+        "status": IssueStatus.closed,
+        "comments": [],
+    }
+
+
+def test_imports_posted_concurrently_are_all_in_flight(make_config, import_api):
+    config = make_config(match_ids=False, concurrency=4)
+    project = FakeImportProject(config, import_api.url)
+
+    # the same way as the transfer posts them when IDs are not matched
+    with ThreadPoolExecutor(config.concurrency) as executor:
+        posted = list(
+            executor.map(project.post_issue_deferred, map(make_issue_data, range(4)))
+        )
+
+    assert sorted(posted) == [(101, {}), (102, {}), (103, {}), (104, {})]
+    assert import_api.max_pending > 1
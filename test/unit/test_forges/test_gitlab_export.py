@@ -0,0 +1,106 @@
+import json
+import tarfile
+from datetime import datetime
+from types import SimpleNamespace
+
+from ogr.abstract import IssueStatus, PRStatus
+
+from forgit.constants import GITLAB_LABEL_COLOR
+from forgit.forges.github import GitHubIssue, GitHubPullRequest
+from forgit.forges.gitlab_export import GitLabExporter
+from forgit.forges.record import CommentRecord
+from forgit.throttling import Throttler
+
+
+class FakeItem:
+    """Stands in for ogr issues and PRs."""
+
+    def __init__(self, id_, kind, status):
+        self.id = id_
+        self.title = f"{kind} {id_}"
+        self.status = status
+        self.description = "description"
+        self.author = "author"
+        self.created = datetime(2022, 1, 1)
+        self.url = f"https://forge/{kind}/{id_}"
+        self.assignees = []
+        self.labels = [SimpleNamespace(name="bug")]
+        self.source_branch = f"feature-{id_}"
+        self.target_branch = "main"
+        self.head_commit = f"new-{id_}"
+        self._raw_pr = SimpleNamespace(base=SimpleNamespace(sha=f"old-{id_}"))
+        self._kind = kind
+
+    def get_comments(self):
+        # newest first, the archive orders them
+        return [
+            CommentRecord(f"{self._kind} {self.id} comment {day}", "author", created)
+            for day, created in ((2, datetime(2022, 1, 2)), (1, datetime(2022, 1, 1)))
+        ]
+
+
+class FakeSource:
+    key = "fake/source"
+
+    def __init__(self, config, issues, prs):
+        self.config = config
+        self.throttler = Throttler(config.throttling)
+        self._issues = issues
+        self._prs = prs
+
+    def iter_issues(self):
+        for id_ in self._issues:
+            item = FakeItem(id_, "issue", IssueStatus.closed)
+            yield GitHubIssue(self.config, item)
+
+    def iter_pull_requests(self):
+        for id_ in self._prs:
+            item = FakeItem(id_, "mr", PRStatus.merged)
+            yield GitHubPullRequest(self.config, item)
+
+    def get_releases(self):
+        return []
+
+
+def read_relation(path, relation):
+    with tarfile.open(path) as archive:
+        lines = archive.extractfile(f"tree/project/{relation}.ndjson").readlines()
+
+    return [json.loads(line) for line in lines]
+
+
+def test_issues_and_merge_requests_with_the_same_ids(make_config, tmp_path):
+    config = make_config(comment_prefetch_window=1, comment_prefetch_workers=2)
+    source = FakeSource(config, issues=[1, 2], prs=[1, 3])
+
+    path = GitLabExporter(source, config).export(
+        tmp_path / "export.tar.gz", include_repository=False
+    )
+
+    issues = read_relation(path, "issues")
+    assert [(issue["iid"], issue["title"]) for issue in issues] == [
+        (1, "issue 1"),
+        (2, "issue 2"),
+    ]
+    assert issues[0]["state"] == "closed"
+    assert [note["note"] for note in issues[0]["notes"]] == [
+        "issue 1 comment 1",
+        "issue 1 comment 2",
+    ]
+
+    merge_requests = read_relation(path, "merge_requests")
+    assert [(mr["iid"], mr["title"]) for mr in merge_requests] == [
+        (1, "mr 1"),
+        (3, "mr 3"),
+    ]
+    assert merge_requests[0]["state"] == "merged"
+    assert merge_requests[0]["source_branch"] == "feature-1"
+    assert merge_requests[0]["merge_request_diff"]["head_commit_sha"] == "new-1"
+    assert [note["noteable_type"] for note in merge_requests[0]["notes"]] == [
+        "MergeRequest",
+        "MergeRequest",
+    ]
+
+    assert read_relation(path, "labels") == [
+        {"title": "bug", "color": GITLAB_LABEL_COLOR, "type": "ProjectLabel"}
+    ]
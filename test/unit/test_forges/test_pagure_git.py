@@ -0,0 +1,167 @@
+import json
+from pathlib import Path
+
+import pytest
+from git import Repo
+from ogr.abstract import IssueStatus, PRStatus
+from ogr.services.pagure import PagureProject as OgrPagureProject
+from ogr.services.pagure import PagureService
+
+from forgit.constants import PAGURE_REQUESTS_DIR, PAGURE_TICKETS_DIR
+from forgit.forges.pagure_git import read_json_files
+from forgit.forges.project import PagureGitProject
+
+
+def make_comment(id_, body):
+    return {
+        "id": id_,
+        "comment": body,
+        "user": {"name": f"commenter-{id_}"},
+        "date_created": str(1600000000 + id_),
+        "edited_on": None,
+        "editor": None,
+    }
+
+
+def make_ticket(id_):
+    return {
+        "id": id_,
+        "title": f"ticket {id_}",
+        "content": f"content {id_}",
+        "status": "Closed" if id_ == 2 else "Open",
+        "user": {"name": "reporter"},
+        "date_created": "1600000000",
+        "last_updated": "1600000000",
+        "tags": ["bug"],
+        "assignee": None,
+        "private": False,
+        "comments": [make_comment(1, "first"), make_comment(2, "second")],
+    }
+
+
+def make_request(id_):
+    return {
+        "id": id_,
+        "title": f"request {id_}",
+        "initial_comment": f"content {id_}",
+        "status": "Merged",
+        "user": {"name": "contributor"},
+        "date_created": "1600000000",
+        "last_updated": "1600000000",
+        "branch_from": f"feature-{id_}",
+        "branch": "main",
+        "commit_start": f"start-{id_}",
+        "commit_stop": f"stop-{id_}",
+        "tags": [],
+        "project": {"url_path": "namespace/repo"},
+        "comments": [make_comment(1, "looks good")],
+    }
+
+
+def make_repo(path, files):
+    """
+    Creates the repository Pagure keeps the tickets or requests in, every item is
+     a JSON file named by a hash, attachments are in directories.
+    """
+    repo = Repo.init(path, mkdir=True)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "pagure")
+        config.set_value("user", "email", "pagure@example.com")
+
+    (path / "files").mkdir()
+    (path / "files" / "screenshot.png").write_bytes(b"\x89PNG")
+    add_files(repo, files)
+    return repo
+
+
+def add_files(repo, files):
+    for name, data in files.items():
+        (Path(repo.working_dir) / name).write_text(json.dumps(data))
+    repo.git.add(all=True)
+    repo.git.commit(message="update", no_gpg_sign=True)
+
+
+class LocalPagureGitProject(PagureGitProject):
+    """Pagure project whose git repositories are served from a local directory."""
+
+    def __init__(self, config, instance_url):
+        self.config = config
+        self.service = PagureService(token="token", instance_url=instance_url)
+        self.project = OgrPagureProject(
+            repo="repo", namespace="namespace", service=self.service, username="user"
+        )
+
+
+@pytest.fixture
+def pagure(tmp_path):
+    """Serves tickets 3, 1, 2 and requests 5, 4 in no particular order."""
+    server = tmp_path / "server"
+    for kind, files in (
+        (
+            PAGURE_TICKETS_DIR,
+            {"c3a1.json": make_ticket(3), "0b7f.json": make_ticket(1)},
+        ),
+        (
+            PAGURE_REQUESTS_DIR,
+            {"9e2d.json": make_request(5), "41aa.json": make_request(4)},
+        ),
+    ):
+        work = make_repo(tmp_path / "work" / kind, files)
+        if kind == PAGURE_TICKETS_DIR:
+            # every ticket is added by its own commit
+            add_files(work, {"5f00.json": make_ticket(2)})
+        Repo.clone_from(
+            work.working_dir, server / kind / "namespace" / "repo.git", bare=True
+        )
+
+    return f"file://{server}"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_json_files_are_read_from_the_root(tmp_path, workers):
+    repo = make_repo(
+        tmp_path / "tickets", {f"{id_:04x}.json": make_ticket(id_) for id_ in (1, 2)}
+    )
+
+    raw_issues = read_json_files(repo, workers)
+
+    assert sorted(raw_issue["id"] for raw_issue in raw_issues) == [1, 2]
+    assert sorted(raw_issue["title"] for raw_issue in raw_issues) == [
+        "ticket 1",
+        "ticket 2",
+    ]
+
+
+def test_empty_repository_has_no_json_files(tmp_path):
+    assert read_json_files(Repo.init(tmp_path / "tickets", mkdir=True)) == []
+
+
+def test_issues_and_prs_are_read_from_git(make_config, pagure):
+    config = make_config(pagure_parse_workers=1)
+    project = LocalPagureGitProject(config, pagure)
+
+    issues = list(project.iter_issues())
+    assert [issue.id for issue in issues] == [1, 2, 3]
+    assert [issue.title for issue in issues] == ["ticket 1", "ticket 2", "ticket 3"]
+    assert [issue.status for issue in issues] == [
+        IssueStatus.open,
+        IssueStatus.closed,
+        IssueStatus.open,
+    ]
+    assert issues[0].description == "content 1"
+    assert issues[0].author == "reporter"
+    assert issues[0].labels == ["bug"]
+    assert [
+        (comment.get_comment(), comment.author) for comment in issues[0].comments
+    ] == [("first", "commenter-1"), ("second", "commenter-2")]
+
+    prs = list(project.iter_pull_requests())
+    assert [pr.id for pr in prs] == [4, 5]
+    assert prs[0].title == "request 4"
+    assert prs[0].status == PRStatus.merged
+    assert prs[0].description == "content 4"
+    assert prs[0].source_branch == "feature-4"
+    assert prs[0].target_branch == "main"
+    assert prs[0].new_sha == "stop-4"
+    assert prs[0].old_sha == "start-4^"
+    assert [comment.get_comment() for comment in prs[0].comments] == ["looks good"]
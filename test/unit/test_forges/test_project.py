@@ -0,0 +1,15 @@
+from forgit.forges.project import GitHubProject
+
+
+def test_github_quota_is_read_from_responses_to_the_project(make_config, github_api):
+    github_api.issues = 8
+    config = make_config(github_api_url=github_api.url)
+    project = GitHubProject("token", "namespace", "repo", config)
+
+    assert len(list(project.iter_issues())) == 8
+
+    remaining, reset_at = project.throttler.rate_limit
+    assert remaining == github_api.remaining["token"]
+    assert reset_at == github_api.reset_at
+    # the quota comes with the responses, it is not asked for
+    assert all(path != "/rate_limit" for path, _, _ in github_api.requests)
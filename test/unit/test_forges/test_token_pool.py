@@ -0,0 +1,104 @@
+import pytest
+
+from forgit.forges import token_pool
+from forgit.forges.project import get_project
+from forgit.forges.token_pool import GitHubTokenPool
+
+ISSUES_PATH = "/repos/namespace/repo/issues"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Time which moves only by sleeping."""
+    now = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(token_pool.time, "time", lambda: now[0])
+    monkeypatch.setattr(token_pool.time, "sleep", sleep)
+    return sleeps
+
+
+def report(pool, token, remaining, reset_at):
+    pool.update(
+        token,
+        {"X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": str(reset_at)},
+    )
+
+
+def test_reads_rotate_to_tokens_with_quota_left(clock):
+    pool = GitHubTokenPool("token", ["read-1", "read-2"])
+
+    # the quotas are not known yet, the least used token reads
+    assert sorted(pool.acquire("GET", ISSUES_PATH) for _ in range(3)) == [
+        "read-1",
+        "read-2",
+        "token",
+    ]
+
+    report(pool, "token", 100, 2000)
+    report(pool, "read-1", 0, 2000)
+    report(pool, "read-2", 2, 2000)
+    reads = [pool.acquire("GET", ISSUES_PATH) for _ in range(4)]
+
+    # the quota of "read-1" is used up, the rest go to the token with the most left
+    assert reads == ["token"] * 4
+    report(pool, "token", 0, 2000)
+    assert [pool.acquire("GET", ISSUES_PATH) for _ in range(2)] == ["read-2"] * 2
+    assert not clock
+
+
+def test_writes_and_identity_reads_stay_with_the_project_token(clock):
+    pool = GitHubTokenPool("token", ["read-1"])
+    report(pool, "token", 10, 2000)
+
+    assert pool.acquire("POST", ISSUES_PATH) == "token"
+    assert pool.acquire("GET", "/user") == "token"
+    assert pool.budgets["token"].writes == 1
+    assert pool.budgets["token"].reads == 1
+    assert pool.budgets["token"].remaining == 8
+
+
+def test_acquiring_waits_until_a_quota_is_renewed(clock):
+    pool = GitHubTokenPool("token", ["read-1"])
+    report(pool, "token", 0, 1030)
+    report(pool, "read-1", 0, 1010)
+
+    assert pool.acquire("GET", ISSUES_PATH) == "read-1"
+    assert clock == [10]
+
+    # writes are made only by the project token
+    assert pool.acquire("POST", ISSUES_PATH) == "token"
+    assert clock == [10, 20]
+
+
+def test_quota_of_the_pool_is_the_sum_of_the_tokens():
+    pool = GitHubTokenPool("token", ["read-1"])
+    assert pool.rate_limit is None
+
+    report(pool, "token", 10, 2000)
+    report(pool, "read-1", 5, 1500)
+
+    assert pool.rate_limit == (15, 1500)
+
+
+def test_reads_of_the_source_rotate_through_the_tokens(make_config, github_api):
+    github_api.issues = 6
+    config = make_config(
+        github_api_url=github_api.url, github_read_tokens=["read-1", "read-2"]
+    )
+    url = "https://github.com/namespace/repo"
+    # pools are registered by the project tokens, distinct from other tests
+    source = get_project(url, "source-token", config, config.github_read_tokens)
+    target = get_project(url, "target-token", config)
+
+    assert len(list(source.iter_issues())) == 6
+    source_tokens = {token for _, token, _ in github_api.requests}
+    assert source_tokens == {"source-token", "read-1", "read-2"}
+
+    github_api.requests.clear()
+    assert len(list(target.iter_issues())) == 6
+    assert {token for _, token, _ in github_api.requests} == {"target-token"}
@@ -0,0 +1,132 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from threading import Thread
+
+import pytest
+import requests
+
+from forgit import http_cache
+from forgit.http_cache import HttpCache, install_http_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Every reading of the time is a second later, so uses are ordered."""
+    ticks = count(1000)
+    monkeypatch.setattr(http_cache.time, "time", lambda: float(next(ticks)))
+
+
+@pytest.fixture
+def server():
+    """
+    Serves a resource with an ETag, conditional requests with a matching ETag are
+     answered by 304 with no body. Received requests are recorded.
+    """
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, body):
+            received.append((self.command, self.path, dict(self.headers)))
+            if self.command == "GET" and self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.send_header("X-RateLimit-Remaining", "41")
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", '"v1"')
+            self.send_header("X-RateLimit-Remaining", "42")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._reply(b'{"title": "issue"}')
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self._reply(b'{"created": true}')
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", received
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_session(cache):
+    session = requests.Session()
+    install_http_cache(session, cache)
+    return session
+
+
+def test_not_modified_response_is_served_from_disk(tmp_path, server):
+    url, received = server
+    path = tmp_path / "cache.sqlite"
+
+    first = make_session(HttpCache(path, 2**20)).get(f"{url}/issues/1")
+    assert first.status_code == 200
+    assert first.json() == {"title": "issue"}
+
+    # e.g. a resumed run, the database is opened again
+    second = make_session(HttpCache(path, 2**20)).get(f"{url}/issues/1")
+    assert second.status_code == 200
+    assert second.json() == {"title": "issue"}
+    # fresh rate limit headers come with the 304
+    assert second.headers["X-RateLimit-Remaining"] == "41"
+
+    assert "If-None-Match" not in received[0][2]
+    assert received[1][2]["If-None-Match"] == '"v1"'
+
+
+def test_requests_other_than_get_are_not_cached(tmp_path, server):
+    url, received = server
+    cache = HttpCache(tmp_path / "cache.sqlite", 2**20)
+    session = make_session(cache)
+
+    for _ in range(2):
+        response = session.post(f"{url}/issues", json={"title": "issue"})
+        assert response.json() == {"created": True}
+
+    assert [headers.get("If-None-Match") for _, _, headers in received] == [None, None]
+    assert cache.get(f"{url}/issues") is None
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path, clock):
+    cache = HttpCache(tmp_path / "cache.sqlite", max_size=10)
+    cache.put("https://forge/a", {"etag": "a"}, b"aaaa")
+    cache.put("https://forge/b", {"etag": "b"}, b"bbbb")
+    # used after "b", so "b" is evicted first
+    assert cache.get("https://forge/a") == ({"etag": "a"}, b"aaaa")
+
+    cache.put("https://forge/c", {"etag": "c"}, b"cccc")
+
+    assert cache.get("https://forge/b") is None
+    assert cache.get("https://forge/a") is not None
+    assert cache.get("https://forge/c") is not None
+
+
+def test_response_larger_than_the_cache_is_not_stored(tmp_path):
+    cache = HttpCache(tmp_path / "cache.sqlite", max_size=10)
+    cache.put("https://forge/a", {"etag": "a"}, b"aaaa")
+
+    cache.put("https://forge/big", {"etag": "big"}, b"x" * 11)
+
+    assert cache.get("https://forge/big") is None
+    assert cache.get("https://forge/a") is not None
+
+
+def test_size_is_kept_across_runs(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    HttpCache(path, max_size=10).put("https://forge/a", {}, b"aaaaaa")
+
+    cache = HttpCache(path, max_size=10)
+    cache.put("https://forge/b", {}, b"bbbbbb")
+
+    assert cache.get("https://forge/a") is None
+    assert cache.get("https://forge/b") is not None
@@ -0,0 +1,70 @@
+from forgit.journal import TransferJournal
+
+
+def test_journal_is_loaded_from_the_log(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = TransferJournal(path)
+    journal.reset()
+    journal.record_post(1, 1)
+    journal.record_gap_filler(2, 2)
+    journal.record_pushed_branches(["pr-3-source", "pr-3-target"])
+    journal.record_deleted_branches(["pr-3-source"])
+    journal.record_release("v1.0")
+    journal.close()
+
+    loaded = TransferJournal(path).load()
+    assert loaded.id_map == {1: 1}
+    assert loaded.is_done(1) and loaded.is_done(2) and not loaded.is_done(3)
+    assert loaded.unclosed_gap_fillers == {2}
+    assert list(loaded.pushed_branches) == ["pr-3-target"]
+    assert loaded.releases == {"v1.0"}
+    assert loaded.last_id == 2
+
+
+def test_journal_is_compacted(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = TransferJournal(path)
+    journal.reset()
+    for id_ in range(1, 3001):
+        journal.record_pushed_branches([f"pr-{id_}-source"])
+        journal.record_deleted_branches([f"pr-{id_}-source"])
+        journal.record_post(id_, id_)
+    journal.close()
+
+    with open(path) as journal_file:
+        lines = journal_file.readlines()
+    # the log is rewritten once it is much longer than the state
+    assert len(lines) < 9000
+
+    loaded = TransferJournal(path).load()
+    assert len(loaded.id_map) == 3000
+    assert not loaded.pushed_branches
+
+
+def test_cut_line_is_ignored(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = TransferJournal(path)
+    journal.reset()
+    journal.record_post(1, 1)
+    journal.close()
+    with open(path, "a") as journal_file:
+        journal_file.write('{"op": "post", "id": 2')
+
+    assert TransferJournal(path).load().id_map == {1: 1}
+
+
+def test_run_resumed_after_cut_line_can_be_resumed_again(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = TransferJournal(path)
+    journal.reset()
+    journal.record_post(1, 1)
+    journal.close()
+    with open(path, "a") as journal_file:
+        journal_file.write('{"op": "post", "id": 2')
+
+    resumed = TransferJournal(path).load()
+    resumed.record_post(2, 2)
+    resumed.record_post(3, 3)
+    resumed.close()
+
+    assert TransferJournal(path).load().id_map == {1: 1, 2: 2, 3: 3}
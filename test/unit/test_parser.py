@@ -0,0 +1,90 @@
+import pytest
+from ogr.abstract import IssueStatus
+
+from forgit.forges.github import GitHubIssue
+from forgit.forges.gitlab import GitLabIssue
+from forgit.parser import ParsedData, get_field_plan, parse_data
+
+
+class FakeIssue:
+    """Stands in for ogr issues, counts reads of fields which would be requests."""
+
+    def __init__(self):
+        self.id = 1
+        self.title = "issue"
+        self.status = IssueStatus.open
+        self.description = "description"
+        self.author = "author"
+        self.reads = []
+
+    @property
+    def labels(self):
+        self.reads.append("labels")
+        return ["bug"]
+
+    def get_comments(self):
+        self.reads.append("comments")
+        return []
+
+
+def test_attributes_are_eager_and_properties_lazy():
+    plan = get_field_plan(GitHubIssue, GitLabIssue)
+
+    assert {"id", "title", "status", "description", "author"} <= plan.eager
+    assert {"comments", "labels", "created", "url"} <= plan.lazy
+    # not data of the issue
+    assert not {"config", "issue"} & plan.fields
+    # the plan is computed once for the pair of classes
+    assert get_field_plan(GitHubIssue, GitLabIssue) is plan
+
+
+def test_lazy_fields_are_read_on_first_access(make_config):
+    issue = FakeIssue()
+
+    data = parse_data(GitHubIssue(make_config(), issue), GitLabIssue)
+
+    assert "labels" in data and "comments" in data
+    assert len(data) == len(list(data.keys()))
+    assert not issue.reads
+
+    assert data["labels"] == ["bug"]
+    assert data["labels"] == ["bug"]
+    assert issue.reads == ["labels"]
+
+
+@pytest.mark.parametrize(
+    "read",
+    [
+        lambda data: dict(data.items()),
+        lambda data: list(data.values()),
+        lambda data: {**data},
+        lambda data: dict(data),
+        lambda data: data.copy(),
+    ],
+)
+def test_lazy_fields_are_read_by_views(read):
+    data = ParsedData({"title": "issue"}, {"labels": lambda: ["bug"]})
+
+    values = read(data)
+
+    assert "bug" in str(values)
+    assert dict.__contains__(data, "labels")
+
+
+def test_failed_read_is_retried():
+    attempts = []
+
+    def read_labels():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("Reading labels failed.")
+        return ["bug"]
+
+    data = ParsedData({}, {"labels": read_labels})
+
+    with pytest.raises(RuntimeError):
+        data["labels"]
+
+    assert "labels" in data
+    assert data["labels"] == ["bug"]
+    assert len(attempts) == 2
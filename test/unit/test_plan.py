@@ -0,0 +1,154 @@
+from types import SimpleNamespace
+
+from ogr.abstract import IssueStatus, PRStatus
+
+from forgit.constants import ESTIMATED_CALL_DURATION, ESTIMATED_COMMENTS
+from forgit.enums import Action
+from forgit.forges.github import GitHubIssue, GitHubPullRequest
+from forgit.plan import MigrationPlan
+
+
+class FakeItem:
+    """Stands in for ogr issues and PRs, reading comments would be a request."""
+
+    def __init__(self, id_, status, comments=None):
+        self.id = id_
+        self.title = f"item {id_}"
+        self.status = status
+        self.description = "description"
+        self.author = "author"
+        # the count of comments comes with listed issues, not with listed PRs
+        self._raw_issue = SimpleNamespace(comments=comments)
+
+    def get_comments(self):
+        raise AssertionError("Comments are read from the source.")
+
+
+def make_issues(config, ids, status=IssueStatus.open, comments=0):
+    return {id_: GitHubIssue(config, FakeItem(id_, status, comments)) for id_ in ids}
+
+
+def make_prs(config, ids, status=PRStatus.merged):
+    return {id_: GitHubPullRequest(config, FakeItem(id_, status)) for id_ in ids}
+
+
+def test_comments_are_counted_from_the_listing(make_config):
+    config = make_config(pr={"as_issue": True})
+    issues = make_issues(config, [1], status=IssueStatus.closed, comments=3)
+    prs = make_prs(config, [2])
+
+    plan = MigrationPlan.build(issues, prs, config)
+
+    assert plan.get_api_calls() == {
+        "create_issue": 2,
+        "close_issue": 2,
+        # PRs are listed without the count, it is estimated
+        "comment": 3 + ESTIMATED_COMMENTS,
+    }
+
+
+def get_actions(plan):
+    return [(step.id, step.action) for step in plan.steps]
+
+
+def test_gaps_are_filled_up_to_the_last_id(make_config):
+    config = make_config()
+    issues = make_issues(config, [1, 5])
+    prs = make_prs(config, [3])
+
+    plan = MigrationPlan.build(issues, prs, config)
+
+    assert get_actions(plan) == [
+        (1, Action.post_issue),
+        (2, Action.fill_gap),
+        (3, Action.post_pr),
+        (4, Action.fill_gap),
+        (5, Action.post_issue),
+    ]
+    assert plan.gaps == 2
+    assert plan.ids_to_transfer == 5
+    assert plan.steps[2].item is prs[3]
+
+
+def test_first_ids_are_skipped(make_config):
+    config = make_config(ignore_first_n_ids=2)
+    issues = make_issues(config, [1, 2, 4])
+
+    plan = MigrationPlan.build(issues, {}, config)
+
+    assert get_actions(plan) == [
+        (1, Action.skip),
+        (2, Action.skip),
+        (3, Action.fill_gap),
+        (4, Action.post_issue),
+    ]
+    assert plan.ids_to_transfer == 2
+
+
+def test_resumed_plan_starts_after_the_last_transferred_id(make_config):
+    config = make_config()
+    issues = make_issues(config, [1, 2, 5])
+
+    plan = MigrationPlan.build(issues, {}, config, start=2)
+
+    assert get_actions(plan) == [
+        (3, Action.fill_gap),
+        (4, Action.fill_gap),
+        (5, Action.post_issue),
+    ]
+
+
+def test_there_are_no_gaps_without_matching_ids(make_config):
+    config = make_config(match_ids=False)
+    issues = make_issues(config, [2, 7])
+    prs = make_prs(config, [4])
+
+    plan = MigrationPlan.build(issues, prs, config)
+
+    assert get_actions(plan) == [
+        (2, Action.post_issue),
+        (4, Action.post_pr),
+        (7, Action.post_issue),
+    ]
+    assert plan.gaps == 0
+
+
+def test_duration_is_given_by_write_limits(make_config):
+    config = make_config(
+        throttling={"writes_per_minute": 60, "writes_per_hour": 3600, "write_burst": 0}
+    )
+    issues = make_issues(config, [1, 3], status=IssueStatus.closed)
+
+    plan = MigrationPlan.build(issues, {}, config)
+
+    # every issue (and the gap) is created and closed, one write per second
+    assert plan.get_api_calls() == {"create_issue": 3, "close_issue": 3}
+    assert plan.estimate_seconds() == 6
+
+
+def test_duration_is_given_by_ordered_creating(make_config):
+    config = make_config(throttling={"writes_per_minute": 6000, "write_burst": 1000})
+    issues = make_issues(config, range(1, 5))
+
+    plan = MigrationPlan.build(issues, {}, config)
+
+    # issues are created one by one, nothing else is posted for open issues
+    assert plan.estimate_seconds() == 4 * ESTIMATED_CALL_DURATION
+
+
+def test_plan_is_described(make_config):
+    config = make_config(
+        transfer_releases=True,
+        throttling={"writes_per_minute": 60, "writes_per_hour": 3600, "write_burst": 0},
+    )
+    issues = make_issues(config, [1, 3], status=IssueStatus.closed)
+
+    plan = MigrationPlan.build(issues, {}, config, releases=[object()])
+
+    lines = plan.describe(verbose=True).splitlines()
+    assert lines[:3] == ["1: post issue", "2: fill gap", "3: post issue"]
+    assert "IDs to transfer: 3" in lines
+    assert "Gaps to fill: 1" in lines
+    assert "  create_release: 1" in lines
+    assert "  total: 7" in lines
+    assert lines[-1] == "Estimated time: 0:00:07"
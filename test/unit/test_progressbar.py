@@ -0,0 +1,116 @@
+import io
+
+import pytest
+
+from forgit import progressbar, throttling
+from forgit.config import ThrottlingSchema
+from forgit.enums import Phase
+from forgit.progressbar import Progress
+from forgit.throttling import Throttler
+
+
+class FakeClock:
+    """Stands in for both clocks, time moves only when the test says so."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(progressbar.time, "monotonic", fake)
+    monkeypatch.setattr(throttling.time, "time", fake)
+    return fake
+
+
+def make_progress(total, throttler, **kwargs):
+    return Progress(total, [throttler], io.StringIO(), interactive=False, **kwargs)
+
+
+def test_rates_and_eta_are_computed_from_the_window(clock):
+    throttler = Throttler(ThrottlingSchema())
+    progress = make_progress(100, throttler, window=60)
+    progress.render()
+
+    clock.sleep(10)
+    progress.advance(Phase.issues, 20)
+    throttler.calls = 40
+
+    line = progress.render()
+    assert line.startswith("20/100 IDs (20.0%)")
+    assert "2.00 items/s, 4.00 calls/s" in line
+    # 80 IDs left at 2 IDs per second
+    assert "ETA 0:00:40" in line
+
+
+def test_old_samples_drop_out_of_the_window(clock):
+    throttler = Throttler(ThrottlingSchema())
+    progress = make_progress(100, throttler, window=20)
+    progress.render()
+
+    # fast start
+    clock.sleep(10)
+    progress.advance(Phase.issues, 50)
+    progress.render()
+
+    # slow end, the fast start is out of the window by now
+    clock.sleep(20)
+    progress.advance(Phase.prs, 10)
+
+    line = progress.render()
+    assert "0.50 items/s" in line
+    assert "ETA 0:01:20" in line
+
+
+def test_unknown_total_has_no_eta(clock):
+    throttler = Throttler(ThrottlingSchema())
+    progress = make_progress(None, throttler)
+    progress.render()
+
+    clock.sleep(10)
+    progress.advance(Phase.issues, 5)
+
+    line = progress.render()
+    assert line.startswith("5 IDs |")
+    assert "ETA" not in line
+
+
+def test_throttling_pause_is_reported_instead_of_a_hang(clock):
+    throttler = Throttler(ThrottlingSchema())
+    throttler.rate_limit = (0, int(clock.now) + 300)
+    progress = make_progress(100, throttler)
+    progress.render()
+
+    clock.sleep(120)
+    throttler.pause_until(clock.now + 180)
+
+    line = progress.render()
+    assert "quota left 0" in line
+    assert "rate limited, resuming in 0:03:00" in line
+    assert "no progress" not in line
+
+    # the pause is over, but nothing moves
+    clock.sleep(200)
+    line = progress.render()
+    assert "rate limited" not in line
+    assert "no progress for 0:05:20" in line
+
+
+def test_status_lines_are_printed_on_finish(clock):
+    throttler = Throttler(ThrottlingSchema())
+    progress = make_progress(2, throttler)
+
+    clock.sleep(5)
+    progress.advance(Phase.issues, 2)
+    progress.finish()
+
+    lines = progress.stream.getvalue().splitlines()
+    assert lines[0].startswith("2/2 IDs (100.0%)")
+    assert lines[1] == "Finished in 0:00:05."
@@ -0,0 +1,110 @@
+import time
+from datetime import datetime
+from threading import Lock
+from types import SimpleNamespace
+
+from ogr.abstract import IssueStatus
+
+from forgit.enums import TargetTypes
+from forgit.forges.github import GitHubIssue
+from forgit.snapshot import SnapshotProject, SnapshotStore
+
+
+class SlowIssue:
+    """Stands in for ogr issues, reading its comments takes a while."""
+
+    def __init__(self, id_, source):
+        self.id = id_
+        self.title = f"issue {id_}"
+        self.status = IssueStatus.open
+        self.description = "description"
+        self.author = "author"
+        self.created = datetime(2022, 1, 1)
+        self.url = f"https://forge/{id_}"
+        self.assignees = []
+        self.labels = []
+        self._raw_issue = SimpleNamespace(updated_at=datetime(2022, 1, 2))
+        self._source = source
+
+    def get_comments(self):
+        with self._source.lock:
+            self._source.running += 1
+            self._source.max_running = max(
+                self._source.max_running, self._source.running
+            )
+        time.sleep(0.05)
+        with self._source.lock:
+            self._source.running -= 1
+        return []
+
+
+class FakeSource:
+    key = "fake/source"
+    project = None
+    throttler = None
+    pull_head_refspec = ""
+    issue_cls = GitHubIssue
+
+    def __init__(self, config, ids):
+        self.config = config
+        self.ids = ids
+        self.lock = Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def iter_issues(self):
+        for id_ in self.ids:
+            yield GitHubIssue(self.config, SlowIssue(id_, self))
+
+
+def test_snapshot_is_refreshed_concurrently(make_config, tmp_path):
+    config = make_config(comment_prefetch_workers=4, comment_prefetch_window=8)
+    source = FakeSource(config, range(1, 17))
+    store = SnapshotStore(tmp_path / "snapshot.sqlite")
+
+    issues = list(SnapshotProject(source, store).iter_issues())
+
+    assert [issue.id for issue in issues] == list(range(1, 17))
+    assert 1 < source.max_running <= 4
+
+    # nothing changed, so nothing is read again
+    source.max_running = 0
+    source.ids = range(1, 16)
+    issues = list(SnapshotProject(source, store).iter_issues())
+    assert [issue.id for issue in issues] == list(range(1, 16))
+    assert source.max_running == 0
+
+
+def test_items_are_yielded_while_the_source_is_listed(make_config, tmp_path):
+    config = make_config(comment_prefetch_workers=2, comment_prefetch_window=2)
+    source = FakeSource(config, range(1, 17))
+    listed = []
+    iter_issues = source.iter_issues
+
+    def iter_listed_issues():
+        for issue in iter_issues():
+            listed.append(issue.id)
+            yield issue
+
+    source.iter_issues = iter_listed_issues
+    store = SnapshotStore(tmp_path / "snapshot.sqlite")
+
+    issues = SnapshotProject(source, store).iter_issues()
+
+    assert next(issues).id == 1
+    assert len(listed) < 16
+
+
+def test_items_are_read_from_the_store_when_used(make_config, tmp_path):
+    config = make_config()
+    source = FakeSource(config, range(1, 3))
+    store = SnapshotStore(tmp_path / "snapshot.sqlite")
+
+    issues = SnapshotProject(source, store).get_issues()
+
+    assert issues[1].status == IssueStatus.open
+    data = store.get_item(source.key, TargetTypes.issue, "1")
+    store.save_item(source.key, TargetTypes.issue, "1", None, {**data, "title": "new"})
+    assert issues[1].title == "new"
+    assert issues[2].title == "issue 2"
+    assert [comment.body for comment in issues[2].comments] == []
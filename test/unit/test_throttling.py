@@ -0,0 +1,172 @@
+import time
+
+import pytest
+import requests
+
+from forgit import throttling
+from forgit.config import ThrottlingSchema
+from forgit.throttling import (
+    ResponseRateLimit,
+    ThrottledObject,
+    Throttler,
+    _rate_limited_error_headers,
+)
+
+
+class GithubIssue:
+    """Stands in for the ogr issue, its labels are read by a request."""
+
+    title = "title"
+
+    @property
+    def labels(self):
+        return ["bug"]
+
+
+def test_requesting_properties_are_throttled():
+    throttler = Throttler(ThrottlingSchema())
+    issue = ThrottledObject(GithubIssue(), throttler)
+
+    assert issue.title == "title"
+    assert throttler.calls == 0
+    assert issue.labels == ["bug"]
+    assert throttler.calls == 1
+
+
+def test_rate_limit_is_read_from_response_headers():
+    reset_at = int(time.time()) + 60
+    rate_limit = ResponseRateLimit("RateLimit-Remaining", "RateLimit-Reset")
+    session = requests.Session()
+    rate_limit.install(session)
+
+    response = requests.Response()
+    response.headers["RateLimit-Remaining"] = "1000"
+    response.headers["RateLimit-Reset"] = str(reset_at)
+    for hook in session.hooks["response"]:
+        hook(response)
+
+    assert rate_limit.value == (1000, reset_at)
+
+    throttler = Throttler(ThrottlingSchema(), lambda: rate_limit.value)
+    throttler.call(lambda: None)
+    assert throttler.rate_limit == (1000, reset_at)
+    # the rest of the quota is spread until the reset
+    assert throttler.read_bucket.rate < 1000 / 59
+
+
+class RateLimited(Exception):
+    """Stands in for exceptions of forge libraries."""
+
+    def __init__(self, message, status, headers):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+
+@pytest.mark.parametrize(
+    "exception",
+    [
+        RateLimited("too many requests", 429, {}),
+        RateLimited("forbidden", 403, {"Retry-After": "30"}),
+        RateLimited("forbidden", 403, {"X-RateLimit-Remaining": "0"}),
+        RateLimited("API rate limit exceeded", 403, {}),
+    ],
+)
+def test_rate_limited_errors_are_recognized(exception):
+    headers = _rate_limited_error_headers(exception)
+
+    assert headers == {key.lower(): value for key, value in exception.headers.items()}
+
+
+def test_rate_limited_error_is_found_in_the_chain():
+    try:
+        try:
+            raise RateLimited("forbidden", 403, {"Retry-After": "30"})
+        except RateLimited as exc:
+            # ogr wraps exceptions of the libraries
+            raise ValueError("ogr failed") from exc
+    except ValueError as exc:
+        assert _rate_limited_error_headers(exc) == {"retry-after": "30"}
+
+
+@pytest.mark.parametrize(
+    "exception",
+    [
+        RateLimited("forbidden", 403, {"X-RateLimit-Remaining": "10"}),
+        RateLimited("not found", 404, {}),
+        ValueError("no status"),
+    ],
+)
+def test_other_errors_are_not_rate_limited(exception):
+    assert _rate_limited_error_headers(exception) is None
+
+
+@pytest.fixture
+def now(monkeypatch):
+    monkeypatch.setattr(throttling.time, "time", lambda: 1000.0)
+    return 1000.0
+
+
+@pytest.mark.parametrize(
+    "headers, attempt, paused_until",
+    [
+        # the forge tells how long to wait
+        ({"retry-after": "30"}, 0, 1030.0),
+        # the quota is renewed at the reset
+        ({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "1500"}, 0, 1500.0),
+        # exponential backoff
+        ({}, 0, 1060.0),
+        ({}, 2, 1240.0),
+        # at least a second
+        ({"retry-after": "0"}, 0, 1001.0),
+    ],
+)
+def test_backoff(now, headers, attempt, paused_until):
+    throttler = Throttler(ThrottlingSchema(backoff=60))
+
+    throttler._backoff(headers, attempt)
+
+    assert throttler._paused_until == paused_until
+
+
+def test_rate_limited_call_is_repeated(monkeypatch):
+    monkeypatch.setattr(Throttler, "_backoff", lambda self, headers, attempt: None)
+    throttler = Throttler(ThrottlingSchema(max_retries=2))
+    results = iter([RateLimited("too many requests", 429, {}), "result"])
+
+    def call():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert throttler.call(call) == "result"
+    assert throttler.calls == 2
+
+
+def test_read_rate_spreads_the_remaining_quota(now):
+    throttler = Throttler(ThrottlingSchema(reserve=50), lambda: (1050, now + 100))
+
+    throttler.call(lambda: None)
+
+    assert throttler.read_bucket.rate == 10
+    assert throttler.paused_for == 0
+
+
+def test_exhausted_quota_pauses_until_the_reset(now):
+    throttler = Throttler(ThrottlingSchema(reserve=50), lambda: (50, now + 100))
+
+    throttler.call(lambda: None)
+
+    assert throttler.paused_for == 100
+
+
+@pytest.mark.parametrize("rate_limit", [None, (-1, 0.0)])
+def test_unknown_quota_is_ignored(now, rate_limit):
+    throttler = Throttler(ThrottlingSchema(read_rate=5), lambda: rate_limit)
+
+    throttler.call(lambda: None)
+
+    assert throttler.rate_limit is None
+    assert throttler.read_bucket.rate == 5
+    assert throttler.paused_for == 0
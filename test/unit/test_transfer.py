@@ -0,0 +1,267 @@
+import time
+from collections import Counter
+from datetime import datetime
+from threading import Lock, Thread
+from types import SimpleNamespace
+
+import pytest
+from ogr.abstract import IssueStatus, PRStatus
+
+from forgit.branches import BranchPipeline
+from forgit.exceptions import GitConvertorException
+from forgit.forges.github import GitHubIssue, GitHubPullRequest
+from forgit.forges.project import GitHubProject
+from forgit.forges.record import CommentRecord
+from forgit.throttling import Throttler
+from forgit.transfer import Transferator3000
+
+
+class FakeItem:
+    """Stands in for ogr issues and PRs, counts reads which would be requests."""
+
+    def __init__(self, id_, status, reads, comments=("first", "second")):
+        self.id = id_
+        self.title = f"item {id_}"
+        self.status = status
+        self.description = "description"
+        self.author = "author"
+        self.created = None
+        self.url = f"https://forge/{id_}"
+        self.assignees = []
+        self.source_branch = f"feature-{id_}"
+        self.target_branch = "main"
+        self.head_commit = f"new-{id_}"
+        self._raw_pr = SimpleNamespace(base=SimpleNamespace(sha=f"old-{id_}"))
+        self._comments = comments
+        self._reads = reads
+
+    @property
+    def labels(self):
+        self._reads["labels", self.id] += 1
+        return []
+
+    def get_comments(self):
+        self._reads["comments", self.id] += 1
+        return [
+            CommentRecord(body, "author", datetime(2022, 1, position + 1))
+            for position, body in enumerate(self._comments)
+        ]
+
+
+class FakeSource:
+    key = "fake/source"
+    git_url = "unused"
+    pull_head_refspec = "+refs/pull/*/head:refs/pull/*/head"
+
+    def __init__(self, config, issues=(), prs=()):
+        self.config = config
+        self.throttler = Throttler(config.throttling)
+        self.reads = Counter()
+        self._issues = [FakeItem(id_, IssueStatus.closed, self.reads) for id_ in issues]
+        self._prs = [FakeItem(id_, PRStatus.merged, self.reads) for id_ in prs]
+
+    def get_issues(self):
+        return {item.id: GitHubIssue(self.config, item) for item in self._issues}
+
+    def get_pull_requests(self):
+        return {item.id: GitHubPullRequest(self.config, item) for item in self._prs}
+
+    def get_releases(self):
+        return []
+
+
+class FakeTargetItem:
+    def __init__(self, project, id_):
+        self.project = project
+        self.id = id_
+        self.comments = []
+        self.closed = False
+        self.closes = 0
+
+    def comment(self, body):
+        if self.id in self.project.failing_comments:
+            raise RuntimeError(f"Commenting on {self.id} failed.")
+        self.comments.append(body)
+
+    def close(self):
+        if self.id in self.project.failing_closes:
+            raise RuntimeError(f"Closing {self.id} failed.")
+        self.closed = True
+        self.closes += 1
+
+
+class FakeOgrProject:
+    namespace = "fake"
+    repo = "target"
+
+    def __init__(self):
+        self.items = {}
+        self.failing_comments = set()
+        self.failing_closes = set()
+        self._lock = Lock()
+
+    def _create(self):
+        with self._lock:
+            item = FakeTargetItem(self, len(self.items) + 1)
+            self.items[item.id] = item
+            return item
+
+    def create_issue(self, title, body, **_):
+        return self._create()
+
+    def create_pr(self, title, body, target_branch, source_branch):
+        return self._create()
+
+    def get_issue(self, id_):
+        return self.items[id_]
+
+    def get_pr(self, id_):
+        return self.items[id_]
+
+
+class FakeTarget(GitHubProject):
+    def __init__(self, config):
+        self.config = config
+        self.throttler = Throttler(config.throttling)
+        self.project = FakeOgrProject()
+
+
+class FakeGit:
+    def __init__(self):
+        self.pushed = []
+
+    def fetch(self, url, refspecs):
+        pass
+
+    def create_branches(self, refs):
+        pass
+
+    def push_branches(self, branches):
+        self.pushed.extend(branches)
+
+    def delete_branches(self, branches):
+        pass
+
+
+def get_transferator(config, source, target=None):
+    transferator = Transferator3000(source, target or FakeTarget(config), config)
+    transferator._git_cli_api = FakeGit()
+    return transferator
+
+
+def test_only_posted_fields_are_read(make_config):
+    config = make_config()
+    source = FakeSource(config, issues=[1], prs=[2])
+    transferator = get_transferator(config, source)
+
+    transferator.transfer()
+
+    # comments of the issue are posted, so they are read, but only once
+    assert source.reads["comments", 1] == 1
+    # PRs are posted without comments and labels, nothing is read for them
+    assert source.reads["comments", 2] == 0
+    assert source.reads["labels", 2] == 0
+    assert transferator.target.project.items[1].comments == ["first", "second"]
+
+
+def test_unfinished_follow_ups_are_finished_on_resume(make_config):
+    config = make_config()
+    source = FakeSource(config, issues=[1, 2, 3])
+    target = FakeTarget(config)
+    target.project.failing_comments.add(2)
+
+    with pytest.raises(RuntimeError):
+        get_transferator(config, source, target).transfer()
+
+    journal = get_transferator(config, source, target).journal.load()
+    assert not journal.is_done(2)
+    assert journal.pending[2] == (2, {"comments"})
+
+    target.project.failing_comments.clear()
+    get_transferator(config, source, target).resume()
+
+    # nothing is created twice, only the missing comments are posted
+    assert list(target.project.items) == [1, 2, 3]
+    for item in target.project.items.values():
+        assert item.comments == ["first", "second"]
+        assert item.closed
+
+    journal = get_transferator(config, source, target).journal.load()
+    assert all(journal.is_done(id_) for id_ in (1, 2, 3))
+    assert not journal.pending
+
+
+def test_concurrently_created_prs_get_their_branches(make_config):
+    config = make_config(match_ids=False, concurrency=8)
+    source = FakeSource(config, prs=range(1, 9))
+    transferator = get_transferator(config, source)
+    post = transferator._post_issue_or_pr
+
+    def post_late(step, source_data):
+        # the lowest PR is not the first one which gets to creating
+        if step.id == 1:
+            time.sleep(0.2)
+        return post(step, source_data)
+
+    transferator._post_issue_or_pr = post_late
+    thread = Thread(target=transferator.transfer, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert len(transferator.target.project.items) == 8
+    assert len(transferator.git_cli_api.pushed) == 16
+
+
+def test_waiting_for_uncovered_pr_fails_right_away():
+    pipeline = BranchPipeline(
+        FakeGit(),
+        [(1, None)],
+        window=1,
+        batch_size=1,
+        on_pushed=lambda _: None,
+        on_deleted=lambda _: None,
+    )
+
+    with pytest.raises(GitConvertorException):
+        pipeline.wait_for(2)
+
+
+def test_gap_fillers_are_closed(make_config):
+    config = make_config()
+    source = FakeSource(config, issues=[1, 3])
+    transferator = get_transferator(config, source)
+
+    transferator.transfer()
+
+    items = transferator.target.project.items
+    assert list(items) == [1, 2, 3]
+    assert items[2].closed and not items[2].comments
+    journal = get_transferator(config, source).journal.load()
+    assert journal.gap_fillers == {2}
+    assert not journal.unclosed_gap_fillers
+
+
+def test_gap_fillers_are_closed_once_by_resumed_runs(make_config):
+    config = make_config()
+    source = FakeSource(config, issues=[1, 3])
+    target = FakeTarget(config)
+    target.project.failing_closes.add(2)
+
+    with pytest.raises(RuntimeError):
+        get_transferator(config, source, target).transfer()
+
+    journal = get_transferator(config, source, target).journal.load()
+    assert journal.unclosed_gap_fillers == {2}
+    assert not target.project.items[2].closed
+
+    target.project.failing_closes.clear()
+    get_transferator(config, source, target).resume()
+    get_transferator(config, source, target).resume()
+
+    items = target.project.items
+    # the gap is not filled again and its filler is closed only once
+    assert list(items) == [1, 2, 3]
+    assert items[2].closes == 1
+    assert all(item.closes == 1 for item in items.values())
+    assert not get_transferator(config, source, target).journal.load().pending